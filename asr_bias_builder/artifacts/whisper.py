@@ -10,13 +10,17 @@ from pathlib import Path
 from typing import Iterable, List, Optional
 
 from ..config import load_config
+from ..utils.patterns import DenyMatcher
 
 CONFIG = load_config()
 ALLOWED_CLASSES = set(CONFIG.get("high_value_classes", []))
 STOP_WORDS = {w.lower() for w in CONFIG.get("stop_words", [])}
 MIN_TERM_LENGTH = int(CONFIG.get("min_term_length", 2))
 MAX_TERM_LENGTH = int(CONFIG.get("max_term_length", 50))
-DENY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in CONFIG.get("deny_patterns", [])]
+DENY_MATCHER = DenyMatcher(
+    CONFIG.get("deny_patterns", []),
+    timeout=float(CONFIG.get("regex_timeout_seconds", 0) or 0) or None,
+)
 DENY_EXACT = {s.lower() for s in CONFIG.get("deny_exact", [])}
 USE_TITLECASE_FILTER = bool(CONFIG.get("use_titlecase_filter", False))
 ACRONYM_MIN_LENGTH = int(CONFIG.get("acronym_min_length", 2))
@@ -88,7 +92,7 @@ def is_high_value_term(item: dict, include_aliases: bool) -> bool:
         return False
     if canonical.lower() in DENY_EXACT:
         return False
-    if any(pattern.search(canonical) for pattern in DENY_PATTERNS):
+    if DENY_MATCHER.search(canonical):
         return False
     if not item.get("present_in_deck", False) and not include_aliases:
         return False
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from dataclasses import asdict
 import re
 from pathlib import Path
@@ -12,7 +13,7 @@ from . import __version__
 from .artifacts.google_stt import build_phrase_set
 from .artifacts.whisper import build_prompt
 from .config import load_config
-from .extraction import extract_text
+from .extraction import ProvenanceIndex, iter_pages, load_provenance, page_separator, provenance_path, write_pages
 from .mining import mine
 from .pipeline import run_pipeline
 from .verification import matcher
@@ -24,16 +25,22 @@ def _write_json(path: Path, payload: object) -> None:
 
 def handle_extract(args: argparse.Namespace) -> None:
     cfg = load_config()
-    text = extract_text(args.deck, enable_ocr=args.enable_ocr, config=cfg)
+    pages = iter_pages(args.deck, enable_ocr=args.enable_ocr, config=cfg, workers=args.workers)
     if args.output:
-        args.output.write_text(text, encoding="utf-8")
+        index = ProvenanceIndex()
+        with args.output.open("w", encoding="utf-8") as handle:
+            write_pages(pages, handle, page_separator(cfg), index)
+        index.save(provenance_path(args.output))
     else:
-        print(text)
+        write_pages(pages, sys.stdout, page_separator(cfg))
+        print()
 
 
 def handle_mine(args: argparse.Namespace) -> None:
     text = args.deck_text.read_text(encoding="utf-8")
-    seeds, stats = mine(text, min_freq=args.min_freq, max_terms=args.max_terms)
+    seeds, stats = mine(
+        text, min_freq=args.min_freq, max_terms=args.max_terms, provenance=load_provenance(args.deck_text)
+    )
     _write_json(args.output, seeds)
     if args.stats:
         stats_dict = asdict(stats)
@@ -45,7 +52,13 @@ def handle_verify(args: argparse.Namespace) -> None:
     deck_text = args.deck_text.read_text(encoding="utf-8")
     seeds = matcher.load_json(args.seeds)
     llm_data = matcher.load_json(args.llm)
-    payloads, stats = matcher.consolidate(deck_text, seeds, llm_data, allow_llm_aliases=args.allow_llm_aliases)
+    payloads, stats = matcher.consolidate(
+        deck_text,
+        seeds,
+        llm_data,
+        allow_llm_aliases=args.allow_llm_aliases,
+        provenance=load_provenance(args.deck_text),
+    )
     _write_json(args.output, payloads)
     if args.stats:
         stats["output_terms"] = len(payloads)
@@ -93,9 +106,15 @@ def handle_pipeline(args: argparse.Namespace) -> None:
         model=args.model,
         permission_flags=args.permission_flags,
         enable_ocr=args.enable_ocr,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
         chunk_size=args.chunk_size,
         stream_threshold=args.stream_threshold,
         allow_llm_aliases=args.allow_llm_aliases,
+        llm_concurrency=args.llm_concurrency,
+        use_llm_cache=args.use_llm_cache,
+        llm_token_budget=args.llm_token_budget,
+        llm_mode=args.llm_mode,
     )
 
 
@@ -119,6 +138,11 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Allow OCR fallback when the deck has no text layer",
     )
+    extract_p.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for page-sharded PDF extraction (0 = all CPUs; defaults to extraction_workers config)",
+    )
     extract_p.add_argument("--output", type=Path, help="Where to write deck_text.txt (defaults to stdout)")
     extract_p.set_defaults(func=handle_extract)
 
@@ -218,6 +242,16 @@ def build_parser() -> argparse.ArgumentParser:
         help="Additional flags to pass to the Claude CLI (repeat as needed)",
     )
     pipe_p.add_argument("--enable-ocr", action="store_true", help="Allow OCR fallback for image-only PDFs")
+    pipe_p.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for page-sharded PDF extraction (0 = all CPUs; defaults to extraction_workers config)",
+    )
+    pipe_p.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Persistent cache directory for extracted deck text (defaults to cache_dir config; unset disables caching)",
+    )
     pipe_p.add_argument("--chunk-size", type=int, default=50_000, help="Chunk size for streaming inputs (bytes)")
     pipe_p.add_argument(
         "--stream-threshold",
@@ -225,6 +259,29 @@ def build_parser() -> argparse.ArgumentParser:
         default=80_000,
         help="Switch to streaming mode when deck_text exceeds this many bytes",
     )
+    pipe_p.add_argument(
+        "--llm-concurrency",
+        type=int,
+        help="Send chunks of large decks to this many parallel Claude calls and merge the results "
+        "(defaults to llm_concurrency config; 1 keeps a single streaming call)",
+    )
+    pipe_p.add_argument(
+        "--no-llm-cache",
+        dest="use_llm_cache",
+        action="store_false",
+        help="Always call Claude, bypassing the LLM response cache under --cache-dir",
+    )
+    pipe_p.add_argument(
+        "--llm-mode",
+        choices=["deck", "classify", "auto"],
+        help="Send the deck text, or only the mined seeds for classification (defaults to llm_mode config)",
+    )
+    pipe_p.add_argument(
+        "--llm-token-budget",
+        type=int,
+        help="Compact deck text before the LLM pass and send at most this many estimated tokens "
+        "(0 = dedupe only; enables llm_compaction)",
+    )
     pipe_p.add_argument(
         "--allow-llm-aliases",
         action="store_true",
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import os
+import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Tuple
+
+from .utils.patterns import redos_risk
 
 try:
     import yaml
@@ -77,10 +80,53 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     ],
     "pos_filter": False,
     "auto_ocr": True,
+    "preserve_structure": False,
+    "strip_boilerplate": False,
+    "boilerplate_min_share": 0.5,
+    "boilerplate_min_pages": 4,
+    "extraction_workers": 1,
+    "ocr_workers": 0,
+    "ocr_backend": "auto",
+    "ocr_lang": "eng",
+    "ocr_batch_size": 8,
+    "ocr_min_dpi": 100,
+    "ocr_max_dpi": 300,
+    "ocr_default_dpi": 200,
+    "ocr_binarize": True,
+    "ocr_dedup": True,
+    "ocr_dedup_hash_size": 16,
+    "ocr_dedup_max_distance": 3,
+    "ocr_page_min_text_chars": 10,
+    "ocr_page_min_image_coverage": 0.3,
+    "allow_unsafe_patterns": False,
+    "regex_timeout_seconds": 2.0,
+    "regex_max_line_chars": 20000,
+    "extraction_budgets": {
+        "pymupdf": {"timeout_seconds": 600, "max_rss_mb": 4096},
+        "pdfminer": {"timeout_seconds": 300, "max_rss_mb": 2048},
+        "ocr": {"timeout_seconds": 1800, "max_rss_mb": 8192},
+    },
+    "cache_dir": None,
+    "extraction_cache_max_mb": 512,
+    "llm_cache_max_mb": 256,
+    "llm_cache_ttl_days": 30,
     "use_titlecase_filter": True,
     "acronym_min_length": 2,
     "use_llm_priority_threshold": True,
     "llm_priority_threshold": 0.75,
+    "llm_concurrency": 1,
+    "llm_chunk_tokens": None,
+    "llm_chunk_cache": True,
+    "llm_mode": "deck",
+    "llm_classify_min_tokens": 50_000,
+    "llm_classify_batch_size": 80,
+    "llm_classify_contexts": 2,
+    "llm_classify_concurrency": 4,
+    "llm_compaction": False,
+    "llm_token_budget": 0,
+    "llm_near_duplicate_threshold": 0.85,
+    "llm_numeric_line_ratio": 0.5,
+    "llm_compaction_section_weights": {"agenda": 0.5, "appendix": 0.5},
     "deny_exact": [],
     "class_boost_floors": {
         "PERSON": 10.0,
@@ -105,6 +151,46 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "footer": 0.3,
     },
     "default_section_weight": 1.0,
+    "seed_context_snippets": 3,
+    "mining_workers": 1,
+    "mining_chunk_chars": 4194304,
+    "docfreq_db": None,
+    "docfreq_min_docs": 5,
+    "docfreq_floor": 0.2,
+    "phrase_mining": False,
+    "phrase_min_count": 3,
+    "phrase_min_words": 2,
+    "phrase_max_words": 6,
+    "phrase_edge_words": [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "has",
+        "have",
+        "in",
+        "into",
+        "is",
+        "its",
+        "of",
+        "or",
+        "our",
+        "than",
+        "their",
+        "to",
+        "was",
+        "we",
+        "were",
+        "with",
+        "you",
+        "your",
+    ],
 }
 
 
@@ -122,6 +208,32 @@ def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any
     return result
 
 
+def _user_patterns(cfg: Dict[str, Any]) -> Iterator[Tuple[str, str, int]]:
+    for pattern in cfg.get("deny_patterns", []) or []:
+        yield "deny_patterns", str(pattern), re.IGNORECASE
+    for rule in cfg.get("ocr_normalizations", []) or []:
+        if isinstance(rule, dict) and rule.get("pattern"):
+            yield "ocr_normalizations", str(rule["pattern"]), 0
+
+
+def vet_patterns(cfg: Dict[str, Any]) -> None:
+    """Reject invalid or backtracking-prone ``deny_patterns``/``ocr_normalizations`` regexes.
+
+    Unsafe shapes are allowed (still under the runtime time budget) when
+    ``allow_unsafe_patterns`` is set.
+    """
+    for key, pattern, flags in _user_patterns(cfg):
+        try:
+            reason = redos_risk(pattern, flags)
+        except re.error as exc:
+            raise ValueError(f"Invalid {key} pattern {pattern!r}: {exc}") from None
+        if reason and not cfg.get("allow_unsafe_patterns", False):
+            raise ValueError(
+                f"Unsafe {key} pattern {pattern!r}: {reason}; "
+                "rewrite it (possessive quantifiers/atomic groups are fine) or set allow_unsafe_patterns: true"
+            )
+
+
 def load_config(path: str | None = None) -> Dict[str, Any]:
     """Load configuration from YAML file or fall back to defaults."""
     cfg = dict(DEFAULT_CONFIG)
@@ -139,4 +251,5 @@ def load_config(path: str | None = None) -> Dict[str, Any]:
         overrides = cfg.get("deck_overrides", {}).get(deck_id)
         if isinstance(overrides, dict):
             cfg = _deep_merge(cfg, overrides)
+    vet_patterns(cfg)
     return cfg
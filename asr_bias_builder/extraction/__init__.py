@@ -4,61 +4,65 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+import sys
 from pathlib import Path
 from typing import Iterable, Optional
 
+from .cache import open_extraction_cache
 from ..config import load_config
-from .ocr import apply_ocr_normalization
-from .pdf import extract_pdf_via_ocr, extract_pdf_via_pdfminer, extract_pdf_via_pymupdf
-from .pptx import extract_pptx
+from .pages import PAGE_SEPARATOR, PageText, iter_pages, page_separator, write_deck_text, write_pages
+from .provenance import ProvenanceIndex, load_provenance, provenance_path
 from .sections import normalize_text
+from .stats import ExtractionStats
 
 LOGGER = logging.getLogger("asr_bias_builder.extraction")
 
 
-def extract_text(path: Path, enable_ocr: bool = False, config: Optional[dict] = None) -> str:
-    """Extract and normalize deck text from PDF or PPTX."""
+def extract_text(
+    path: Path,
+    enable_ocr: bool = False,
+    config: Optional[dict] = None,
+    workers: Optional[int] = None,
+) -> str:
+    """Extract and normalize deck text from PDF or PPTX.
+
+    ``workers`` shards PDF page ranges across a process pool (``0`` uses every CPU);
+    when omitted the ``extraction_workers`` config value applies.
+    """
     cfg = config or load_config()
-    auto_ocr = bool(cfg.get("auto_ocr", True))
-    suffix = path.suffix.lower()
-    if suffix == ".pdf":
-        strategies = (
-            extract_pdf_via_pymupdf,
-            extract_pdf_via_pdfminer,
-        )
-        for strategy in strategies:
-            try:
-                text = strategy(path)
-            except Exception as exc:  # pragma: no cover
-                LOGGER.warning("%s extraction failed: %s", strategy.__name__, exc)
-                continue
-            if text and text.strip():
-                return normalize_text(apply_ocr_normalization(text, cfg))
-        if enable_ocr or auto_ocr:
-            LOGGER.info("Falling back to OCR for %s", path.name)
-            text = extract_pdf_via_ocr(path)
-            return normalize_text(apply_ocr_normalization(text, cfg))
-        raise RuntimeError("Unable to extract PDF text; consider --enable-ocr")
-    if suffix == ".pptx":
-        text = extract_pptx(path)
-        return normalize_text(apply_ocr_normalization(text, cfg))
-    if suffix == ".txt":
-        text = path.read_text(encoding="utf-8")
-        return normalize_text(apply_ocr_normalization(text, cfg))
-    raise ValueError(f"Unsupported deck type: {suffix}")
+    pages = iter_pages(path, enable_ocr=enable_ocr, config=cfg, workers=workers)
+    return page_separator(cfg).join(page.text for page in pages)
 
 
 def main(argv: Optional[Iterable[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Extract normalized text from deck files")
     parser.add_argument("deck", type=Path, help="Path to deck (.pdf or .pptx)")
     parser.add_argument("--enable-ocr", action="store_true", help="Allow OCR fallback for PDF with no text layer")
+    parser.add_argument("--workers", type=int, help="Worker processes for PDF extraction (0 = all CPUs)")
     parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "WARNING"))
     args = parser.parse_args(argv)
 
     logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.INFO))
-    text = extract_text(args.deck, enable_ocr=args.enable_ocr)
-    print(text)
+    cfg = load_config()
+    pages = iter_pages(args.deck, enable_ocr=args.enable_ocr, config=cfg, workers=args.workers)
+    write_pages(pages, sys.stdout, page_separator(cfg))
+    print()
     return 0
 
 
-__all__ = ["extract_text", "main", "normalize_text"]
+__all__ = [
+    "PAGE_SEPARATOR",
+    "ExtractionStats",
+    "PageText",
+    "ProvenanceIndex",
+    "extract_text",
+    "iter_pages",
+    "load_provenance",
+    "main",
+    "normalize_text",
+    "open_extraction_cache",
+    "page_separator",
+    "provenance_path",
+    "write_deck_text",
+    "write_pages",
+]
@@ -0,0 +1,73 @@
+"""Cross-page boilerplate detection (running headers, footers, legal lines)."""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import tempfile
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .sections import SLIDE_MARKER_RE
+from .stats import ExtractionStats
+
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+_DIGITS_RE = re.compile(r"\d+")
+# Only lines up to this long have digits masked ("Page 3 of 20"); longer lines must match exactly.
+MASKED_LINE_MAX_CHARS = 32
+
+PageLines = Tuple[int, List[str]]
+
+
+def line_key(line: str) -> int:
+    """Hash of a casefolded line; short lines have digit runs masked ("Page 3 of 20" == "Page 4 of 20")."""
+    key = line.casefold()
+    if len(key) <= MASKED_LINE_MAX_CHARS:
+        key = _DIGITS_RE.sub("#", key)
+    return hash(key)
+
+
+def strip_boilerplate(
+    pages: Iterable[PageLines],
+    min_share: float = 0.5,
+    min_pages: int = 4,
+    stats: Optional[ExtractionStats] = None,
+) -> Iterator[PageLines]:
+    """Drop lines that recur on more than ``min_share`` of the pages.
+
+    Pages are spooled to a temporary file while line hashes are counted (once
+    per page), then replayed without the boilerplate, so the pass is linear
+    in the text and memory holds only the hash counts. ``[Slide N]`` markers
+    are never counted or dropped. Decks with fewer than ``min_pages`` pages
+    pass through unchanged. Pages left empty are skipped.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    page_counts: Counter[int] = Counter()
+    page_total = 0
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for number, lines in pages:
+            page_total += 1
+            page_counts.update({line_key(line) for line in lines if not SLIDE_MARKER_RE.match(line)})
+            spool.write(json.dumps([number, lines], ensure_ascii=False))
+            spool.write("\n")
+        threshold = page_total * min_share
+        repeated = {key for key, count in page_counts.items() if count > threshold and count > 1}
+        if page_total < min_pages:
+            repeated = set()
+        del page_counts
+        stats.boilerplate_patterns = len(repeated)
+        if repeated:
+            LOGGER.info("Stripping %d boilerplate line pattern(s) repeated across %d pages", len(repeated), page_total)
+        spool.seek(0)
+        for record in spool:
+            number, lines = json.loads(record)
+            if repeated:
+                kept = [line for line in lines if SLIDE_MARKER_RE.match(line) or line_key(line) not in repeated]
+                stats.boilerplate_lines_removed += len(lines) - len(kept)
+                lines = kept
+            if lines:
+                yield number, lines
+
+
+__all__ = ["MASKED_LINE_MAX_CHARS", "line_key", "strip_boilerplate"]
@@ -0,0 +1,187 @@
+"""Wall-clock and memory budgets for extraction strategies."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterator, List, Optional
+
+from .stats import ExtractionStats
+
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+# Seconds between liveness/RSS checks while waiting on a subprocess.
+POLL_INTERVAL = 0.25
+_PROC = Path("/proc")
+
+
+class BudgetExceeded(RuntimeError):
+    """A strategy ran past its wall-clock or RSS budget; ``reason`` is ``timeout`` or ``rss``."""
+
+    def __init__(self, reason: str, detail: str) -> None:
+        super().__init__(detail)
+        self.reason = reason
+
+
+def _children(pid: int) -> List[int]:
+    children: List[int] = []
+    for task in (_PROC / str(pid) / "task").glob("*/children"):
+        try:
+            children.extend(int(child) for child in task.read_text().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def process_tree(pid: int) -> List[int]:
+    """``pid`` and all of its descendants (Linux ``/proc``; just ``pid`` elsewhere)."""
+    tree = [pid]
+    idx = 0
+    while idx < len(tree):
+        tree.extend(_children(tree[idx]))
+        idx += 1
+    return tree
+
+
+def tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of ``pid`` plus descendants in MiB, or ``None`` without ``/proc``."""
+    if not _PROC.exists():
+        return None
+    total_kb = 0
+    for member in process_tree(pid):
+        try:
+            for line in (_PROC / str(member) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+                    break
+        except (OSError, ValueError, IndexError):
+            continue
+    return total_kb / 1024
+
+
+def kill_tree(process: multiprocessing.process.BaseProcess) -> None:
+    """SIGKILL ``process`` and every descendant (pool workers, tesseract)."""
+    if process.pid is None:
+        return
+    for member in reversed(process_tree(process.pid)[1:]):
+        try:
+            os.kill(member, signal.SIGKILL)
+        except OSError:
+            continue
+    if process.is_alive():
+        process.kill()
+    process.join()
+
+
+@dataclass
+class Budget:
+    """Limits for one strategy; ``0``/``None`` disables a limit."""
+
+    seconds: Optional[float] = None
+    rss_mb: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, cfg: dict, strategy: str) -> "Budget":
+        entry = (cfg.get("extraction_budgets") or {}).get(strategy) or {}
+        return cls(
+            seconds=float(entry.get("timeout_seconds") or 0) or None,
+            rss_mb=float(entry.get("max_rss_mb") or 0) or None,
+        )
+
+
+class BudgetGuard:
+    """Cooperative budget check for strategies that run in this process."""
+
+    def __init__(self, budget: Budget, pid: Optional[int] = None) -> None:
+        self.budget = budget
+        self.pid = pid or os.getpid()
+        self.started = time.monotonic()
+        self._next_rss_check = 0.0
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self.started + self.budget.seconds if self.budget.seconds else None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def check(self) -> None:
+        """Raise ``BudgetExceeded`` once the wall clock or the process tree's RSS is over budget."""
+        now = time.monotonic()
+        if self.budget.seconds and now - self.started > self.budget.seconds:
+            raise BudgetExceeded("timeout", f"exceeded {self.budget.seconds:g}s wall-clock budget")
+        if self.budget.rss_mb and now >= self._next_rss_check:
+            self._next_rss_check = now + POLL_INTERVAL
+            rss = tree_rss_mb(self.pid)
+            if rss is not None and rss > self.budget.rss_mb:
+                raise BudgetExceeded("rss", f"RSS {rss:.0f} MiB exceeded {self.budget.rss_mb:g} MiB budget")
+
+
+def _child_main(conn, func: Callable[..., Iterator[Any]], args: tuple) -> None:
+    stats = ExtractionStats()
+    try:
+        for item in func(*args, stats):
+            conn.send(("item", item))
+        conn.send(("done", stats))
+    except BaseException as exc:  # pragma: no cover - reported to the parent
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def iter_in_subprocess(
+    func: Callable[..., Iterator[Any]],
+    args: tuple,
+    budget: Budget,
+) -> Generator[Any, None, ExtractionStats]:
+    """Run the generator ``func(*args, stats)`` in a killable child process and stream its items.
+
+    The child (and any pool it starts) is SIGKILLed once ``budget`` is
+    exceeded, raising ``BudgetExceeded``, or when the consumer stops early.
+    The child's ``ExtractionStats`` are the generator's return value.
+    """
+    ctx = multiprocessing.get_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child_main, args=(sender, func, args))
+    process.start()
+    sender.close()
+    guard = BudgetGuard(budget, process.pid)
+    finished = False
+    try:
+        while True:
+            guard.check()
+            if not receiver.poll(POLL_INTERVAL):
+                if not process.is_alive() and not receiver.poll():
+                    raise RuntimeError(f"extraction subprocess exited with code {process.exitcode}")
+                continue
+            kind, payload = receiver.recv()
+            if kind == "item":
+                yield payload
+            elif kind == "done":
+                finished = True
+                return payload
+            else:
+                raise RuntimeError(payload)
+    finally:
+        receiver.close()
+        if finished:
+            process.join(timeout=POLL_INTERVAL * 4)
+        if process.is_alive():
+            kill_tree(process)
+        else:
+            process.join()
+
+
+__all__ = [
+    "Budget",
+    "BudgetExceeded",
+    "BudgetGuard",
+    "iter_in_subprocess",
+    "kill_tree",
+    "process_tree",
+    "tree_rss_mb",
+]
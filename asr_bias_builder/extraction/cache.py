@@ -0,0 +1,56 @@
+"""Persistent cache of normalized deck text keyed on deck content and extraction config."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Optional
+
+from ..utils.cache import DiskCache, digest, file_digest
+
+# Bump when extractor changes alter the produced text so stale entries stop matching.
+EXTRACTION_CACHE_VERSION = "1"
+# Config keys that change the normalized text for an unchanged deck. ``extraction_budgets`` is
+# left out: a budget that never fires leaves the text unchanged, and a run in which one fired is
+# not cached (see ``write_deck_text``). Worker counts and ``ocr_batch_size`` only change speed.
+EXTRACTION_CONFIG_KEYS = (
+    "ocr_normalizations",
+    "ocr_aliases",
+    "regex_max_line_chars",
+    "regex_timeout_seconds",
+    "auto_ocr",
+    "ocr_page_min_text_chars",
+    "ocr_page_min_image_coverage",
+    "ocr_backend",
+    "ocr_lang",
+    "ocr_min_dpi",
+    "ocr_max_dpi",
+    "ocr_default_dpi",
+    "ocr_binarize",
+    "ocr_dedup",
+    "ocr_dedup_hash_size",
+    "ocr_dedup_max_distance",
+    "preserve_structure",
+    "strip_boilerplate",
+    "boilerplate_min_share",
+    "boilerplate_min_pages",
+)
+
+
+def extraction_cache_key(deck_path: Path, cfg: dict, enable_ocr: bool = False) -> str:
+    """Hash the deck bytes together with the extraction-relevant config."""
+    settings = {key: cfg.get(key) for key in EXTRACTION_CONFIG_KEYS}
+    settings["enable_ocr"] = bool(enable_ocr)
+    config_hash = digest(json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str))
+    return digest(EXTRACTION_CACHE_VERSION, deck_path.suffix.lower(), file_digest(deck_path), config_hash)
+
+
+def open_extraction_cache(cfg: dict, cache_dir: Optional[Path] = None) -> Optional[DiskCache]:
+    """Return the extraction cache configured by ``cache_dir``/``extraction_cache_max_mb``, if enabled."""
+    root = cache_dir or cfg.get("cache_dir")
+    if not root:
+        return None
+    max_bytes = int(float(cfg.get("extraction_cache_max_mb", 512)) * 1024 * 1024)
+    return DiskCache(Path(root).expanduser() / "extraction", max_bytes=max_bytes)
+
+
+__all__ = ["EXTRACTION_CONFIG_KEYS", "extraction_cache_key", "open_extraction_cache"]
@@ -1,26 +1,114 @@
 """OCR normalization helpers."""
 from __future__ import annotations
 
+import logging
 import re
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from ..utils.patterns import PatternTimeout, TimedPattern, bounded_segments, trie_regex
+
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+RulesKey = Tuple[Tuple[str, str], ...]
+AliasKey = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+class OcrRules:
+    """Compiled ``ocr_normalizations`` rules plus a single-pass alias substitution (immutable, so cacheable).
+
+    Every alias variant is folded into one trie-shaped ``\\b...\\b`` regex
+    (case-insensitive), so the text is scanned once however large the alias
+    map grows. At one position the longest variant wins; a variant listed
+    under several canonicals maps to the first one.
+    """
+
+    def __init__(
+        self,
+        rules: RulesKey,
+        aliases: AliasKey,
+        timeout: Optional[float] = None,
+        max_chars: int = 0,
+    ) -> None:
+        self.rules: List[Tuple[TimedPattern, str]] = [
+            (TimedPattern(pattern, timeout=timeout), repl) for pattern, repl in rules
+        ]
+        self.max_chars = max_chars
+        self.lookup: Dict[str, str] = {}
+        for canonical, variants in aliases:
+            for variant in variants:
+                if variant:
+                    self.lookup.setdefault(variant.lower(), canonical)
+        self.alias_pattern: Optional[Pattern[str]] = None
+        if self.lookup:
+            self.alias_pattern = re.compile(rf"\b(?:{trie_regex(self.lookup)})\b", re.IGNORECASE)
+
+    def canonical(self, match: "re.Match[str]") -> str:
+        found = match.group()
+        canonical = self.lookup.get(found.lower())
+        if canonical is None:
+            # Case-insensitive matching and str.lower() disagree on a few exotic characters.
+            canonical = next(
+                (c for v, c in self.lookup.items() if re.fullmatch(re.escape(v), found, re.IGNORECASE)),
+                found,
+            )
+        return canonical
+
+
+class OcrNormalizer:
+    """Applies shared ``OcrRules`` for one extraction run.
+
+    Rules run on pieces of at most ``max_chars`` characters with a
+    ``timeout`` per call; a rule that overruns is disabled for the rest of
+    this normalizer's run and listed in ``disabled``. Each run gets its own
+    normalizer, so a timeout on one deck does not disable the rule for the next.
+    """
+
+    def __init__(self, compiled: OcrRules) -> None:
+        self.compiled = compiled
+        self.disabled: Set[str] = set()
+
+    def _apply_rule(self, pattern: TimedPattern, replacement: str, text: str) -> str:
+        try:
+            segments = bounded_segments(text, self.compiled.max_chars)
+            return "".join(pattern.sub(replacement, piece) for piece in segments)
+        except PatternTimeout as exc:
+            LOGGER.warning("Disabling OCR normalization rule: %s", exc)
+            self.disabled.add(pattern.pattern)
+            return text
+
+    def __call__(self, text: str) -> str:
+        for pattern, replacement in self.compiled.rules:
+            if pattern.pattern not in self.disabled:
+                text = self._apply_rule(pattern, replacement, text)
+        if self.compiled.alias_pattern is not None:
+            text = self.compiled.alias_pattern.sub(self.compiled.canonical, text)
+        return text
+
+
+@lru_cache(maxsize=8)
+def _compiled(rules: RulesKey, aliases: AliasKey, timeout: Optional[float], max_chars: int) -> OcrRules:
+    return OcrRules(rules, aliases, timeout, max_chars)
+
+
+def compile_ocr_normalizer(config: Dict[str, object]) -> OcrNormalizer:
+    """Return a fresh normalizer for ``config``'s OCR rules and aliases (the compiled rules are cached)."""
+    rules = tuple(
+        (str(rule["pattern"]), str(rule.get("replacement", "")))
+        for rule in config.get("ocr_normalizations", []) or []
+        if rule.get("pattern")
+    )
+    aliases = tuple(
+        (str(canonical), tuple(str(v) for v in variants or []))
+        for canonical, variants in (config.get("ocr_aliases", {}) or {}).items()
+    )
+    timeout = float(config.get("regex_timeout_seconds", 0) or 0) or None
+    return OcrNormalizer(_compiled(rules, aliases, timeout, int(config.get("regex_max_line_chars", 0) or 0)))
 
 
 def apply_ocr_normalization(text: str, config: Dict[str, object]) -> str:
     """Apply regex and alias-based OCR cleanup."""
-    normalizations = config.get("ocr_normalizations", [])
-    for rule in normalizations or []:
-        pattern = rule.get("pattern")
-        replacement = rule.get("replacement", "")
-        if not pattern:
-            continue
-        text = re.sub(pattern, replacement, text)
-
-    alias_map = config.get("ocr_aliases", {})
-    for canonical, variants in (alias_map or {}).items():
-        for variant in variants:
-            pattern = rf"\b{re.escape(variant)}\b"
-            text = re.sub(pattern, str(canonical), text, flags=re.IGNORECASE)
-    return text
-
-
-__all__ = ["apply_ocr_normalization"]
+    return compile_ocr_normalizer(config)(text)
+
+
+__all__ = ["OcrNormalizer", "OcrRules", "apply_ocr_normalization", "compile_ocr_normalizer"]
@@ -0,0 +1,245 @@
+"""OCR backends and a long-lived worker pool that keeps engines loaded between pages."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import tesserocr  # type: ignore
+except ImportError:  # pragma: no cover
+    tesserocr = None  # type: ignore
+
+try:
+    import pytesseract  # type: ignore
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover
+    pytesseract = None  # type: ignore
+    Image = None  # type: ignore
+
+from .budget import BudgetExceeded
+
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+PIXMAP_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+
+class RawImage(NamedTuple):
+    """Uncompressed pixel samples as produced by ``fitz.Pixmap`` (no PNG round-trip)."""
+
+    width: int
+    height: int
+    mode: str
+    samples: bytes
+
+    @classmethod
+    def from_pixmap(cls, pix) -> "RawImage":
+        return cls(pix.width, pix.height, PIXMAP_MODES[pix.n], bytes(pix.samples))
+
+    def to_pil(self):
+        return Image.frombytes(self.mode, (self.width, self.height), self.samples)
+
+
+class OcrBackend(ABC):
+    """Recognizes batches of images; subclasses keep their engine alive across calls."""
+
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, images: Sequence[RawImage]) -> List[str]:
+        """Return one text per image, in order."""
+
+    def close(self) -> None:
+        return None
+
+
+class TesserocrBackend(OcrBackend):
+    """Tesseract API loaded once per process via tesserocr."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng") -> None:
+        if tesserocr is None:
+            raise RuntimeError("tesserocr not installed")
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def recognize(self, images: Sequence[RawImage]) -> List[str]:
+        texts: List[str] = []
+        for image in images:
+            self.api.SetImage(image.to_pil())
+            texts.append(self.api.GetUTF8Text())
+        return texts
+
+    def close(self) -> None:
+        self.api.End()
+
+
+class PytesseractBackend(OcrBackend):
+    """One ``tesseract`` process per batch: images go in as uncompressed PNM through a list file."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = "eng") -> None:
+        if pytesseract is None or Image is None:
+            raise RuntimeError("pytesseract + pillow required for OCR")
+        self.lang = lang
+
+    def recognize(self, images: Sequence[RawImage]) -> List[str]:
+        if len(images) == 1:
+            return [pytesseract.image_to_string(images[0].to_pil(), lang=self.lang)]
+        with tempfile.TemporaryDirectory(prefix="asr-ocr-") as tmp:
+            names = []
+            for idx, image in enumerate(images):
+                name = os.path.join(tmp, f"{idx:05d}.pnm")
+                image.to_pil().convert("RGB" if image.mode == "RGBA" else image.mode).save(name, format="PPM")
+                names.append(name)
+            list_file = Path(tmp) / "batch.txt"
+            list_file.write_text("\n".join(names), encoding="utf-8")
+            output = pytesseract.image_to_string(str(list_file), lang=self.lang)
+        # Tesseract terminates every page with a form feed.
+        parts = output.split("\f")
+        if len(parts) == len(images) + 1 and not parts[-1].strip():
+            return parts[:-1]
+        LOGGER.debug("Batched OCR returned %d pages for %d images; retrying one by one", len(parts) - 1, len(images))
+        return [pytesseract.image_to_string(image.to_pil(), lang=self.lang) for image in images]
+
+
+def create_backend(name: str = "auto", lang: str = "eng") -> OcrBackend:
+    """Instantiate ``name`` (``auto`` prefers tesserocr, then batched pytesseract)."""
+    if name in ("auto", "tesserocr") and tesserocr is not None:
+        return TesserocrBackend(lang)
+    if name == "tesserocr":
+        raise RuntimeError("tesserocr not installed")
+    return PytesseractBackend(lang)
+
+
+_WORKER_BACKEND: Optional[OcrBackend] = None
+_WORKER_ERROR: Optional[Exception] = None
+
+
+def _init_worker(backend: str, lang: str) -> None:
+    global _WORKER_BACKEND, _WORKER_ERROR
+    # Tesseract starts an OpenMP team per engine; one thread each avoids oversubscribing the pool.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        _WORKER_BACKEND = create_backend(backend, lang)
+    except Exception as exc:  # pragma: no cover
+        # Raising here would make the pool respawn workers forever; report it per task instead.
+        _WORKER_ERROR = exc
+
+
+def _timed_recognize(backend: OcrBackend, images: Sequence[RawImage]) -> Tuple[List[str], float]:
+    started = time.perf_counter()
+    texts = backend.recognize(images)
+    return texts, time.perf_counter() - started
+
+
+def _recognize_batch(images: Sequence[RawImage]) -> Tuple[List[str], float]:
+    if _WORKER_BACKEND is None:
+        raise RuntimeError(f"OCR backend unavailable: {_WORKER_ERROR}")
+    try:
+        return _timed_recognize(_WORKER_BACKEND, images)
+    except Exception as exc:
+        # Engine exceptions do not always unpickle in the parent, which would stall the pool.
+        raise RuntimeError(f"{type(exc).__name__}: {exc}") from None
+
+
+class OcrPool:
+    """Process pool whose workers each hold one OCR engine for the pool's lifetime.
+
+    Processes start on first use; ``workers <= 1`` recognizes in-process.
+    """
+
+    def __init__(self, workers: int = 1, backend: str = "auto", lang: str = "eng", batch_size: int = 8) -> None:
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.lang = lang
+        self.batch_size = max(1, batch_size)
+        self._pool = None
+        self._local: Optional[OcrBackend] = None
+        # ``time.monotonic()`` by which pooled batches must finish; set by the strategy budget.
+        self.deadline: Optional[float] = None
+
+    def __enter__(self) -> "OcrPool":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close(terminate=exc_type is not None)
+
+    def _batches(self, images: Iterable[RawImage]) -> Iterator[List[RawImage]]:
+        batch: List[RawImage] = []
+        for image in images:
+            batch.append(image)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def recognize(self, images: Iterable[RawImage]) -> Iterator[str]:
+        """OCR ``images`` lazily and in order, keeping at most two batches per worker in flight."""
+        for text, _ in self.recognize_timed(images):
+            yield text
+
+    def recognize_timed(self, images: Iterable[RawImage]) -> Iterator[Tuple[str, float]]:
+        """Like ``recognize`` but pairs each text with its share of the engine time (seconds)."""
+        if self.workers == 1:
+            if self._local is None:
+                self._local = create_backend(self.backend, self.lang)
+            for batch in self._batches(images):
+                yield from self._spread(*_timed_recognize(self._local, batch))
+            return
+        if self._pool is None:
+            self._pool = multiprocessing.get_context().Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(self.backend, self.lang),
+            )
+        pending: Deque = deque()
+        for batch in self._batches(images):
+            pending.append(self._pool.apply_async(_recognize_batch, (batch,)))
+            if len(pending) >= 2 * self.workers:
+                yield from self._spread(*self._collect(pending.popleft()))
+        while pending:
+            yield from self._spread(*self._collect(pending.popleft()))
+
+    def _collect(self, result) -> Tuple[List[str], float]:
+        timeout = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+        try:
+            return result.get(timeout)
+        except multiprocessing.TimeoutError:
+            raise BudgetExceeded("timeout", "OCR workers did not finish within the strategy budget") from None
+
+    @staticmethod
+    def _spread(texts: List[str], seconds: float) -> Iterator[Tuple[str, float]]:
+        share = seconds / max(1, len(texts))
+        for text in texts:
+            yield text, share
+
+    def close(self, terminate: bool = False) -> None:
+        if self._pool is not None:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._local is not None:
+            self._local.close()
+            self._local = None
+
+
+__all__ = [
+    "RawImage",
+    "OcrBackend",
+    "TesserocrBackend",
+    "PytesseractBackend",
+    "create_backend",
+    "OcrPool",
+]
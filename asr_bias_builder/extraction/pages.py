@@ -0,0 +1,342 @@
+"""Lazy page-level extraction shared by every deck format."""
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from ..config import load_config
+from ..utils.cache import DiskCache
+from .boilerplate import strip_boilerplate
+from .budget import Budget, BudgetExceeded, BudgetGuard, iter_in_subprocess
+from .cache import extraction_cache_key
+from .ocr import compile_ocr_normalizer
+from .ocr_engine import OcrPool
+from .parallel import resolve_workers
+from .pdf import iter_pdf_pages_hybrid, iter_pdf_pages_via_ocr, iter_pdf_pages_via_pdfminer
+from .provenance import PROVENANCE_SUFFIX, ProvenanceIndex, provenance_path
+from .pptx import iter_pptx_slides
+from .render import PageRenderer
+from .sections import normalize_text, slide_marker
+from .stats import ExtractionStats
+
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+# Normalized pages are joined with the whitespace normalize_text would have folded the page break into.
+PAGE_SEPARATOR = " "
+# Extraction counters that describe the cached text itself and are restored on a cache hit.
+CACHED_STATS = ("boilerplate_patterns", "boilerplate_lines_removed")
+STATS_SUFFIX = ".stats.json"
+# With ``preserve_structure`` every page starts on its own line.
+STRUCTURED_PAGE_SEPARATOR = "\n"
+
+
+def page_separator(cfg: dict) -> str:
+    """Separator that joins ``iter_pages`` output into the deck text for ``cfg``."""
+    return STRUCTURED_PAGE_SEPARATOR if cfg.get("preserve_structure", False) else PAGE_SEPARATOR
+
+
+class PageText(NamedTuple):
+    """One normalized page (PDF) or slide (PPTX); ``number`` is 1-based."""
+
+    number: int
+    text: str
+
+
+def _open_ocr_pool(cfg: dict, workers: int) -> OcrPool:
+    return OcrPool(
+        workers,
+        backend=str(cfg.get("ocr_backend", "auto")),
+        lang=str(cfg.get("ocr_lang", "eng")),
+        batch_size=int(cfg.get("ocr_batch_size", 8)),
+    )
+
+
+def _pdfminer_strategy(path: str, workers: int, start: int, stats: ExtractionStats) -> Iterator[Tuple[int, str]]:
+    return iter_pdf_pages_via_pdfminer(Path(path), workers=workers, start=start)
+
+
+def _ocr_strategy(path: str, cfg: dict, workers: int, start: int, stats: ExtractionStats) -> Iterator[Tuple[int, str]]:
+    with _open_ocr_pool(cfg, workers) as pool:
+        yield from iter_pdf_pages_via_ocr(Path(path), start=start, renderer=PageRenderer.from_config(pool, cfg, stats))
+
+
+def _iter_pdf_pages(
+    path: Path,
+    cfg: dict,
+    workers: int,
+    ocr_workers: int,
+    ocr_allowed: bool,
+    stats: ExtractionStats,
+) -> Iterator[Tuple[int, str]]:
+    """Yield non-empty raw pages, resuming with the next strategy where a failing one stopped.
+
+    Each strategy runs under its ``extraction_budgets`` entry: PyMuPDF in this
+    process (checked between pages, OCR workers time out at the deadline),
+    pdfminer and the OCR fallback in child processes that are killed when
+    they overrun. Timings and abandon reasons go to ``stats.strategies``.
+    Raises ``RuntimeError`` listing every strategy's outcome when none of
+    them produced a page.
+    """
+    with _open_ocr_pool(cfg, ocr_workers) as ocr_pool:
+        renderer = PageRenderer.from_config(ocr_pool, cfg, stats)
+
+        def pymupdf(start: int) -> Iterator[Tuple[int, str]]:
+            guard = BudgetGuard(Budget.from_config(cfg, "pymupdf"))
+            ocr_pool.deadline = guard.deadline
+            try:
+                for page in iter_pdf_pages_hybrid(
+                    path,
+                    workers=workers,
+                    renderer=renderer if ocr_allowed else None,
+                    min_text_chars=int(cfg.get("ocr_page_min_text_chars", 10)),
+                    min_image_coverage=float(cfg.get("ocr_page_min_image_coverage", 0.3)),
+                    start=start,
+                ):
+                    guard.check()
+                    yield page
+            except BudgetExceeded:
+                ocr_pool.close(terminate=True)
+                raise
+            finally:
+                ocr_pool.deadline = None
+
+        def pdfminer(start: int) -> Iterator[Tuple[int, str]]:
+            budget = Budget.from_config(cfg, "pdfminer")
+            stats.merge((yield from iter_in_subprocess(_pdfminer_strategy, (str(path), workers, start), budget)))
+
+        def ocr(start: int) -> Iterator[Tuple[int, str]]:
+            LOGGER.info("Falling back to OCR for %s", path.name)
+            budget = Budget.from_config(cfg, "ocr")
+            stats.merge((yield from iter_in_subprocess(_ocr_strategy, (str(path), cfg, ocr_workers, start), budget)))
+
+        strategies: List[Tuple[str, Callable[[int], Iterator[Tuple[int, str]]]]] = [
+            ("pymupdf", pymupdf),
+            ("pdfminer", pdfminer),
+        ]
+        if ocr_allowed:
+            strategies.append(("ocr", ocr))
+        resume = 0
+        produced = False
+        for name, strategy in strategies:
+            started = time.monotonic()
+            first = resume
+            status, reason = "ok", ""
+            try:
+                for idx, text in strategy(resume):
+                    if text and text.strip():
+                        produced = True
+                        resume = idx + 1
+                        yield idx, text
+            except BudgetExceeded as exc:
+                status, reason = "abandoned", f"{exc.reason}: {exc}"
+                LOGGER.warning("%s extraction abandoned after page %d: %s", name, resume, exc)
+            except Exception as exc:
+                status, reason = "failed", str(exc)
+                LOGGER.warning("%s extraction failed: %s", name, exc)
+            finally:
+                stats.strategies[name] = {
+                    "seconds": round(time.monotonic() - started, 3),
+                    "pages": resume - first,
+                    "status": status if status != "ok" or resume > first else "empty",
+                    "reason": reason,
+                }
+            if status == "ok" and produced:
+                return
+        if produced:
+            LOGGER.warning("Extraction of %s stopped early; pages after %d are missing", path.name, resume)
+            return
+        outcomes = "; ".join(
+            f"{name} {entry['status']}" + (f" ({entry['reason']})" if entry["reason"] else "")
+            for name, entry in stats.strategies.items()
+            if name in dict(strategies)
+        )
+        hint = "" if ocr_allowed else "; consider --enable-ocr"
+        raise RuntimeError(f"Unable to extract PDF text from {path.name}: {outcomes}{hint}")
+
+
+def _iter_text_pages(path: Path) -> Iterator[Tuple[int, str]]:
+    """Yield plain-text pages split on form feeds (the pdftotext page convention)."""
+    number = 0
+    with path.open(encoding="utf-8") as handle:
+        buffer = []
+        for line in handle:
+            while "\f" in line:
+                head, line = line.split("\f", 1)
+                buffer.append(head)
+                yield number, "".join(buffer)
+                number += 1
+                buffer = []
+            buffer.append(line)
+        yield number, "".join(buffer)
+
+
+def iter_pages(
+    path: Path,
+    enable_ocr: bool = False,
+    config: Optional[dict] = None,
+    workers: Optional[int] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> Iterator[PageText]:
+    """Lazily yield normalized ``PageText`` records for a PDF, PPTX, or text deck.
+
+    Pages that normalize to nothing are skipped. ``ocr_normalizations`` and
+    ``ocr_aliases`` run on each page on its own, so a rule or alias never
+    matches across a page break; otherwise joining the texts with
+    ``page_separator(cfg)`` reproduces the whole-document normalization. With
+    ``preserve_structure`` lines are kept and PDF pages are headed by a
+    ``[Slide N]`` marker like PPTX slides. With ``strip_boilerplate`` lines
+    repeated across most pages are dropped first (see ``strip_boilerplate``),
+    which needs the whole deck before the first page is yielded. OCR and
+    boilerplate counters, and OCR rules disabled for overrunning
+    ``regex_timeout_seconds``, are recorded in ``stats`` when given.
+    """
+    cfg = config or load_config()
+    stats = stats if stats is not None else ExtractionStats()
+    auto_ocr = bool(cfg.get("auto_ocr", True))
+    worker_count = resolve_workers(workers if workers is not None else int(cfg.get("extraction_workers", 1)))
+    ocr_workers = resolve_workers(int(cfg.get("ocr_workers", 0)))
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        raw_pages: Iterable[Tuple[int, str]] = _iter_pdf_pages(
+            path, cfg, worker_count, ocr_workers, enable_ocr or auto_ocr, stats
+        )
+        offset = 1
+    elif suffix == ".pptx":
+        raw_pages = iter_pptx_slides(path, worker_count)
+        offset = 0
+    elif suffix == ".txt":
+        raw_pages = _iter_text_pages(path)
+        offset = 1
+    else:
+        raise ValueError(f"Unsupported deck type: {suffix}")
+    preserve_structure = bool(cfg.get("preserve_structure", False))
+    mark_pages = preserve_structure and suffix == ".pdf"
+    line_separator = "\n" if preserve_structure else " "
+    normalize_ocr = compile_ocr_normalizer(cfg)
+    # Flat normalization equals the structured lines joined by a space, so lines are the unit either way.
+    pages: Iterable[Tuple[int, List[str]]] = (
+        (idx + offset, lines)
+        for idx, raw in raw_pages
+        for lines in [[line for line in normalize_text(normalize_ocr(raw), True).split("\n") if line]]
+        if lines
+    )
+    if cfg.get("strip_boilerplate", False):
+        pages = strip_boilerplate(
+            pages,
+            min_share=float(cfg.get("boilerplate_min_share", 0.5)),
+            min_pages=int(cfg.get("boilerplate_min_pages", 4)),
+            stats=stats,
+        )
+    for number, lines in pages:
+        text = line_separator.join(lines)
+        yield PageText(number, f"{slide_marker(number)}\n{text}" if mark_pages else text)
+    stats.regex_timeouts = sorted(normalize_ocr.disabled)
+
+
+def write_pages(
+    pages: Iterable[PageText],
+    handle: TextIO,
+    separator: str = PAGE_SEPARATOR,
+    provenance: Optional[ProvenanceIndex] = None,
+) -> int:
+    """Stream pages to ``handle`` joined by ``separator``; returns characters written.
+
+    When ``provenance`` is given, the start offset of every page line is recorded in it.
+    """
+    written = 0
+    for page in pages:
+        if written:
+            written += handle.write(separator)
+        if provenance is not None:
+            provenance.add(written, page.number)
+            line_start = page.text.find("\n")
+            line = 1
+            while line_start != -1:
+                provenance.add(written + line_start + 1, page.number, line)
+                line_start = page.text.find("\n", line_start + 1)
+                line += 1
+        written += handle.write(page.text)
+    return written
+
+
+def _incomplete_reason(stats: ExtractionStats) -> Optional[str]:
+    """Why the text extracted with ``stats`` may differ from a clean run, or ``None``."""
+    degraded = [name for name, entry in stats.strategies.items() if entry["status"] not in ("ok", "empty")]
+    if degraded:
+        return "strategy " + ", ".join(f"{name} {stats.strategies[name]['status']}" for name in degraded)
+    if stats.ocr_failures:
+        return f"OCR failed on {stats.ocr_failures} page window(s)"
+    if stats.regex_timeouts:
+        return f"{len(stats.regex_timeouts)} ocr_normalizations rule(s) timed out"
+    return None
+
+
+def write_deck_text(
+    path: Path,
+    dest: Path,
+    enable_ocr: bool = False,
+    config: Optional[dict] = None,
+    workers: Optional[int] = None,
+    cache: Optional[DiskCache] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> int:
+    """Extract ``path`` into ``dest``, reusing a cached copy when deck and config are unchanged.
+
+    The slide provenance index is written next to ``dest`` (see ``provenance_path``).
+    Text from a run where a strategy was abandoned or failed, OCR fell back to
+    the text layer, or an OCR rule was disabled after a timeout is not cached.
+    """
+    cfg = config or load_config()
+    stats = stats if stats is not None else ExtractionStats()
+    sidecar = provenance_path(dest)
+    key = extraction_cache_key(path, cfg, enable_ocr) if cache is not None else None
+    cached_index = cache.get_path(key, PROVENANCE_SUFFIX) if cache is not None else None
+    cached = cache.get_path(key) if cached_index is not None else None
+    if cached is not None:
+        shutil.copyfile(cached, dest)
+        shutil.copyfile(cached_index, sidecar)
+        stats.cache_hits += 1
+        stats.characters = len(dest.read_text(encoding="utf-8"))
+        stats.pages = len(set(ProvenanceIndex.load(sidecar).pages))
+        counters = json.loads(cache.get_text(key, STATS_SUFFIX) or "{}")
+        for name in CACHED_STATS:
+            setattr(stats, name, counters.get(name, 0))
+        LOGGER.info("Extraction cache hit for %s", path.name)
+        return stats.characters
+    if cache is not None:
+        stats.cache_misses += 1
+
+    def counted(pages: Iterable[PageText]) -> Iterator[PageText]:
+        for page in pages:
+            stats.pages += 1
+            yield page
+
+    index = ProvenanceIndex()
+    with dest.open("w", encoding="utf-8") as handle:
+        stats.characters = write_pages(
+            counted(iter_pages(path, enable_ocr, cfg, workers, stats)), handle, page_separator(cfg), index
+        )
+    index.save(sidecar)
+    incomplete = _incomplete_reason(stats) if cache is not None else None
+    if incomplete:
+        LOGGER.warning("Not caching extraction of %s: %s", path.name, incomplete)
+    elif cache is not None:
+        cache.put_text(key, json.dumps({name: getattr(stats, name) for name in CACHED_STATS}), STATS_SUFFIX)
+        cache.put_file(key, sidecar, PROVENANCE_SUFFIX)
+        cache.put_file(key, dest)
+    return stats.characters
+
+
+__all__ = [
+    "PAGE_SEPARATOR",
+    "STRUCTURED_PAGE_SEPARATOR",
+    "PageText",
+    "iter_pages",
+    "page_separator",
+    "write_pages",
+    "write_deck_text",
+]
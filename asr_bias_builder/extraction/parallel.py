@@ -0,0 +1,66 @@
+"""Page-range sharding helpers for multi-process extraction."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Shards per worker; more shards than workers keeps the pool busy when page cost is uneven.
+SHARDS_PER_WORKER = 4
+# Below this many pages the pool start-up cost outweighs any gain.
+PARALLEL_MIN_PAGES = 8
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Translate a worker setting into a process count (0 or less means all CPUs)."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split ``range(page_count)`` into contiguous ``(start, stop)`` ranges."""
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges: List[Tuple[int, int]] = []
+    start = 0
+    for idx in range(shards):
+        stop = start + size + (1 if idx < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def map_page_ranges(
+    func: Callable[[Tuple[str, int, int]], T],
+    path: Path,
+    page_count: int,
+    workers: int,
+    start: int = 0,
+) -> Iterator[T]:
+    """Run ``func((path, start, stop))`` for each shard in a process pool, yielding results in page order."""
+    tasks = [
+        (str(path), start + first, start + stop)
+        for first, stop in page_ranges(page_count - start, workers * SHARDS_PER_WORKER)
+    ]
+    with multiprocessing.get_context().Pool(processes=min(workers, len(tasks))) as pool:
+        yield from pool.imap(func, tasks)
+
+
+def should_parallelize(page_count: int, workers: int) -> bool:
+    return workers > 1 and page_count >= PARALLEL_MIN_PAGES
+
+
+__all__ = [
+    "PARALLEL_MIN_PAGES",
+    "resolve_workers",
+    "page_ranges",
+    "map_page_ranges",
+    "should_parallelize",
+]
@@ -1,9 +1,16 @@
 """PDF extraction helpers."""
 from __future__ import annotations
 
+import contextlib
 import io
+import logging
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .budget import BudgetExceeded
+from .ocr_engine import OcrPool
+from .parallel import map_page_ranges, should_parallelize
+from .render import PageRenderer
 
 try:
     import fitz  # type: ignore
@@ -11,51 +18,236 @@ except ImportError:  # pragma: no cover
     fitz = None  # type: ignore
 
 try:
-    from pdfminer.high_level import extract_text as pdfminer_extract_text  # type: ignore
+    from pdfminer.converter import TextConverter  # type: ignore
+    from pdfminer.layout import LAParams  # type: ignore
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager  # type: ignore
+    from pdfminer.pdfpage import PDFPage  # type: ignore
 except ImportError:  # pragma: no cover
-    pdfminer_extract_text = None  # type: ignore
+    PDFPage = None  # type: ignore
 
 try:
-    import pytesseract  # type: ignore
     from PIL import Image  # type: ignore
 except ImportError:  # pragma: no cover
-    pytesseract = None  # type: ignore
     Image = None  # type: ignore
 
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+# Text-layer pages buffered per OCR classification round when streaming.
+OCR_WINDOW = 64
+
+
+def count_pdf_pages(path: Path) -> int:
+    """Return the page count, preferring PyMuPDF and falling back to pdfminer."""
+    if fitz is not None:
+        with fitz.open(path) as doc:
+            return doc.page_count
+    if PDFPage is None:
+        raise RuntimeError("PyMuPDF or pdfminer.six required to count PDF pages")
+    with open(path, "rb") as handle:
+        return sum(1 for _ in PDFPage.get_pages(handle))
+
+
+def _pymupdf_range(task: Tuple[str, int, int]) -> List[str]:
+    path, start, stop = task
+    with fitz.open(path) as doc:
+        return [doc[idx].get_text("text") for idx in range(start, stop)]
+
+
+def _pdfminer_pages(path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[str]:
+    """Yield pdfminer text per page; the concatenation equals ``pdfminer.high_level.extract_text``."""
+    with open(path, "rb") as handle, io.StringIO() as output:
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, output, codec="utf-8", laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(handle, page_numbers, caching=True):
+            interpreter.process_page(page)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+        device.close()
+
 
-def extract_pdf_via_pymupdf(path: Path) -> str:
-    """Extract text via PyMuPDF."""
+def _pdfminer_range(task: Tuple[str, int, int]) -> List[str]:
+    path, start, stop = task
+    return list(_pdfminer_pages(path, range(start, stop)))
+
+
+def iter_pdf_pages_via_pymupdf(path: Path, workers: int = 1, start: int = 0) -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_index, text)`` for every page from ``start`` using PyMuPDF."""
     if fitz is None:
         raise RuntimeError("PyMuPDF not installed")
-    doc = fitz.open(path)
-    texts: List[str] = []
-    for page in doc:
-        text = page.get_text("text")
-        if text:
-            texts.append(text)
-    doc.close()
-    return "\n".join(texts)
-
-
-def extract_pdf_via_pdfminer(path: Path) -> str:
-    """Extract text with pdfminer.six."""
-    if pdfminer_extract_text is None:
+    page_count = count_pdf_pages(path)
+    if should_parallelize(page_count - start, workers):
+        idx = start
+        for shard in map_page_ranges(_pymupdf_range, path, page_count, workers, start=start):
+            for text in shard:
+                yield idx, text
+                idx += 1
+        return
+    with fitz.open(path) as doc:
+        for idx in range(start, doc.page_count):
+            yield idx, doc[idx].get_text("text")
+
+
+def iter_pdf_pages_via_pdfminer(path: Path, workers: int = 1, start: int = 0) -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_index, text)`` for every page from ``start`` using pdfminer.six."""
+    if PDFPage is None:
         raise RuntimeError("pdfminer.six not installed")
-    return pdfminer_extract_text(str(path))
+    page_count = count_pdf_pages(path) if workers > 1 or start else 0
+    if should_parallelize(page_count - start, workers):
+        idx = start
+        for shard in map_page_ranges(_pdfminer_range, path, page_count, workers, start=start):
+            for text in shard:
+                yield idx, text
+                idx += 1
+        return
+    page_numbers = range(start, page_count) if start else None
+    yield from enumerate(_pdfminer_pages(str(path), page_numbers), start=start)
 
 
-def extract_pdf_via_ocr(path: Path) -> str:
-    """Fallback to OCR when the PDF lacks a text layer."""
-    if pytesseract is None or Image is None or fitz is None:
+def extract_pdf_pages_via_pymupdf(path: Path, workers: int = 1) -> List[str]:
+    """Return the PyMuPDF text layer of every page (empty strings included)."""
+    return [text for _, text in iter_pdf_pages_via_pymupdf(path, workers)]
+
+
+def extract_pdf_via_pymupdf(path: Path, workers: int = 1) -> str:
+    """Extract text via PyMuPDF, sharding page ranges across ``workers`` processes."""
+    return "\n".join(text for text in extract_pdf_pages_via_pymupdf(path, workers) if text)
+
+
+def extract_pdf_via_pdfminer(path: Path, workers: int = 1) -> str:
+    """Extract text with pdfminer.six, sharding page ranges across ``workers`` processes."""
+    # pdfminer terminates every page with a form feed, so per-page outputs concatenate losslessly.
+    return "".join(text for _, text in iter_pdf_pages_via_pdfminer(path, workers))
+
+
+def image_coverage(page) -> float:
+    """Share of the page area covered by raster images (0.0–1.0)."""
+    page_rect = page.rect
+    page_area = abs(page_rect)
+    if not page_area:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(fitz.Rect(info["bbox"]) & page_rect)
+    return min(1.0, covered / page_area)
+
+
+def select_ocr_pages(
+    path: Path,
+    pages: Iterable[Tuple[int, str]],
+    min_text_chars: int,
+    min_image_coverage: float,
+) -> List[int]:
+    """Return indices of pages without a usable text layer that are mostly raster images."""
+    candidates = [idx for idx, text in pages if len(text.strip()) < min_text_chars]
+    if not candidates or fitz is None:
+        return []
+    with fitz.open(path) as doc:
+        return [idx for idx in candidates if image_coverage(doc[idx]) >= min_image_coverage]
+
+
+def ocr_pdf_pages(
+    path: Path,
+    pages: Sequence[int],
+    workers: int = 1,
+    renderer: Optional[PageRenderer] = None,
+) -> List[str]:
+    """OCR the given page indices, returning texts in the same order.
+
+    Pages are rendered lazily in this process by ``renderer`` (or a temporary
+    one over a pool of ``workers`` processes) and recognized in the pool.
+    """
+    if fitz is None or Image is None:
+        raise RuntimeError("pytesseract + pillow + PyMuPDF required for OCR")
+    if not pages:
+        return []
+    with contextlib.ExitStack() as stack:
+        if renderer is None:
+            renderer = PageRenderer(stack.enter_context(OcrPool(workers)))
+        doc = stack.enter_context(fitz.open(path))
+        return [text for _, text in renderer.ocr(doc, pages)]
+
+
+def _ocr_missing_pages(
+    path: Path,
+    window: List[Tuple[int, str]],
+    renderer: PageRenderer,
+    min_text_chars: int,
+    min_image_coverage: float,
+) -> List[Tuple[int, str]]:
+    targets = select_ocr_pages(path, window, min_text_chars, min_image_coverage)
+    if not targets:
+        return window
+    LOGGER.info("OCR on %d/%d pages without a text layer in %s", len(targets), len(window), path.name)
+    try:
+        ocr_texts = dict(zip(targets, ocr_pdf_pages(path, targets, renderer=renderer)))
+    except BudgetExceeded:
+        raise
+    except Exception as exc:  # pragma: no cover
+        LOGGER.warning("Per-page OCR failed, keeping text layer only: %s", exc)
+        renderer.stats.ocr_failures += 1
+        return window
+    return [(idx, ocr_texts[idx] if ocr_texts.get(idx, "").strip() else text) for idx, text in window]
+
+
+def iter_pdf_pages_hybrid(
+    path: Path,
+    workers: int = 1,
+    renderer: Optional[PageRenderer] = None,
+    min_text_chars: int = 10,
+    min_image_coverage: float = 0.3,
+    start: int = 0,
+) -> Iterator[Tuple[int, str]]:
+    """Yield the PyMuPDF text layer per page, OCR-ing only image pages that lack one.
+
+    Without a ``renderer`` the text layer is yielded as-is.
+    """
+    pages = iter_pdf_pages_via_pymupdf(path, workers, start)
+    if renderer is None:
+        yield from pages
+        return
+    window: List[Tuple[int, str]] = []
+    for item in pages:
+        window.append(item)
+        if len(window) >= OCR_WINDOW:
+            yield from _ocr_missing_pages(path, window, renderer, min_text_chars, min_image_coverage)
+            window = []
+    yield from _ocr_missing_pages(path, window, renderer, min_text_chars, min_image_coverage)
+
+
+def iter_pdf_pages_via_ocr(
+    path: Path,
+    workers: int = 1,
+    start: int = 0,
+    renderer: Optional[PageRenderer] = None,
+) -> Iterator[Tuple[int, str]]:
+    """Yield OCR text for every page from ``start``, rendering lazily into the worker pool."""
+    if fitz is None or Image is None:
         raise RuntimeError("pytesseract + pillow + PyMuPDF required for OCR")
-    doc = fitz.open(path)
-    ocr_texts: List[str] = []
-    for page in doc:
-        pix = page.get_pixmap()
-        img = Image.open(io.BytesIO(pix.tobytes("png")))
-        ocr_texts.append(pytesseract.image_to_string(img))
-    doc.close()
-    return "\n".join(ocr_texts)
+    with contextlib.ExitStack() as stack:
+        if renderer is None:
+            renderer = PageRenderer(stack.enter_context(OcrPool(workers)))
+        doc = stack.enter_context(fitz.open(path))
+        yield from renderer.ocr(doc, range(start, doc.page_count))
+
+
+def extract_pdf_via_ocr(path: Path, workers: int = 1) -> str:
+    """Fallback to OCR when the PDF lacks a text layer."""
+    return "\n".join(text for _, text in iter_pdf_pages_via_ocr(path, workers))
 
 
-__all__ = ["extract_pdf_via_pymupdf", "extract_pdf_via_pdfminer", "extract_pdf_via_ocr"]
+__all__ = [
+    "count_pdf_pages",
+    "iter_pdf_pages_via_pymupdf",
+    "iter_pdf_pages_via_pdfminer",
+    "iter_pdf_pages_hybrid",
+    "iter_pdf_pages_via_ocr",
+    "extract_pdf_pages_via_pymupdf",
+    "extract_pdf_via_pymupdf",
+    "extract_pdf_via_pdfminer",
+    "image_coverage",
+    "select_ocr_pages",
+    "ocr_pdf_pages",
+    "extract_pdf_via_ocr",
+]
@@ -1,32 +1,191 @@
 """PowerPoint extraction helpers."""
 from __future__ import annotations
 
+import logging
+import posixpath
+import zipfile
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Tuple
+from xml.etree import ElementTree
+
+from .parallel import map_page_ranges
+from .sections import slide_marker
 
 try:
     import pptx  # type: ignore
+    from pptx.enum.shapes import MSO_SHAPE_TYPE  # type: ignore
 except ImportError:  # pragma: no cover
     pptx = None  # type: ignore
 
+LOGGER = logging.getLogger("asr_bias_builder.extraction")
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_NOTES_REL = "/notesSlide"
+# Slide XML parses in about a millisecond, so a pool only pays for its start-up on large decks.
+PPTX_PARALLEL_MIN_SLIDES = 500
+
+
+def _rels_path(part: str) -> str:
+    head, tail = posixpath.split(part)
+    return posixpath.join(head, "_rels", f"{tail}.rels")
+
+
+def _relationships(archive: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """Map relationship ids of ``part`` to ``(type, target part name)``."""
+    try:
+        data = archive.read(_rels_path(part))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(part)
+    rels: Dict[str, Tuple[str, str]] = {}
+    for rel in ElementTree.fromstring(data).iter(_REL):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        name = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(base, target))
+        rels[rel.get("Id", "")] = (rel.get("Type", ""), name)
+    return rels
+
+
+def slide_parts(archive: zipfile.ZipFile) -> List[str]:
+    """Return slide part names in presentation order (``p:sldIdLst``)."""
+    rels = _relationships(archive, "ppt/presentation.xml")
+    root = ElementTree.fromstring(archive.read("ppt/presentation.xml"))
+    id_list = root.find(f"{_P}sldIdLst")
+    if id_list is None:
+        return []
+    return [rels[sld.get(f"{_R}id")][1] for sld in id_list.iter(f"{_P}sldId")]
+
+
+def _iter_paragraphs(handle, body_only: bool = False) -> Iterator[str]:
+    """Stream ``a:p`` paragraph texts from a slide/notes part in document order.
+
+    Tables, grouped shapes and placeholders all nest their text in ``a:p``, so
+    one pass covers them. With ``body_only`` only text of the ``body``
+    placeholder is kept (speaker notes, without slide-number fields).
+    """
+    runs: List[str] = []
+    shape_paragraphs: List[str] = []
+    shape_is_body = False
+    for event, elem in ElementTree.iterparse(handle, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if body_only and tag == f"{_P}sp":
+                shape_paragraphs, shape_is_body = [], False
+            continue
+        if tag == f"{_A}t":
+            runs.append(elem.text or "")
+        elif tag == f"{_A}br":
+            runs.append("\n")
+        elif tag == f"{_A}p":
+            text = "".join(runs)
+            runs = []
+            if body_only:
+                shape_paragraphs.append(text)
+            elif text:
+                yield text
+            elem.clear()
+        elif body_only and tag == f"{_P}ph":
+            shape_is_body = shape_is_body or elem.get("type") == "body"
+        elif body_only and tag == f"{_P}sp":
+            if shape_is_body:
+                yield from (text for text in shape_paragraphs if text)
+            elem.clear()
+
+
+def _slide_text(archive: zipfile.ZipFile, part: str, number: int) -> str:
+    lines = [slide_marker(number)]
+    with archive.open(part) as handle:
+        lines.extend(_iter_paragraphs(handle))
+    for rel_type, target in _relationships(archive, part).values():
+        if rel_type.endswith(_NOTES_REL) and target in archive.NameToInfo:
+            with archive.open(target) as handle:
+                lines.extend(_iter_paragraphs(handle, body_only=True))
+    return "\n".join(lines)
+
 
-def extract_pptx(path: Path) -> str:
-    """Extract slide text via python-pptx."""
+def _pptx_xml_range(task: Tuple[str, int, int]) -> List[str]:
+    path, start, stop = task
+    with zipfile.ZipFile(path) as archive:
+        parts = slide_parts(archive)
+        return [_slide_text(archive, parts[idx], idx + 1) for idx in range(start, stop)]
+
+
+def iter_pptx_slides_via_xml(path: Path, workers: int = 1, start: int = 0) -> Iterator[Tuple[int, str]]:
+    """Yield ``(slide_number, text)`` by streaming slide XML straight from the zip (no object model)."""
+    with zipfile.ZipFile(path) as archive:
+        parts = slide_parts(archive)
+        if workers <= 1 or len(parts) - start < PPTX_PARALLEL_MIN_SLIDES:
+            for idx in range(start, len(parts)):
+                yield idx + 1, _slide_text(archive, parts[idx], idx + 1)
+            return
+    number = start + 1
+    for shard in map_page_ranges(_pptx_xml_range, path, len(parts), workers, start=start):
+        for text in shard:
+            yield number, text
+            number += 1
+
+
+def _shape_texts(shapes) -> Iterator[str]:
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from _shape_texts(shape.shapes)
+            continue
+        if shape.has_text_frame and shape.text_frame.text:
+            yield shape.text_frame.text
+        if shape.has_table:
+            for row in shape.table.rows:
+                for cell in row.cells:
+                    if cell.text:
+                        yield cell.text
+
+
+def iter_pptx_slides_via_python_pptx(path: Path, start: int = 0) -> Iterator[Tuple[int, str]]:
+    """Yield ``(slide_number, text)`` per slide via the python-pptx object model."""
     if pptx is None:
         raise RuntimeError("python-pptx not installed")
     prs = pptx.Presentation(str(path))
-    texts: List[str] = []
     for slide_idx, slide in enumerate(prs.slides, start=1):
-        texts.append(f"[Slide {slide_idx}]")
-        for shape in slide.shapes:
-            if hasattr(shape, "text") and shape.text:
-                texts.append(shape.text)
-            if shape.has_table:
-                for row in shape.table.rows:
-                    for cell in row.cells:
-                        if cell.text:
-                            texts.append(cell.text)
-    return "\n".join(texts)
-
-
-__all__ = ["extract_pptx"]
+        if slide_idx <= start:
+            continue
+        texts: List[str] = [slide_marker(slide_idx)]
+        texts.extend(_shape_texts(slide.shapes))
+        if slide.has_notes_slide and slide.notes_slide.notes_text_frame is not None:
+            notes = slide.notes_slide.notes_text_frame.text
+            if notes:
+                texts.append(notes)
+        yield slide_idx, "\n".join(texts)
+
+
+def iter_pptx_slides(path: Path, workers: int = 1) -> Iterator[Tuple[int, str]]:
+    """Yield ``(slide_number, text)`` per slide, tagged with ``[Slide N]`` and followed by speaker notes.
+
+    The zip/XML fast path is tried first; python-pptx takes over from the
+    first slide not yet produced if it fails.
+    """
+    produced = 0
+    try:
+        for number, text in iter_pptx_slides_via_xml(path, workers):
+            produced = number
+            yield number, text
+        return
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        LOGGER.warning("Fast PPTX extraction failed, falling back to python-pptx: %s", exc)
+    yield from iter_pptx_slides_via_python_pptx(path, start=produced)
+
+
+def extract_pptx(path: Path, workers: int = 1) -> str:
+    """Extract slide text (zip/XML fast path, python-pptx fallback)."""
+    return "\n".join(text for _, text in iter_pptx_slides(path, workers))
+
+
+__all__ = [
+    "slide_parts",
+    "iter_pptx_slides",
+    "iter_pptx_slides_via_xml",
+    "iter_pptx_slides_via_python_pptx",
+    "extract_pptx",
+]
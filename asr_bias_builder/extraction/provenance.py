@@ -0,0 +1,109 @@
+"""Character-offset → slide provenance for extracted deck text."""
+from __future__ import annotations
+
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROVENANCE_SUFFIX = ".provenance.json"
+PROVENANCE_VERSION = 1
+
+
+class ProvenanceIndex:
+    """Sorted start offsets of every page line in the deck text, with their slide and line.
+
+    Backed by three parallel ``array`` columns; lookups bisect the offsets, so
+    mapping a match position back to its slide is O(log n). ``line`` is the
+    0-based line within the page (always 0 unless ``preserve_structure`` is on).
+    """
+
+    def __init__(self) -> None:
+        self.offsets = array("q")
+        self.pages = array("l")
+        self.lines = array("l")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, offset: int, page: int, line: int = 0) -> None:
+        """Append an entry; offsets must be added in increasing order."""
+        self.offsets.append(offset)
+        self.pages.append(page)
+        self.lines.append(line)
+
+    def locate(self, offset: int) -> Optional[Tuple[int, int]]:
+        """Return ``(page, line)`` containing ``offset`` or ``None`` before the first page."""
+        idx = bisect_right(self.offsets, offset) - 1
+        if idx < 0:
+            return None
+        return self.pages[idx], self.lines[idx]
+
+    def page_at(self, offset: int) -> Optional[int]:
+        location = self.locate(offset)
+        return location[0] if location else None
+
+    def pages_between(self, start: int, end: int) -> List[int]:
+        """Sorted pages overlapping the half-open span ``[start, end)``."""
+        first = max(0, bisect_right(self.offsets, start) - 1)
+        last = bisect_left(self.offsets, end)
+        return sorted(set(self.pages[first:last]))
+
+    def find_pages(self, text_lower: str, needle: str) -> List[int]:
+        """Pages containing ``needle`` (case-insensitive substring, like ``count_occurrences``)."""
+        needle = needle.lower()
+        if not needle or not len(self):
+            return []
+        pages = set()
+        idx = text_lower.find(needle)
+        while idx != -1:
+            page = self.page_at(idx)
+            if page is not None:
+                pages.add(page)
+            idx = text_lower.find(needle, idx + len(needle))
+        return sorted(pages)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": PROVENANCE_VERSION,
+            "offsets": self.offsets.tolist(),
+            "pages": self.pages.tolist(),
+            "lines": self.lines.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "ProvenanceIndex":
+        index = cls()
+        index.offsets.extend(data.get("offsets", []))
+        index.pages.extend(data.get("pages", []))
+        index.lines.extend(data.get("lines", []))
+        if not len(index.offsets) == len(index.pages) == len(index.lines):
+            raise ValueError("Corrupt provenance index: column lengths differ")
+        return index
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "ProvenanceIndex":
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def provenance_path(deck_text_path: Path) -> Path:
+    """Sidecar location for ``deck_text_path`` (``deck_text.txt`` → ``deck_text.provenance.json``)."""
+    return deck_text_path.with_name(deck_text_path.stem + PROVENANCE_SUFFIX)
+
+
+def load_provenance(deck_text_path: Path) -> Optional[ProvenanceIndex]:
+    """Load the sidecar index next to ``deck_text_path`` if extraction wrote one."""
+    path = provenance_path(deck_text_path)
+    if not path.exists():
+        return None
+    try:
+        return ProvenanceIndex.load(path)
+    except (ValueError, TypeError):
+        return None
+
+
+__all__ = ["PROVENANCE_SUFFIX", "ProvenanceIndex", "load_provenance", "provenance_path"]
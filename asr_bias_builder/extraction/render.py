@@ -0,0 +1,259 @@
+"""Page rendering for OCR: adaptive DPI, binarization, and perceptual-hash dedup."""
+from __future__ import annotations
+
+import time
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .ocr_engine import OcrPool, RawImage
+from .stats import ExtractionStats
+
+try:
+    import fitz  # type: ignore
+except ImportError:  # pragma: no cover
+    fitz = None  # type: ignore
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover
+    Image = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+# Glyph height (pixels) Tesseract reads reliably; the smallest font on the page is rendered at least this tall.
+TARGET_TEXT_PX = 28
+# Thumbnail width (pixels per hash column) rendered for perceptual hashing.
+HASH_RENDER_SCALE = 4
+# Hash matches are confirmed on a render this wide; any pixel differing by more than the tolerance rejects the match.
+VERIFY_RENDER_WIDTH = 1024
+VERIFY_TOLERANCE = 48
+
+
+def page_dpi(page, min_dpi: int = 100, max_dpi: int = 300, default_dpi: int = 200) -> int:
+    """Pick a render DPI from the page layout.
+
+    Raster pages render at the native resolution of their largest image
+    (upsampling adds nothing); pages with a partial text layer render so the
+    smallest font reaches ``TARGET_TEXT_PX``.
+    """
+    page_rect = page.rect
+    best_area = 0.0
+    dpi: Optional[float] = None
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if bbox.is_empty or not info.get("width"):
+            continue
+        if abs(bbox) > best_area:
+            best_area = abs(bbox)
+            dpi = info["width"] * 72.0 / bbox.width
+    if dpi is None:
+        sizes = [
+            span["size"]
+            for block in page.get_text("dict")["blocks"]
+            for line in block.get("lines", [])
+            for span in line["spans"]
+            if span["text"].strip() and span["size"] > 0
+        ]
+        dpi = TARGET_TEXT_PX * 72.0 / min(sizes) if sizes else default_dpi
+    return int(min(max_dpi, max(min_dpi, dpi)))
+
+
+def otsu_threshold(histogram: Sequence[int]) -> int:
+    """Return the grey level that best separates a 256-bin histogram into ink and paper."""
+    total = sum(histogram)
+    if not total:
+        return 127
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = 0
+    weighted_background = 0.0
+    best_level, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        background += count
+        if not background:
+            continue
+        foreground = total - background
+        if not foreground:
+            break
+        weighted_background += level * count
+        mean_back = weighted_background / background
+        mean_fore = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_back - mean_fore) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def binarize(image: RawImage) -> RawImage:
+    """Convert to grayscale and apply an Otsu threshold (NumPy when available, else Pillow)."""
+    if image.mode != "L":
+        gray = image.to_pil().convert("L")
+        image = RawImage(gray.width, gray.height, "L", gray.tobytes())
+    if np is not None:
+        pixels = np.frombuffer(image.samples, dtype=np.uint8)
+        level = otsu_threshold(np.bincount(pixels, minlength=256).tolist())
+        samples = np.where(pixels > level, 255, 0).astype(np.uint8).tobytes()
+        return RawImage(image.width, image.height, "L", samples)
+    gray = image.to_pil()
+    level = otsu_threshold(gray.histogram())
+    return RawImage(image.width, image.height, "L", gray.point(lambda v: 255 if v > level else 0).tobytes())
+
+
+def dhash(page, hash_size: int = 16) -> int:
+    """Difference hash of a low-resolution grayscale render (``hash_size``² bits)."""
+    zoom = HASH_RENDER_SCALE * hash_size / max(page.rect.width, 1.0)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    thumb = Image.frombytes("L", (pix.width, pix.height), pix.samples).resize(
+        (hash_size + 1, hash_size), Image.BOX
+    )
+    pixels = thumb.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def verify_render(page) -> Tuple[int, int, bytes]:
+    """``(width, height, zlib-compressed grey samples)`` of ``page`` at ``VERIFY_RENDER_WIDTH``."""
+    zoom = VERIFY_RENDER_WIDTH / max(page.rect.width, 1.0)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    return pix.width, pix.height, zlib.compress(bytes(pix.samples), 1)
+
+
+def same_render(first: Tuple[int, int, bytes], second: Tuple[int, int, bytes]) -> bool:
+    """True when two ``verify_render`` results differ by at most ``VERIFY_TOLERANCE`` in every pixel."""
+    if first[:2] != second[:2]:
+        return False
+    left, right = zlib.decompress(first[2]), zlib.decompress(second[2])
+    if left == right:
+        return True
+    if np is not None:
+        diff = np.abs(np.frombuffer(left, dtype=np.uint8).astype(np.int16) - np.frombuffer(right, dtype=np.uint8))
+        return int(diff.max()) <= VERIFY_TOLERANCE
+    return all(abs(a - b) <= VERIFY_TOLERANCE for a, b in zip(left, right))
+
+
+class PageRenderer:
+    """Render pages for ``pool``, reusing OCR text for identical pages.
+
+    A difference hash finds candidate duplicates and a pixel comparison
+    (``same_render``) confirms them, so slides sharing a template but not
+    their text are still recognized. Hashes persist across calls, so a logo
+    or legal page repeated through the deck is recognized once. Timing and
+    dedup counters land in ``stats``.
+    """
+
+    def __init__(
+        self,
+        pool: OcrPool,
+        min_dpi: int = 100,
+        max_dpi: int = 300,
+        default_dpi: int = 200,
+        preprocess: bool = True,
+        dedup: bool = True,
+        hash_size: int = 16,
+        max_distance: int = 3,
+        stats: Optional[ExtractionStats] = None,
+    ) -> None:
+        self.pool = pool
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.default_dpi = default_dpi
+        self.preprocess = preprocess
+        self.dedup = dedup
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.stats = stats if stats is not None else ExtractionStats()
+        # Unique pages seen so far: hash and verification render; texts are keyed by position.
+        self._hashes: List[int] = []
+        self._renders: List[Tuple[int, int, bytes]] = []
+        self._texts: Dict[int, str] = {}
+
+    @classmethod
+    def from_config(cls, pool: OcrPool, cfg: dict, stats: Optional[ExtractionStats] = None) -> "PageRenderer":
+        return cls(
+            pool,
+            min_dpi=int(cfg.get("ocr_min_dpi", 100)),
+            max_dpi=int(cfg.get("ocr_max_dpi", 300)),
+            default_dpi=int(cfg.get("ocr_default_dpi", 200)),
+            preprocess=bool(cfg.get("ocr_binarize", True)),
+            dedup=bool(cfg.get("ocr_dedup", True)),
+            hash_size=int(cfg.get("ocr_dedup_hash_size", 16)),
+            max_distance=int(cfg.get("ocr_dedup_max_distance", 3)),
+            stats=stats,
+        )
+
+    def _match(self, page_hash: int, page) -> Tuple[Optional[int], Optional[Tuple[int, int, bytes]]]:
+        """Position of the unique page ``page`` duplicates (or ``None``) and its verification render."""
+        rendered = None
+        for position, known in enumerate(self._hashes):
+            if (known ^ page_hash).bit_count() <= self.max_distance:
+                if rendered is None:
+                    rendered = verify_render(page)
+                if same_render(self._renders[position], rendered):
+                    return position, rendered
+        return None, rendered
+
+    def render(self, page) -> RawImage:
+        """Rasterize ``page`` in grayscale at its adaptive DPI, binarized when enabled."""
+        dpi = page_dpi(page, self.min_dpi, self.max_dpi, self.default_dpi)
+        image = RawImage.from_pixmap(page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False))
+        return binarize(image) if self.preprocess else image
+
+    def ocr(self, doc, indices: Iterable[int]) -> Iterator[Tuple[int, str]]:
+        """Yield ``(page_index, text)`` for ``indices`` of the open ``doc`` in order."""
+        # (page index, unique-page position, duplicate?) in page order; unique pages are paired with pool results.
+        plan: Deque[Tuple[int, Optional[int], bool]] = deque()
+        render_seconds: Dict[int, float] = {}
+
+        def images() -> Iterator[RawImage]:
+            for idx in indices:
+                started = time.perf_counter()
+                page = doc[idx]
+                key: Optional[int] = None
+                if self.dedup:
+                    page_hash = dhash(page, self.hash_size)
+                    match, rendered = self._match(page_hash, page)
+                    if match is not None:
+                        plan.append((idx, match, True))
+                        continue
+                    key = len(self._hashes)
+                    self._hashes.append(page_hash)
+                    self._renders.append(rendered if rendered is not None else verify_render(page))
+                plan.append((idx, key, False))
+                image = self.render(page)
+                render_seconds[idx] = time.perf_counter() - started
+                yield image
+
+        def duplicates() -> Iterator[Tuple[int, str]]:
+            while plan and plan[0][2]:
+                idx, key, _ = plan.popleft()
+                self.stats.ocr_dedup_hits += 1
+                yield idx, self._texts[key]
+
+        try:
+            for text, seconds in self.pool.recognize_timed(images()):
+                yield from duplicates()
+                idx, key, _ = plan.popleft()
+                page_seconds = render_seconds.pop(idx, 0.0) + seconds
+                self.stats.ocr_pages += 1
+                self.stats.ocr_seconds += page_seconds
+                self.stats.ocr_page_seconds[str(idx + 1)] = round(page_seconds, 4)
+                if key is not None:
+                    self._texts[key] = text
+                yield idx, text
+            yield from duplicates()
+        finally:
+            # Forget pages whose OCR never completed so later duplicates are not matched to them.
+            done = [position for position in range(len(self._hashes)) if position in self._texts]
+            self._hashes = [self._hashes[position] for position in done]
+            self._renders = [self._renders[position] for position in done]
+            self._texts = {new: self._texts[old] for new, old in enumerate(done)}
+
+
+__all__ = ["PageRenderer", "binarize", "dhash", "otsu_threshold", "page_dpi", "same_render", "verify_render"]
@@ -6,11 +6,28 @@ import unicodedata
 from typing import List, Tuple
 
 SECTION_HEADER_MAX_WORDS = 8
+SLIDE_MARKER_RE = re.compile(r"^\[Slide \d+\]$")
+# Vertical tab (PowerPoint soft line break) and form feed end a line like newlines do.
+_LINE_BREAK_RE = re.compile(r"[\r\n\v\f\u2028\u2029]+")
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
 
 
-def normalize_text(text: str) -> str:
-    """Normalize whitespace and Unicode composition."""
+def slide_marker(number: int) -> str:
+    return f"[Slide {number}]"
+
+
+def normalize_text(text: str, preserve_structure: bool = False) -> str:
+    """Normalize whitespace and Unicode composition.
+
+    By default every whitespace run (newlines included) folds into one space.
+    With ``preserve_structure`` line breaks survive as single ``\n`` and only
+    intra-line whitespace is folded, so ``[Slide N]`` markers stay on their own line.
+    """
     text = unicodedata.normalize("NFC", text)
+    if preserve_structure:
+        text = _LINE_BREAK_RE.sub("\n", text)
+        lines = (_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+        return "\n".join(line for line in lines if line)
     text = text.replace("\r", "\n")
     text = re.sub(r"\s+", " ", text)
     text = re.sub(r" *(\n+) *", "\n", text)
@@ -39,4 +56,4 @@ def detect_sections(text: str) -> List[Tuple[str, str]]:
     return sections
 
 
-__all__ = ["normalize_text", "detect_sections"]
+__all__ = ["SLIDE_MARKER_RE", "normalize_text", "detect_sections", "slide_marker"]
@@ -0,0 +1,42 @@
+"""Counters collected while extracting deck text."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, List
+
+
+@dataclass
+class ExtractionStats:
+    """Counters for the extraction stage."""
+
+    pages: int = 0
+    characters: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    ocr_pages: int = 0
+    ocr_dedup_hits: int = 0
+    # OCR windows whose recognition failed, leaving those pages with their text layer only.
+    ocr_failures: int = 0
+    ocr_seconds: float = 0.0
+    # 1-based page number -> render + recognition seconds.
+    ocr_page_seconds: Dict[str, float] = field(default_factory=dict)
+    boilerplate_patterns: int = 0
+    boilerplate_lines_removed: int = 0
+    # ocr_normalizations patterns disabled after overrunning regex_timeout_seconds.
+    regex_timeouts: List[str] = field(default_factory=list)
+    # strategy name -> {"seconds", "pages", "status" (ok/empty/abandoned/failed), "reason"}.
+    strategies: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+    def merge(self, other: "ExtractionStats") -> None:
+        """Add counters collected elsewhere (e.g. in an extraction subprocess)."""
+        for item in fields(self):
+            mine, theirs = getattr(self, item.name), getattr(other, item.name)
+            if isinstance(mine, dict):
+                mine.update(theirs)
+            elif isinstance(mine, list):
+                mine.extend(item for item in theirs if item not in mine)
+            else:
+                setattr(self, item.name, mine + theirs)
+
+
+__all__ = ["ExtractionStats"]
@@ -1,6 +1,52 @@
 """LLM integration helpers."""
 
-from .claude import DEFAULT_CHUNK_SIZE, chunk_text, encode_message, run_claude, write_stream_file
+from .cache import LlmCache, chunk_cache_salt, llm_cache_key, open_llm_cache
+from .claude import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_prompt,
+    chunk_text,
+    claude_command,
+    encode_message,
+    run_claude,
+    run_claude_fanout,
+    PromptsProcess,
+    run_prompts,
+    write_stream_file,
+)
+from .chunking import DEFAULT_CHUNK_TOKENS, TextChunk, estimate_tokens, pack_chunks, split_sections
+from .classify import LLM_MODES, choose_llm_mode, classification_items, classify_prompt, run_classification
+from .compaction import CompactionReport, compact_deck
+from .merge import merge_terms, parse_result
 from .parser import parse_stream
 
-__all__ = ["DEFAULT_CHUNK_SIZE", "chunk_text", "encode_message", "write_stream_file", "run_claude", "parse_stream"]
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "CompactionReport",
+    "DEFAULT_CHUNK_TOKENS",
+    "LLM_MODES",
+    "LlmCache",
+    "PromptsProcess",
+    "TextChunk",
+    "chunk_prompt",
+    "chunk_cache_salt",
+    "chunk_text",
+    "choose_llm_mode",
+    "classification_items",
+    "classify_prompt",
+    "claude_command",
+    "compact_deck",
+    "estimate_tokens",
+    "encode_message",
+    "write_stream_file",
+    "run_claude",
+    "run_claude_fanout",
+    "run_classification",
+    "run_prompts",
+    "merge_terms",
+    "pack_chunks",
+    "parse_result",
+    "parse_stream",
+    "llm_cache_key",
+    "open_llm_cache",
+    "split_sections",
+]
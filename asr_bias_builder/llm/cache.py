@@ -0,0 +1,82 @@
+"""Persistent cache of Claude responses keyed on deck text, system prompt and model."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..utils.cache import DiskCache, digest, file_digest
+
+# Bump when the request format changes so stale responses stop matching.
+LLM_CACHE_VERSION = "1"
+_SUFFIX = ".json"
+
+
+def llm_cache_key(deck_text: str, schema_file: Path, model: str) -> str:
+    """Hash the whitespace-normalized deck text with the system prompt file and the model name."""
+    return digest(LLM_CACHE_VERSION, " ".join(deck_text.split()), file_digest(schema_file), model)
+
+
+def chunk_cache_salt(schema_file: Path, model: str) -> str:
+    """Per-chunk entries are keyed on ``digest(salt, chunk.key)``; the salt covers prompt and model."""
+    return digest(LLM_CACHE_VERSION, "chunk", file_digest(schema_file), model)
+
+
+class LlmCache:
+    """Parsed candidates plus raw output per key, with a TTL on top of ``DiskCache``'s LRU size cap.
+
+    Entries record when they were written (reads refresh the file's mtime for
+    LRU, so age cannot come from the file) and how long the LLM call took,
+    which a hit reports as ``seconds_saved``.
+    """
+
+    def __init__(self, cache: DiskCache, ttl_seconds: Optional[float] = None) -> None:
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        """Return ``{"candidates", "raw", "seconds", "created"}`` for a fresh entry, else ``None``."""
+        text = self.cache.get_text(key, _SUFFIX)
+        entry = None
+        if text:
+            try:
+                entry = json.loads(text)
+            except json.JSONDecodeError:
+                entry = None
+        if entry is not None and self.ttl_seconds and time.time() - float(entry.get("created", 0)) > self.ttl_seconds:
+            self.cache.delete(key, _SUFFIX)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.seconds_saved += float(entry.get("seconds", 0.0))
+        return entry
+
+    def put(self, key: str, candidates: object, raw: str, seconds: float) -> None:
+        entry = {"created": time.time(), "seconds": round(seconds, 3), "candidates": candidates, "raw": raw}
+        self.cache.put_text(key, json.dumps(entry, ensure_ascii=False), _SUFFIX)
+
+    def metrics(self, prefix: str = "llm_cache") -> Dict[str, float]:
+        return {
+            f"{prefix}_hits": self.hits,
+            f"{prefix}_misses": self.misses,
+            f"{prefix}_seconds_saved": round(self.seconds_saved, 3),
+        }
+
+
+def open_llm_cache(cfg: dict, cache_dir: Optional[Path] = None) -> Optional[LlmCache]:
+    """Return the LLM cache configured by ``cache_dir``/``llm_cache_max_mb``/``llm_cache_ttl_days``, if enabled."""
+    root = cache_dir or cfg.get("cache_dir")
+    if not root:
+        return None
+    max_bytes = int(float(cfg.get("llm_cache_max_mb", 256)) * 1024 * 1024)
+    ttl_days = float(cfg.get("llm_cache_ttl_days", 30) or 0)
+    return LlmCache(DiskCache(Path(root).expanduser() / "llm", max_bytes=max_bytes), ttl_days * 86400 or None)
+
+
+__all__ = ["LLM_CACHE_VERSION", "LlmCache", "chunk_cache_salt", "llm_cache_key", "open_llm_cache"]
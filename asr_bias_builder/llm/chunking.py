@@ -0,0 +1,112 @@
+"""Slide-aligned, content-defined chunking of deck text for per-chunk LLM calls."""
+from __future__ import annotations
+
+import re
+from typing import List, NamedTuple
+
+from ..extraction.sections import SLIDE_MARKER_RE
+from ..utils.cache import digest
+
+DEFAULT_CHUNK_TOKENS = 12_000
+# Rough English/code average for Claude tokenization; only used to size chunks.
+CHARS_PER_TOKEN = 4
+# A chunk may close early, once a quarter full, after a section whose hash hits the boundary divisor.
+MIN_FILL_DIVISOR = 4
+# Typical slide size in tokens; sets the boundary divisor from the budget alone, never from the deck.
+BOUNDARY_SECTION_TOKENS = 100
+
+_SLIDE_SPLIT_RE = re.compile(r"(?m)^(?=\[Slide \d+\]$)")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class TextChunk(NamedTuple):
+    """Chunk text plus a hash of its content that ignores slide numbers and whitespace."""
+
+    text: str
+    key: str
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _section_key(section: str) -> str:
+    lines = (line for line in section.splitlines() if not SLIDE_MARKER_RE.match(line.strip()))
+    return digest(" ".join(" ".join(lines).split()))
+
+
+def _split_words(section: str, max_chars: int) -> List[str]:
+    pieces: List[str] = []
+    while len(section) > max_chars:
+        cut = section.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        pieces.append(section[:cut])
+        section = section[cut:].lstrip()
+    if section:
+        pieces.append(section)
+    return pieces
+
+
+def split_sections(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """``[Slide N]`` sections, else lines, else sentences; any longer than ``max_tokens`` is cut between words."""
+    if _SLIDE_SPLIT_RE.search(text):
+        sections = [part for part in _SLIDE_SPLIT_RE.split(text) if part.strip()]
+    elif "\n" in text.strip():
+        sections = text.splitlines(keepends=True)
+    else:
+        sections = [part + " " for part in _SENTENCE_SPLIT_RE.split(text.strip())]
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    return [piece for section in sections for piece in _split_words(section, max_chars)]
+
+
+def pack_chunks(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[TextChunk]:
+    """Pack whole sections into chunks of at most ``max_tokens`` (estimated) tokens.
+
+    Besides the budget, a chunk closes after a section whose content hash is
+    0 modulo ``divisor`` once it is a quarter full. The divisor depends on
+    ``max_tokens`` alone (about one hit per half budget of
+    ``BOUNDARY_SECTION_TOKENS``-token slides), never on the rest of the deck,
+    so after an edit the chunking resynchronizes at the next such section and
+    unchanged slides land in chunks with unchanged keys. Keys ignore slide
+    numbers, so inserting a slide does not change the keys of later chunks
+    either.
+    """
+    chunks: List[TextChunk] = []
+    parts: List[str] = []
+    keys: List[str] = []
+    tokens = 0
+
+    def close() -> None:
+        nonlocal tokens
+        if parts:
+            chunks.append(TextChunk("".join(parts).strip(), digest(*keys)))
+            parts.clear()
+            keys.clear()
+            tokens = 0
+
+    # A divisor of 1 would close every chunk at a quarter full, i.e. at fixed positions.
+    divisor = max(2, round(max_tokens / 2 / BOUNDARY_SECTION_TOKENS))
+    for section in split_sections(text, max_tokens):
+        size = estimate_tokens(section)
+        if parts and tokens + size > max_tokens:
+            close()
+        key = _section_key(section)
+        parts.append(section)
+        keys.append(key)
+        tokens += size
+        if tokens * MIN_FILL_DIVISOR >= max_tokens and int(key[:8], 16) % divisor == 0:
+            close()
+    close()
+    return chunks or [TextChunk("", digest(""))]
+
+
+__all__ = [
+    "BOUNDARY_SECTION_TOKENS",
+    "CHARS_PER_TOKEN",
+    "DEFAULT_CHUNK_TOKENS",
+    "MIN_FILL_DIVISOR",
+    "TextChunk",
+    "estimate_tokens",
+    "pack_chunks",
+    "split_sections",
+]
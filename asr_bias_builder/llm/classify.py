@@ -0,0 +1,87 @@
+"""Stage 3 classification mode: send mined seeds and their contexts to Claude instead of the deck."""
+from __future__ import annotations
+
+import json
+import subprocess
+from importlib.resources import files
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ..config import load_config
+from ..utils.cache import digest
+from .cache import LlmCache, chunk_cache_salt
+from .chunking import estimate_tokens
+from .claude import claude_command, run_prompts
+
+CONFIG = load_config()
+CLASSIFY_RESOURCE = files("asr_bias_builder.llm.prompts") / "classify.md"
+LLM_MODES = ("deck", "classify", "auto")
+CLASSIFY_BATCH_SIZE = int(CONFIG.get("llm_classify_batch_size", 80))
+CLASSIFY_CONTEXTS = int(CONFIG.get("llm_classify_contexts", 2))
+CLASSIFY_MIN_TOKENS = int(CONFIG.get("llm_classify_min_tokens", 50_000))
+
+
+def classification_items(
+    seeds: Sequence[Dict[str, object]], contexts: int = CLASSIFY_CONTEXTS
+) -> List[Dict[str, object]]:
+    """``{"term", "frequency", "contexts"}`` per seed, keeping the first ``contexts`` snippets."""
+    items = []
+    for seed in seeds:
+        term = str(seed.get("term", "")).strip()
+        if term:
+            snippets = [str(snippet) for snippet in seed.get("contexts") or []][: max(0, contexts)]
+            items.append({"term": term, "frequency": seed.get("frequency", 0), "contexts": snippets})
+    return items
+
+
+def classify_prompt(batch: Sequence[Dict[str, object]], index: int, total: int) -> str:
+    lines = "\n".join(json.dumps(item, ensure_ascii=False) for item in batch)
+    return f"[Batch {index}/{total}] Classify these {len(batch)} candidate terms.\n\n{lines}"
+
+
+def choose_llm_mode(mode: str, deck_text: str, seeds: Sequence[object], min_tokens: int = CLASSIFY_MIN_TOKENS) -> str:
+    """Resolve ``auto``: ``classify`` for decks with seeds over ``min_tokens`` estimated tokens, else ``deck``."""
+    if mode not in LLM_MODES:
+        raise ValueError(f"Unknown llm_mode {mode!r}; expected one of {', '.join(LLM_MODES)}")
+    if mode == "auto":
+        return "classify" if seeds and estimate_tokens(deck_text) > min_tokens else "deck"
+    return mode
+
+
+def run_classification(
+    seeds: Sequence[Dict[str, object]],
+    prompt_file: Path,
+    output_path: Path,
+    model: str,
+    permission_flags: Optional[List[str]] = None,
+    batch_size: int = CLASSIFY_BATCH_SIZE,
+    concurrency: int = 4,
+    cache: Optional[LlmCache] = None,
+    contexts: int = CLASSIFY_CONTEXTS,
+) -> subprocess.CompletedProcess[str]:
+    """Classify ``seeds`` in batches of ``batch_size``, ``concurrency`` calls at a time.
+
+    The merged result is written to ``output_path`` in the ``llm_candidates.json``
+    schema (``run_prompts``). With a ``cache``, each batch's response is
+    stored under a hash of the batch, the prompt file and the model.
+    """
+    items = classification_items(seeds, contexts)
+    size = max(1, batch_size)
+    batches = [items[start : start + size] for start in range(0, len(items), size)]
+    total = len(batches)
+    prompts = [classify_prompt(batch, index, total) for index, batch in enumerate(batches, start=1)]
+    salt = chunk_cache_salt(prompt_file, model) if cache is not None else ""
+    keys = [digest(salt, json.dumps(batch, ensure_ascii=False, sort_keys=True)) for batch in batches]
+    base_cmd = claude_command(prompt_file, model, permission_flags)
+    return run_prompts(prompts, base_cmd, output_path, concurrency, cache, keys)
+
+
+__all__ = [
+    "CLASSIFY_BATCH_SIZE",
+    "CLASSIFY_RESOURCE",
+    "LLM_MODES",
+    "choose_llm_mode",
+    "classification_items",
+    "classify_prompt",
+    "run_classification",
+]
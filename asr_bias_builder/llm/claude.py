@@ -4,9 +4,19 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
+
+from ..utils.cache import digest
+from .cache import LlmCache, chunk_cache_salt
+from .chunking import DEFAULT_CHUNK_TOKENS, estimate_tokens, pack_chunks
+from .merge import merge_terms, parse_result
+
+LOGGER = logging.getLogger("asr_bias_builder.llm")
 
 DEFAULT_CHUNK_SIZE = 50_000
 
@@ -19,6 +29,10 @@ def chunk_text(text: str, chunk_size: int) -> Iterable[str]:
         yield text[idx : idx + chunk_size]
 
 
+def chunk_prompt(chunk: str, index: int, total: int) -> str:
+    return f"[Chunk {index}/{total}]\n\n{chunk}"
+
+
 def encode_message(chunk: str, index: int, total: int) -> str:
     payload = {
         "type": "user",
@@ -27,7 +41,7 @@ def encode_message(chunk: str, index: int, total: int) -> str:
             "content": [
                 {
                     "type": "text",
-                    "text": f"[Chunk {index}/{total}]\n\n{chunk}",
+                    "text": chunk_prompt(chunk, index, total),
                 }
             ],
         },
@@ -45,6 +59,114 @@ def write_stream_file(deck_text: Path, output_jsonl: Path, chunk_size: int = DEF
     return payloads
 
 
+class PromptsProcess(subprocess.CompletedProcess):
+    """``CompletedProcess`` of ``run_prompts``; ``failed`` counts requests that errored or returned no JSON."""
+
+    def __init__(self, args, returncode: int, stdout: str, stderr: str, failed: int = 0) -> None:
+        super().__init__(args, returncode, stdout=stdout, stderr=stderr)
+        self.failed = failed
+
+
+def claude_command(system_prompt_file: Path, model: str, permission_flags: Optional[List[str]] = None) -> List[str]:
+    """Base ``claude --print`` command line with ``system_prompt_file`` as the system prompt."""
+    cmd = ["claude", "--print", "--model", model, "--system-prompt-file", str(system_prompt_file)]
+    if permission_flags:
+        cmd.extend(permission_flags)
+    else:
+        cmd.append("--dangerously-skip-permissions")
+    return cmd
+
+
+def run_prompts(
+    prompts: List[str],
+    base_cmd: List[str],
+    output_path: Path,
+    concurrency: int = 4,
+    cache: Optional[LlmCache] = None,
+    keys: Optional[List[str]] = None,
+) -> PromptsProcess:
+    """Send each prompt to its own ``claude`` call, ``concurrency`` at a time, and merge the ``terms``.
+
+    With a ``cache``, responses are stored under the matching ``keys`` entry
+    and prompts with a cached response are not sent again. Raw per-prompt
+    stdout goes to ``<stem>_raw.json`` as a JSON list; the merged payload
+    (``merge_terms``) to ``output_path``. The returned process carries the
+    first non-zero exit code, every failed prompt's stderr and, as
+    ``failed``, how many requests errored or returned no parseable JSON
+    (their terms are missing from the merged payload).
+    """
+    total = len(prompts)
+    cmd = base_cmd + ["--output-format", "json"]
+    cached = [cache.get(key) for key in keys] if cache is not None and keys is not None else [None] * total
+
+    def call(index: int) -> Tuple[subprocess.CompletedProcess[str], float]:
+        started = time.monotonic()
+        process = subprocess.run(cmd, input=prompts[index - 1], text=True, capture_output=True, check=False)
+        return process, time.monotonic() - started
+
+    pending = [index for index in range(1, total + 1) if cached[index - 1] is None]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pending) or 1))) as pool:
+        calls = dict(zip(pending, pool.map(call, pending)))
+
+    raws: List[str] = []
+    payloads = []
+    errors = []
+    returncode = 0
+    failed = 0
+    for index in range(1, total + 1):
+        entry = cached[index - 1]
+        if entry is not None:
+            raws.append(str(entry.get("raw", "")))
+            payloads.append(entry.get("candidates"))
+            continue
+        process, seconds = calls[index]
+        raws.append(process.stdout)
+        if process.returncode != 0:
+            returncode = returncode or process.returncode
+            failed += 1
+            errors.append(f"request {index}/{total}: {process.stderr.strip()}")
+            continue
+        payload = parse_result(process.stdout)
+        if payload is None:
+            LOGGER.warning("Request %d/%d returned no parseable JSON", index, total)
+            failed += 1
+            continue
+        if cache is not None and keys is not None:
+            cache.put(keys[index - 1], payload, process.stdout, seconds)
+        payloads.append(payload)
+    if cache is not None:
+        LOGGER.info("Sent %d of %d requests (%d from cache)", len(pending), total, total - len(pending))
+
+    raw_path = output_path.parent / f"{output_path.stem}_raw.json"
+    raw_path.write_text(json.dumps(raws, ensure_ascii=False), encoding="utf-8")
+    merged = json.dumps(merge_terms(payloads), ensure_ascii=False, indent=2)
+    output_path.write_text(merged, encoding="utf-8")
+    return PromptsProcess(cmd, returncode, merged, "\n".join(errors), failed)
+
+
+def run_claude_fanout(
+    text: str,
+    base_cmd: List[str],
+    output_path: Path,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = 4,
+    cache: Optional[LlmCache] = None,
+    cache_salt: str = "",
+) -> subprocess.CompletedProcess[str]:
+    """Send each chunk of ``text`` to its own ``claude`` call and merge the ``terms`` (``run_prompts``).
+
+    Chunks are whole slides packed up to ``max_tokens`` (``pack_chunks``).
+    With a ``cache`` each chunk's response is stored under its content key
+    (salted with ``cache_salt``), so a revised deck only re-queries chunks
+    whose slides changed.
+    """
+    chunks = pack_chunks(text, max(1, max_tokens))
+    total = len(chunks)
+    prompts = [chunk_prompt(chunk.text, index, total) for index, chunk in enumerate(chunks, start=1)]
+    keys = [digest(cache_salt, chunk.key) for chunk in chunks]
+    return run_prompts(prompts, base_cmd, output_path, concurrency, cache, keys)
+
+
 def run_claude(
     deck_text: Path,
     schema_file: Path,
@@ -53,23 +175,34 @@ def run_claude(
     permission_flags: Optional[List[str]] = None,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     stream_threshold_bytes: int = 80_000,
+    concurrency: int = 1,
+    chunk_tokens: Optional[int] = None,
+    chunk_cache: Optional[LlmCache] = None,
 ) -> subprocess.CompletedProcess[str]:
-    """Invoke the Claude CLI, switching to stream mode when needed."""
+    """Invoke the Claude CLI, switching to stream mode when needed.
+
+    With ``concurrency`` > 1, decks over the threshold are sent as
+    independent per-chunk calls instead (``run_claude_fanout``), in
+    slide-aligned chunks of ``chunk_tokens`` (default ``chunk_size`` chars
+    worth of tokens), whose responses go to ``chunk_cache`` when given. A
+    cache alone never changes the call pattern. The single streaming session
+    splits at fixed offsets (``chunk_text``) and returns one answer for the
+    whole deck, so it bypasses ``chunk_cache``.
+    """
     text_content = deck_text.read_text(encoding="utf-8")
     payload = text_content
-    base_cmd = [
-        "claude",
-        "--print",
-        "--model",
-        model,
-        "--system-prompt-file",
-        str(schema_file),
-    ]
-    if permission_flags:
-        base_cmd.extend(permission_flags)
-    else:
-        base_cmd.append("--dangerously-skip-permissions")
+    base_cmd = claude_command(schema_file, model, permission_flags)
 
+    if len(text_content.encode("utf-8")) > stream_threshold_bytes and concurrency > 1:
+        return run_claude_fanout(
+            text_content,
+            base_cmd,
+            output_path,
+            chunk_tokens or estimate_tokens(" " * chunk_size),
+            concurrency,
+            cache=chunk_cache,
+            cache_salt=chunk_cache_salt(schema_file, model) if chunk_cache is not None else "",
+        )
     if len(text_content.encode("utf-8")) > stream_threshold_bytes:
         stream_file = output_path.parent / "deck_stream.jsonl"
         payloads = write_stream_file(deck_text, stream_file, chunk_size)
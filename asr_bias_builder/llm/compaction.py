@@ -0,0 +1,219 @@
+"""Token-budgeted compaction of deck text before it is sent to Claude."""
+from __future__ import annotations
+
+import logging
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config import load_config
+from ..extraction.sections import SLIDE_MARKER_RE
+from ..mining.filters import DEFAULT_SECTION_WEIGHT, FilterStats, detect_section_weight, iter_candidates
+from ..utils.cache import digest
+from .chunking import DEFAULT_CHUNK_TOKENS, estimate_tokens, split_sections
+
+LOGGER = logging.getLogger("asr_bias_builder.llm")
+
+CONFIG = load_config()
+LLM_TOKEN_BUDGET = int(CONFIG.get("llm_token_budget", 0) or 0)
+NEAR_DUPLICATE_THRESHOLD = float(CONFIG.get("llm_near_duplicate_threshold", 0.85))
+NUMERIC_LINE_RATIO = float(CONFIG.get("llm_numeric_line_ratio", 0.5))
+COMPACTION_SECTION_WEIGHTS = {
+    key.lower(): float(value) for key, value in (CONFIG.get("llm_compaction_section_weights") or {}).items()
+}
+SHINGLE_WORDS = 3
+# MinHash signature = BANDS x ROWS values; sections sharing any band are compared exactly.
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+PREVIEW_CHARS = 80
+
+
+@dataclass
+class CompactionReport:
+    """What compaction removed, in estimated tokens (``estimate_tokens``) and sections."""
+
+    budget_tokens: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tokens_saved: int = 0
+    sections: int = 0
+    sections_kept: int = 0
+    duplicate_lines: int = 0
+    numeric_lines: int = 0
+    duplicate_sections: int = 0
+    near_duplicate_sections: int = 0
+    budget_sections: int = 0
+    # One entry per dropped section: slide, reason, tokens, preview.
+    omitted: List[Dict[str, object]] = field(default_factory=list)
+
+
+def _is_numeric(line: str, ratio: float) -> bool:
+    chars = [char for char in line if char.isalnum()]
+    return bool(chars) and sum(char.isdigit() for char in chars) >= ratio * len(chars)
+
+
+def _section_weight(line: str, current: float, weights: Dict[str, float], stats: FilterStats) -> float:
+    """``detect_section_weight``, with the compaction-only ``weights`` keywords taking precedence."""
+    normalized = re.sub(r"[^a-z0-9 ]+", " ", line.lower())
+    for keyword, weight in weights.items():
+        if keyword in normalized:
+            return weight
+    return detect_section_weight(line, current, stats)
+
+
+def _shingles(words: List[str]) -> Set[int]:
+    # crc32 rather than ``hash`` so near-duplicate detection does not vary with PYTHONHASHSEED.
+    span = min(SHINGLE_WORDS, len(words))
+    return {zlib.crc32(" ".join(words[i : i + span]).encode("utf-8")) for i in range(len(words) - span + 1)}
+
+
+def _bands(shingles: Set[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    signature = [min(hash((seed, shingle)) for shingle in shingles) for seed in range(MINHASH_BANDS * MINHASH_ROWS)]
+    return [(band, tuple(signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS])) for band in range(MINHASH_BANDS)]
+
+
+class _Section:
+    __slots__ = ("index", "slide", "lines", "tokens", "score", "preview")
+
+    def __init__(self, index: int, slide: Optional[int], lines: List[str], weight: float, hits: int) -> None:
+        self.index = index
+        self.slide = slide
+        self.lines = lines
+        self.tokens = estimate_tokens("\n".join(lines)) + 1
+        self.score = weight * hits / self.tokens
+        content = [line for line in lines if not SLIDE_MARKER_RE.match(line)]
+        self.preview = content[0][:PREVIEW_CHARS] if content else ""
+
+
+def compact_deck(
+    text: str,
+    seed_terms: Iterable[str] = (),
+    budget_tokens: int = LLM_TOKEN_BUDGET,
+    near_threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    numeric_ratio: float = NUMERIC_LINE_RATIO,
+    section_weights: Optional[Dict[str, float]] = None,
+) -> Tuple[str, CompactionReport]:
+    """Return the deck text worth sending to the LLM and a report of what was left out.
+
+    Sections are ``[Slide N]`` slides (else lines or sentences, see
+    ``split_sections``). Lines repeated earlier in the deck (ignoring case and
+    whitespace) and number-heavy lines without a seed term are dropped,
+    then exact and near-duplicate sections (word-shingle Jaccard of at least
+    ``near_threshold``, candidates found by MinHash banding). With a positive
+    ``budget_tokens`` the remaining sections are ranked by seed-term hits per
+    token times their section keyword weight (``section_weights``, default
+    ``llm_compaction_section_weights``, before ``section_keyword_weights``)
+    and kept greedily until the budget is spent; kept sections stay in deck
+    order.
+    """
+    seeds = {term.lower() for term in seed_terms}
+    if section_weights is None:
+        section_weights = COMPACTION_SECTION_WEIGHTS
+    else:
+        section_weights = {key.lower(): float(value) for key, value in section_weights.items()}
+    report = CompactionReport(budget_tokens=max(0, budget_tokens), input_tokens=estimate_tokens(text))
+    seen_lines: Set[str] = set()
+    seen_sections: Set[str] = set()
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    shingle_sets: List[Set[int]] = []
+    sections: List[_Section] = []
+    weight = DEFAULT_SECTION_WEIGHT
+    weight_stats = FilterStats()
+
+    def omit(index: int, slide: Optional[int], reason: str, tokens: int, preview: str) -> None:
+        report.omitted.append(
+            {"section": index + 1, "slide": slide, "reason": reason, "tokens": tokens, "preview": preview[:PREVIEW_CHARS]}
+        )
+
+    for index, section in enumerate(split_sections(text, budget_tokens or DEFAULT_CHUNK_TOKENS)):
+        report.sections += 1
+        slide = None
+        lines: List[str] = []
+        content: List[str] = []
+        section_weight = None
+        hits = 0
+        for raw_line in section.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            if SLIDE_MARKER_RE.match(line):
+                slide = int(line[7:-1])
+                lines.append(line)
+                continue
+            weight = _section_weight(line, weight, section_weights, weight_stats)
+            if section_weight is None:
+                section_weight = weight
+            # Exact text: masking digits would fold "iPhone 15 Pro" into "iPhone 16 Pro".
+            key = " ".join(line.casefold().split())
+            if key in seen_lines:
+                report.duplicate_lines += 1
+                continue
+            seen_lines.add(key)
+            line_hits = sum(candidate.text.lower() in seeds for candidate in iter_candidates(line))
+            if not line_hits and _is_numeric(line, numeric_ratio):
+                report.numeric_lines += 1
+                continue
+            hits += line_hits
+            lines.append(line)
+            content.append(line)
+        if not content:
+            continue
+        words = " ".join(content).casefold().split()
+        section_key = digest(" ".join(words))
+        if section_key in seen_sections:
+            report.duplicate_sections += 1
+            omit(index, slide, "duplicate", estimate_tokens(section), content[0])
+            continue
+        seen_sections.add(section_key)
+        shingles = _shingles(words)
+        bands = _bands(shingles)
+        similar = {other for band in bands for other in buckets.get(band, ())}
+        if any(
+            len(shingles & shingle_sets[other]) >= near_threshold * len(shingles | shingle_sets[other])
+            for other in similar
+        ):
+            report.near_duplicate_sections += 1
+            omit(index, slide, "near_duplicate", estimate_tokens(section), content[0])
+            continue
+        position = len(shingle_sets)
+        shingle_sets.append(shingles)
+        for band in bands:
+            buckets.setdefault(band, []).append(position)
+        sections.append(_Section(index, slide, lines, section_weight or DEFAULT_SECTION_WEIGHT, hits))
+
+    kept = sections
+    if report.budget_tokens:
+        kept = []
+        spent = 0
+        for section in sorted(sections, key=lambda item: (-item.score, item.index)):
+            if spent + section.tokens <= report.budget_tokens:
+                kept.append(section)
+                spent += section.tokens
+            else:
+                report.budget_sections += 1
+                omit(section.index, section.slide, "budget", section.tokens, section.preview)
+        kept.sort(key=lambda item: item.index)
+    report.omitted.sort(key=lambda entry: entry["section"])
+    compacted = "\n".join(line for section in kept for line in section.lines)
+    report.sections_kept = len(kept)
+    report.output_tokens = estimate_tokens(compacted)
+    report.tokens_saved = report.input_tokens - report.output_tokens
+    LOGGER.info(
+        "Compacted LLM input from ~%d to ~%d tokens (%d of %d sections kept)",
+        report.input_tokens,
+        report.output_tokens,
+        report.sections_kept,
+        report.sections,
+    )
+    return compacted, report
+
+
+__all__ = [
+    "CompactionReport",
+    "LLM_TOKEN_BUDGET",
+    "NEAR_DUPLICATE_THRESHOLD",
+    "COMPACTION_SECTION_WEIGHTS",
+    "NUMERIC_LINE_RATIO",
+    "compact_deck",
+]
@@ -0,0 +1,90 @@
+"""Reduce per-chunk Claude responses into one ``llm_candidates.json`` payload."""
+from __future__ import annotations
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+from ..verification.matcher import sanitize_json_text
+
+
+def terms_of(payload: object) -> List[Dict[str, object]]:
+    """The ``terms`` entries of a response (a ``{"terms": [...]}`` object or a bare list)."""
+    if isinstance(payload, dict):
+        payload = payload.get("terms")
+    if not isinstance(payload, list):
+        return []
+    return [entry for entry in payload if isinstance(entry, dict)]
+
+
+def parse_result(stdout: str) -> Optional[object]:
+    """Decode the JSON in ``claude --output-format json`` stdout (its ``result`` text, fenced or not)."""
+    result: object = stdout
+    try:
+        envelope = json.loads(stdout)
+    except json.JSONDecodeError:
+        envelope = None
+    if isinstance(envelope, dict) and "result" in envelope:
+        result = envelope["result"]
+    elif envelope is not None:
+        return envelope
+    raw = sanitize_json_text(str(result))
+    if not raw:
+        return None
+    try:
+        return json.JSONDecoder().raw_decode(raw)[0]
+    except json.JSONDecodeError:
+        return None
+
+
+def _union(target: List[str], values: object, exclude: str = "") -> None:
+    if not isinstance(values, list):
+        return
+    seen = {value.casefold() for value in target}
+    seen.add(exclude)
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        value = " ".join(value.split())
+        if value and value.casefold() not in seen:
+            seen.add(value.casefold())
+            target.append(value)
+
+
+def merge_terms(payloads: Iterable[object]) -> Dict[str, List[Dict[str, object]]]:
+    """Merge the ``terms`` of several responses, in first-seen order.
+
+    Entries with the same canonical (case- and whitespace-insensitive) become
+    one: variants and classes are unioned, ``priority`` is the maximum,
+    ``present_in_deck`` is true if any chunk saw the term, and distinct
+    ``notes``/``page_hint`` strings are joined with ``"; "``.
+    """
+    merged: Dict[str, Dict[str, object]] = {}
+    for payload in payloads:
+        for entry in terms_of(payload):
+            canonical = " ".join(str(entry.get("canonical", "")).split())
+            if not canonical:
+                continue
+            key = canonical.casefold()
+            record = merged.get(key)
+            if record is None:
+                record = merged[key] = {"canonical": canonical, "variants": [], "classes": []}
+            _union(record["variants"], entry.get("variants"), exclude=key)
+            _union(record["classes"], entry.get("classes"))
+            try:
+                priority = float(entry["priority"])
+            except (KeyError, TypeError, ValueError):
+                priority = None
+            if priority is not None:
+                record["priority"] = max(priority, float(record.get("priority", priority)))
+            if "present_in_deck" in entry:
+                record["present_in_deck"] = bool(record.get("present_in_deck")) or bool(entry["present_in_deck"])
+            for field in ("notes", "page_hint"):
+                text = entry.get(field)
+                if isinstance(text, str) and text.strip():
+                    parts = str(record.get(field, "")).split("; ") if record.get(field) else []
+                    if text.strip() not in parts:
+                        record[field] = "; ".join(parts + [text.strip()])
+    return {"terms": list(merged.values())}
+
+
+__all__ = ["merge_terms", "parse_result", "terms_of"]
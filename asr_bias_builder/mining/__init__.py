@@ -1,5 +1,24 @@
 """Mining package public interface."""
-from .filters import FilterStats
-from .seeds import mine
+from .docfreq import DocFreqStore, open_docfreq_store
+from .filters import Candidate, FilterStats, iter_candidates
+from .occurrences import OccurrenceIndex
+from .phrases import Phrase, mine_phrases
+from .seeds import mine, mine_pages
+from .state import MiningState, mine_chunks
+from .terms import TermTable
 
-__all__ = ["mine", "FilterStats"]
+__all__ = [
+    "mine",
+    "mine_pages",
+    "mine_chunks",
+    "Candidate",
+    "DocFreqStore",
+    "FilterStats",
+    "MiningState",
+    "OccurrenceIndex",
+    "Phrase",
+    "TermTable",
+    "iter_candidates",
+    "mine_phrases",
+    "open_docfreq_store",
+]
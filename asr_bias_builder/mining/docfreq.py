@@ -0,0 +1,124 @@
+"""Persistent corpus-level document frequencies for IDF weighting across decks."""
+from __future__ import annotations
+
+import math
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (doc_id TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, docs INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_terms (
+    doc_id TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (doc_id, term)
+) WITHOUT ROWID;
+"""
+
+
+def _batches(items: list) -> Iterable[list]:
+    for idx in range(0, len(items), _BATCH):
+        yield items[idx : idx + _BATCH]
+
+
+class DocFreqStore:
+    """How many recorded decks contain each (lower-cased) term, in a SQLite file.
+
+    ``record`` replaces a deck's term set, so re-running a deck never counts it
+    twice. ``weights`` looks up a whole batch of terms with keyed queries and
+    serves repeats from memory, so scoring costs one dictionary lookup per term.
+    Weights are ``log((N+1)/(df+1)) / log(N+1)``, clamped to ``[floor, 1]``:
+    a term in no other deck keeps full weight, one in every deck gets ``floor``.
+    Below ``min_docs`` recorded decks everything weighs 1.
+    """
+
+    def __init__(self, path: Path, min_docs: int = 5, floor: float = 0.2) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_docs = min_docs
+        self.floor = floor
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._df: Dict[str, int] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM documents WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    def _doc_terms(self, doc_id: str) -> Set[str]:
+        rows = self._conn.execute("SELECT term FROM document_terms WHERE doc_id = ?", (doc_id,))
+        return {term for (term,) in rows}
+
+    def record(self, doc_id: str, terms: Iterable[str]) -> None:
+        """Store ``terms`` as the term set of deck ``doc_id``, replacing any earlier record."""
+        new = {term.strip().lower() for term in terms if term.strip()}
+        with self._conn:
+            old = self._doc_terms(doc_id)
+            added, removed = sorted(new - old), sorted(old - new)
+            self._conn.execute("INSERT OR IGNORE INTO documents (doc_id) VALUES (?)", (doc_id,))
+            self._conn.executemany(
+                "INSERT INTO terms (term, docs) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET docs = docs + 1",
+                ((term,) for term in added),
+            )
+            self._conn.executemany("UPDATE terms SET docs = docs - 1 WHERE term = ?", ((term,) for term in removed))
+            self._conn.execute("DELETE FROM terms WHERE docs <= 0")
+            self._conn.executemany(
+                "INSERT INTO document_terms (doc_id, term) VALUES (?, ?)", ((doc_id, term) for term in added)
+            )
+            self._conn.executemany(
+                "DELETE FROM document_terms WHERE doc_id = ? AND term = ?", ((doc_id, term) for term in removed)
+            )
+        self._df.clear()
+
+    def doc_freqs(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Recorded deck count per lower-cased term (0 when unseen)."""
+        keys = {term.strip().lower() for term in terms}
+        missing = sorted(keys - self._df.keys())
+        for batch in _batches(missing):
+            self._df.update(dict.fromkeys(batch, 0))
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(f"SELECT term, docs FROM terms WHERE term IN ({placeholders})", batch)
+            self._df.update(rows)
+        return {key: self._df[key] for key in keys}
+
+    def weights(self, terms: Iterable[str], exclude: Optional[str] = None) -> Dict[str, float]:
+        """IDF weight per lower-cased term; the deck ``exclude`` (usually the current one) is left out."""
+        freqs = self.doc_freqs(terms)
+        total = len(self)
+        own: Set[str] = set()
+        if exclude is not None and exclude in self:
+            total -= 1
+            own = self._doc_terms(exclude)
+        if total < max(self.min_docs, 1):
+            return dict.fromkeys(freqs, 1.0)
+        scale = math.log(total + 1)
+        weights: Dict[str, float] = {}
+        for term, docs in freqs.items():
+            docs -= term in own
+            weights[term] = max(self.floor, min(1.0, math.log((total + 1) / (docs + 1)) / scale))
+        return weights
+
+
+def open_docfreq_store(cfg: dict) -> Optional[DocFreqStore]:
+    """Return the store configured by ``docfreq_db``, if enabled."""
+    path = cfg.get("docfreq_db")
+    if not path:
+        return None
+    return DocFreqStore(
+        Path(path).expanduser(),
+        min_docs=int(cfg.get("docfreq_min_docs", 5)),
+        floor=float(cfg.get("docfreq_floor", 0.2)),
+    )
+
+
+__all__ = ["DocFreqStore", "open_docfreq_store"]
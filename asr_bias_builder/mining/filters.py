@@ -1,17 +1,21 @@
 """Reusable filters for mining candidate terms."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 import re
-from typing import Iterable, List
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from ..config import load_config
+from ..utils.patterns import DenyMatcher
 
 CONFIG = load_config()
 STOP_WORDS = {w.lower() for w in CONFIG.get("stop_words", [])}
 MIN_TERM_LENGTH = int(CONFIG.get("min_term_length", 2))
 MAX_TERM_LENGTH = int(CONFIG.get("max_term_length", 50))
-DENY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in CONFIG.get("deny_patterns", [])]
+DENY_MATCHER = DenyMatcher(
+    CONFIG.get("deny_patterns", []),
+    timeout=float(CONFIG.get("regex_timeout_seconds", 0) or 0) or None,
+)
 DENY_EXACT = {s.lower() for s in CONFIG.get("deny_exact", [])}
 SECTION_KEYWORD_WEIGHTS = {
     key.lower(): float(value)
@@ -19,11 +23,22 @@ SECTION_KEYWORD_WEIGHTS = {
 }
 DEFAULT_SECTION_WEIGHT = float(CONFIG.get("default_section_weight", 1.0))
 USE_SECTION_WEIGHTING = bool(CONFIG.get("use_section_weighting", False))
+CONTEXT_SNIPPETS = int(CONFIG.get("seed_context_snippets", 3))
 
 PROPER_CASE_RE = re.compile(r"\b(?:[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b")
 ALL_CAPS_RE = re.compile(r"\b[A-Z0-9&/\-]{2,}\b")
 MIXED_TOKEN_RE = re.compile(r"\b[A-Za-z]+(?:[-/][A-Za-z0-9]+)+\b")
 CAMEL_RE = re.compile(r"\b[A-Z][a-z]+[A-Z][\w]+\b")
+# The four patterns above fused into one scan: a cheap start filter, then one optional lookahead
+# per kind. Possessive quantifiers mark runs that never need backtracking, so matches are identical.
+CANDIDATE_KINDS = ("proper", "caps", "mixed", "camel")
+CANDIDATE_RE = re.compile(
+    r"\b(?=[A-Z0-9&/\-]{2}|[A-Z][a-z]|[A-Za-z]++[-/])"
+    r"(?=([A-Z][a-z]++(?:\s+[A-Z][a-z]++){0,3}\b))?"
+    r"(?=([A-Z0-9&/\-]{2,}\b))?"
+    r"(?=([A-Za-z]++(?:[-/][A-Za-z0-9]++)+\b))?"
+    r"(?=([A-Z][a-z]++[A-Z]\w++))?"
+)
 NUMBER_RE = re.compile(r"^\d{1,4}(?:[./-]\d{1,4})?$")
 SECTION_HEADER_MAX_WORDS = 8
 
@@ -34,10 +49,42 @@ class FilterStats:
 
     stop_words: int = 0
     numbers: int = 0
-    deny_patterns: int = 0
+    # deny pattern -> terms it rejected.
+    deny_patterns: Dict[str, int] = field(default_factory=dict)
+    deny_exact: int = 0
+    # deny patterns disabled after overrunning regex_timeout_seconds.
+    regex_timeouts: List[str] = field(default_factory=list)
     length: int = 0
     total_filtered: int = 0
     section_weight_hits: int = 0
+    boilerplate_lines: int = 0
+    # multi-word phrases added by the phrase miner.
+    phrases: int = 0
+
+    @property
+    def pattern_rejects(self) -> int:
+        return sum(self.deny_patterns.values()) + self.deny_exact
+
+    def reject(self, reason: str, pattern: Optional[str] = None) -> None:
+        """Count a term rejected by the ``reason`` filter (and deny ``pattern``)."""
+        if pattern is not None:
+            self.deny_patterns[pattern] = self.deny_patterns.get(pattern, 0) + 1
+        else:
+            setattr(self, reason, getattr(self, reason) + 1)
+        self.total_filtered += 1
+
+    def merge(self, other: "FilterStats") -> None:
+        """Fold the counters of another chunk into this one."""
+        for item in fields(self):
+            mine, theirs = getattr(self, item.name), getattr(other, item.name)
+            if isinstance(mine, dict):
+                for name, count in theirs.items():
+                    mine[name] = mine.get(name, 0) + count
+            elif isinstance(mine, list):
+                mine.extend(entry for entry in theirs if entry not in mine)
+                mine.sort()
+            else:
+                setattr(self, item.name, mine + theirs)
 
     def log(self, output_count: float) -> None:
         from sys import stderr
@@ -45,15 +92,51 @@ class FilterStats:
         msg = (
             f"[mine_terms] filter_stats "
             f"stop_words={self.stop_words} numbers={self.numbers} "
-            f"patterns={self.deny_patterns} length={self.length} "
+            f"patterns={self.pattern_rejects} length={self.length} "
             f"filtered_total={self.total_filtered} section_weight_hits={self.section_weight_hits} "
+            f"boilerplate_lines={self.boilerplate_lines} regex_timeouts={len(self.regex_timeouts)} "
+            f"phrases={self.phrases} "
             f"output_terms={int(output_count)}"
         )
         print(msg, file=stderr)
 
 
+class Candidate(NamedTuple):
+    """A candidate span; ``text`` is already normalized."""
+
+    kind: str
+    start: int
+    end: int
+    text: str
+
+
+def iter_candidates(text: str) -> Iterator[Candidate]:
+    """Lazily yield every candidate of each kind in one pass over ``text``.
+
+    Yields the same spans as running ``findall`` with each of the four kind
+    patterns (in position order rather than grouped by kind). Only proper-case
+    phrases can contain whitespace, so only they are re-folded.
+    """
+    proper_end = caps_end = mixed_end = 0
+    for match in CANDIDATE_RE.finditer(text):
+        _, proper, caps, mixed, camel = match.regs
+        # Each kind resumes after its own previous match, as findall would.
+        if proper[0] >= proper_end:
+            proper_end = proper[1]
+            yield Candidate("proper", proper[0], proper[1], " ".join(text[proper[0] : proper[1]].split()))
+        if caps[0] >= caps_end:
+            caps_end = caps[1]
+            yield Candidate("caps", caps[0], caps[1], text[caps[0] : caps[1]])
+        if mixed[0] >= mixed_end:
+            mixed_end = mixed[1]
+            yield Candidate("mixed", mixed[0], mixed[1], text[mixed[0] : mixed[1]])
+        if camel[0] >= 0:
+            # A camel-case match is a whole word, so it never overlaps the previous one.
+            yield Candidate("camel", camel[0], camel[1], text[camel[0] : camel[1]])
+
+
 def extract_candidates_from_line(text: str) -> List[str]:
-    """Return candidate entity spans from a line of deck text."""
+    """Return candidate entity spans from a line of deck text (grouped by kind)."""
     candidates: List[str] = []
     for regex in (PROPER_CASE_RE, ALL_CAPS_RE, MIXED_TOKEN_RE, CAMEL_RE):
         candidates.extend(regex.findall(text))
@@ -61,9 +144,7 @@ def extract_candidates_from_line(text: str) -> List[str]:
 
 
 def normalize_term(term: str) -> str:
-    term = term.strip()
-    term = re.sub(r"\s+", " ", term)
-    return term
+    return " ".join(term.split())
 
 
 def is_stop_word(term: str) -> bool:
@@ -80,7 +161,23 @@ def is_number_like(term: str) -> bool:
 
 
 def matches_deny_pattern(term: str) -> bool:
-    return any(pattern.search(term) for pattern in DENY_PATTERNS)
+    return DENY_MATCHER.search(term)
+
+
+def reject_reason(term: str) -> Optional[Tuple[str, Optional[str]]]:
+    """``(FilterStats counter, deny pattern or None)`` of the filter rejecting ``term``, or ``None``."""
+    if len(term) < MIN_TERM_LENGTH or len(term) > MAX_TERM_LENGTH:
+        return "length", None
+    if is_stop_word(term):
+        return "stop_words", None
+    if term.lower() in DENY_EXACT:
+        return "deny_exact", None
+    if is_number_like(term):
+        return "numbers", None
+    pattern = DENY_MATCHER.first(term)
+    if pattern is not None:
+        return "deny_patterns", pattern
+    return None
 
 
 def detect_section_weight(line: str, current_weight: float, stats: FilterStats) -> float:
@@ -104,6 +201,8 @@ def detect_section_weight(line: str, current_weight: float, stats: FilterStats)
 
 
 __all__ = [
+    "Candidate",
+    "CANDIDATE_KINDS",
     "FilterStats",
     "DEFAULT_SECTION_WEIGHT",
     "USE_SECTION_WEIGHTING",
@@ -111,6 +210,8 @@ __all__ = [
     "MIN_TERM_LENGTH",
     "MAX_TERM_LENGTH",
     "extract_candidates_from_line",
+    "iter_candidates",
+    "reject_reason",
     "normalize_term",
     "is_stop_word",
     "is_number_like",
@@ -0,0 +1,93 @@
+"""Single-pass occurrence index for a set of terms in the deck text."""
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from ..extraction.provenance import ProvenanceIndex
+from ..utils.patterns import trie_regex
+
+MAX_CONTEXT_CHARS = 80
+
+
+class OccurrenceIndex:
+    """Case-insensitive substring occurrences of many terms, found in one scan per batch of terms.
+
+    ``add_terms`` folds the new terms into one trie-shaped regex and searches
+    it from every position where some term starts (``re`` skips the others):
+    each hit is the longest term starting there, and the shorter terms that
+    are its prefixes are credited at the same position. Per term, occurrences are
+    non-overlapping left to right, matching ``str.find``/``re.findall``
+    counting. Mining fills the index for its seeds; verification reuses it
+    and adds LLM terms.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.lowered = text.lower()
+        self._positions: Dict[str, array] = {}
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add_terms(self, terms: Iterable[str]) -> None:
+        """Index every term not indexed yet with one pass over the text."""
+        new = sorted({t for t in (term.strip().lower() for term in terms) if t and t not in self._positions})
+        if not new:
+            return
+        known = set(new)
+        shorter = {term: [term[:k] for k in range(len(term) - 1, 0, -1) if term[:k] in known] for term in new}
+        positions = {term: array("q") for term in new}
+        next_free = dict.fromkeys(new, 0)
+        search = re.compile(trie_regex(new)).search
+        match = search(self.lowered)
+        while match is not None:
+            start = match.start()
+            longest = match.group()
+            for term in (longest, *shorter[longest]):
+                if start >= next_free[term]:
+                    positions[term].append(start)
+                    next_free[term] = start + len(term)
+            match = search(self.lowered, start + 1)
+        self._positions.update(positions)
+
+    def positions(self, term: str) -> List[int]:
+        """Start offsets of ``term``; the term is indexed on first use."""
+        key = term.strip().lower()
+        if key not in self._positions:
+            self.add_terms([key])
+        return self._positions[key].tolist() if key else []
+
+    def count(self, term: str) -> int:
+        return len(self.positions(term))
+
+    def contexts(self, term: str, limit: int = 3, width: int = MAX_CONTEXT_CHARS) -> List[str]:
+        """Up to ``limit`` distinct snippets around occurrences spread evenly across the deck."""
+        found = self.positions(term)
+        if not found or limit <= 0:
+            return []
+        if len(found) > limit:
+            step = (len(found) - 1) / max(limit - 1, 1)
+            found = [found[round(i * step)] for i in range(limit)]
+        length = len(term.strip())
+        snippets: List[str] = []
+        for idx in found:
+            start = max(0, idx - width // 2)
+            end = min(len(self.text), idx + length + width // 2)
+            snippet = self.text[start:end].replace("\n", " ").strip()
+            if snippet not in snippets:
+                snippets.append(snippet)
+        return snippets
+
+    def pages(self, term: str, provenance: Optional[ProvenanceIndex]) -> List[int]:
+        """Sorted slides ``term`` occurs on (empty without a provenance index)."""
+        if provenance is None or not len(provenance):
+            return []
+        return sorted({page for page in map(provenance.page_at, self.positions(term)) if page is not None})
+
+
+__all__ = ["MAX_CONTEXT_CHARS", "OccurrenceIndex"]
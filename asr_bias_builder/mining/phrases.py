@@ -0,0 +1,199 @@
+"""Frequent multi-word phrase mining over a suffix array of the token stream."""
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Dict, List, NamedTuple, Optional
+
+from .filters import CONFIG, DEFAULT_SECTION_WEIGHT, FilterStats, is_stop_word, reject_reason
+from .terms import TermTable
+
+PHRASE_MINING = bool(CONFIG.get("phrase_mining", False))
+PHRASE_MIN_COUNT = int(CONFIG.get("phrase_min_count", 3))
+PHRASE_MIN_WORDS = int(CONFIG.get("phrase_min_words", 2))
+PHRASE_MAX_WORDS = int(CONFIG.get("phrase_max_words", 6))
+PHRASE_EDGE_WORDS = {w.lower() for w in CONFIG.get("phrase_edge_words", [])}
+
+# Words (keeping inner ``.&+/'-`` as in "node.js", "AT&T") or punctuation/line breaks that end a phrase.
+TOKEN_RE = re.compile(r"(?P<word>[^\W_](?:[\w&+/'.-]*[^\W_])?)|(?P<stop>[\n.,;:!?()\[\]{}\"“”•|–—])")
+
+
+class Phrase(NamedTuple):
+    """A repeated phrase: its first surface form in the text and how often it occurs."""
+
+    text: str
+    count: int
+    words: int
+
+
+class _Tokens:
+    """Case-folded token ids with their character spans; every phrase break gets a unique id."""
+
+    def __init__(self, text: str) -> None:
+        self.ids = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.words: List[str] = []
+        vocab: Dict[str, int] = {}
+        breaks = 0
+        for match in TOKEN_RE.finditer(text):
+            word = match.group("word")
+            if word is None:
+                # Consecutive breaks collapse; a negative id never equals another token.
+                if self.ids and self.ids[-1] >= 0:
+                    breaks += 1
+                    self._append(-breaks, match)
+                continue
+            key = word.casefold()
+            token_id = vocab.get(key)
+            if token_id is None:
+                token_id = vocab[key] = len(self.words)
+                self.words.append(key)
+            self._append(token_id, match)
+
+    def _append(self, token_id: int, match: re.Match) -> None:
+        self.ids.append(token_id)
+        self.starts.append(match.start())
+        self.ends.append(match.end())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _is_edge_word(word: str) -> bool:
+    return word in PHRASE_EDGE_WORDS or is_stop_word(word)
+
+
+def suffix_array(ids: array, depth: int) -> List[int]:
+    """Suffix start positions sorted by their first ``depth`` tokens (prefix doubling).
+
+    Each round sorts by twice as many tokens as the last, so only
+    ``log2(depth)`` O(n log n) sorts are needed; ties beyond ``depth`` tokens
+    are left in arbitrary order.
+    """
+    n = len(ids)
+    # Dense ranks starting at 1; 0 stands for "past the end".
+    order = sorted(set(ids))
+    dense = {token_id: rank for rank, token_id in enumerate(order, start=1)}
+    rank = [dense[token_id] for token_id in ids]
+    positions = sorted(range(n), key=rank.__getitem__)
+    span = 1
+    while span < depth and n:
+        base = n + 2
+        keys = [rank[i] * base + (rank[i + span] if i + span < n else 0) for i in range(n)]
+        positions.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        current, previous = 0, -1
+        for pos in positions:
+            key = keys[pos]
+            if key != previous:
+                current += 1
+                previous = key
+            new_rank[pos] = current
+        rank = new_rank
+        span *= 2
+        if current == n:
+            break
+    return positions
+
+
+def _lcp(ids: array, positions: List[int], depth: int) -> List[int]:
+    """``lcp[j]``: common token prefix of suffixes ``positions[j - 1]`` and ``positions[j]``, capped at ``depth``."""
+    n = len(ids)
+    lcp = [0] * len(positions)
+    for j in range(1, len(positions)):
+        a, b = positions[j - 1], positions[j]
+        limit = min(depth, n - a, n - b)
+        length = 0
+        while length < limit and ids[a + length] == ids[b + length]:
+            length += 1
+        lcp[j] = length
+    return lcp
+
+
+def mine_phrases(
+    text: str,
+    min_count: int = PHRASE_MIN_COUNT,
+    min_words: int = PHRASE_MIN_WORDS,
+    max_words: int = PHRASE_MAX_WORDS,
+) -> List[Phrase]:
+    """Phrases of ``min_words``..``max_words`` words occurring at least ``min_count`` times, most frequent first.
+
+    Repeats are the LCP intervals of the suffix array, visited bottom-up with a
+    stack, so each distinct repeated phrase is seen once. Only maximal ones are
+    kept: a phrase whose occurrences are all preceded by the same word is part
+    of a longer phrase with the same count. Phrases never cross punctuation or
+    line breaks, and may not start or end with a stop word or one of
+    ``phrase_edge_words``.
+    """
+    tokens = _Tokens(text)
+    ids = tokens.ids
+    positions = suffix_array(ids, max_words)
+    lcp = _lcp(ids, positions, max_words)
+    found: List[Phrase] = []
+
+    def report(length: int, left: int, right: int) -> None:
+        count = right - left + 1
+        if length < min_words or count < min_count:
+            return
+        starts = positions[left : right + 1]
+        before = {ids[pos - 1] if pos > 0 else -1 for pos in starts}
+        if len(before) == 1 and next(iter(before)) >= 0:
+            return
+        first = min(starts)
+        if _is_edge_word(tokens.words[ids[first]]) or _is_edge_word(tokens.words[ids[first + length - 1]]):
+            return
+        surface = " ".join(text[tokens.starts[first] : tokens.ends[first + length - 1]].split())
+        found.append(Phrase(surface, count, length))
+
+    stack = [(0, 0)]
+    for j in range(1, len(positions) + 1):
+        current = lcp[j] if j < len(positions) else 0
+        left = j - 1
+        while current < stack[-1][0]:
+            length, left = stack.pop()
+            report(length, left, j - 1)
+        if current > stack[-1][0]:
+            stack.append((current, left))
+    found.sort(key=lambda phrase: (-phrase.count, -phrase.words, phrase.text))
+    return found
+
+
+def add_phrases(
+    table: TermTable,
+    text: str,
+    stats: FilterStats,
+    phrases: Optional[List[Phrase]] = None,
+) -> int:
+    """Run mined phrases through the filter chain and add those ``table`` lacks (case-insensitively).
+
+    Phrases count at the default section weight; returns how many were added.
+    """
+    known = {term.lower() for term in table.terms}
+    added = 0
+    for phrase in mine_phrases(text) if phrases is None else phrases:
+        key = phrase.text.lower()
+        if key in known:
+            continue
+        known.add(key)
+        rejected = reject_reason(phrase.text)
+        if rejected:
+            stats.reject(*rejected)
+            continue
+        table.add(phrase.text, phrase.count * DEFAULT_SECTION_WEIGHT)
+        added += 1
+    stats.phrases += added
+    return added
+
+
+__all__ = [
+    "PHRASE_EDGE_WORDS",
+    "PHRASE_MAX_WORDS",
+    "PHRASE_MINING",
+    "PHRASE_MIN_COUNT",
+    "PHRASE_MIN_WORDS",
+    "Phrase",
+    "add_phrases",
+    "mine_phrases",
+    "suffix_array",
+]
@@ -5,96 +5,138 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-from collections import Counter, defaultdict
+from array import array
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
-
-from .filters import (
-    DEFAULT_SECTION_WEIGHT,
-    DENY_EXACT,
-    FilterStats,
-    MAX_TERM_LENGTH,
-    MIN_TERM_LENGTH,
-    USE_SECTION_WEIGHTING,
-    detect_section_weight,
-    extract_candidates_from_line,
-    is_number_like,
-    is_stop_word,
-    matches_deny_pattern,
-    normalize_term,
-)
-
-MAX_CONTEXT_CHARS = 80
-
-
-def build_contexts(text: str, terms: Iterable[str]) -> Dict[str, List[str]]:
-    contexts: Dict[str, List[str]] = defaultdict(list)
-    lowered = text.lower()
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..extraction.parallel import resolve_workers
+from ..extraction.provenance import ProvenanceIndex, load_provenance
+from .docfreq import DocFreqStore
+from .filters import CONTEXT_SNIPPETS, FilterStats
+from .occurrences import OccurrenceIndex
+from .phrases import PHRASE_MINING, add_phrases
+from .state import MINING_WORKERS, mine_chunks, page_chunks, text_chunks
+from .terms import TermTable
+
+
+def build_contexts(
+    text: str,
+    terms: Iterable[str],
+    limit: int = CONTEXT_SNIPPETS,
+    occurrences: Optional[OccurrenceIndex] = None,
+) -> Dict[str, List[str]]:
+    """Map each term to up to ``limit`` context snippets spread across ``text``."""
+    terms = [term.strip() for term in terms if term.strip()]
+    index = occurrences if occurrences is not None else OccurrenceIndex(text)
+    index.add_terms(terms)
+    contexts: Dict[str, List[str]] = {}
     for term in terms:
-        term_clean = term.strip()
-        if not term_clean:
-            continue
-        idx = lowered.find(term_clean.lower())
-        if idx == -1:
-            continue
-        start = max(0, idx - MAX_CONTEXT_CHARS // 2)
-        end = min(len(text), idx + len(term_clean) + MAX_CONTEXT_CHARS // 2)
-        snippet = text[start:end].replace("\n", " ")
-        contexts[term_clean].append(snippet.strip())
+        snippets = index.contexts(term, limit)
+        if snippets:
+            contexts[term] = snippets
     return contexts
 
 
-def mine(text: str, min_freq: int = 1, max_terms: int = 500) -> (List[Dict[str, object]], FilterStats):
-    stats = FilterStats()
-    counter: Counter[str] = Counter()
-    current_weight = DEFAULT_SECTION_WEIGHT
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        current_weight = detect_section_weight(line, current_weight, stats)
-        weight = current_weight if USE_SECTION_WEIGHTING else DEFAULT_SECTION_WEIGHT
-        for token in extract_candidates_from_line(line):
-            term = normalize_term(token)
-            if not term:
-                continue
-            if len(term) < MIN_TERM_LENGTH or len(term) > MAX_TERM_LENGTH:
-                stats.length += 1
-                stats.total_filtered += 1
-                continue
-            if is_stop_word(term):
-                stats.stop_words += 1
-                stats.total_filtered += 1
-                continue
-            if term.lower() in DENY_EXACT:
-                stats.deny_patterns += 1
-                stats.total_filtered += 1
-                continue
-            if is_number_like(term):
-                stats.numbers += 1
-                stats.total_filtered += 1
-                continue
-            if matches_deny_pattern(term):
-                stats.deny_patterns += 1
-                stats.total_filtered += 1
-                continue
-            counter[term] += weight
-
-    filtered = [t for t, c in counter.most_common() if c >= min_freq]
-    contexts = build_contexts(text, filtered)
+def _rank(
+    table: TermTable,
+    min_freq: int,
+    max_terms: int,
+    docfreq: Optional[DocFreqStore] = None,
+    doc_id: Optional[str] = None,
+) -> Tuple[List[int], Optional[array]]:
+    """Ids of the top terms by weighted frequency, times their IDF weight when a ``docfreq`` store is given.
+
+    With a ``doc_id`` the deck's terms are then recorded in the store.
+    """
+    weights = None
+    if docfreq is not None:
+        idf = docfreq.weights(table.terms, exclude=doc_id)
+        weights = array("d", (idf[term.lower()] for term in table.terms))
+        if doc_id is not None:
+            docfreq.record(doc_id, table.terms)
+    return table.top(max_terms, min_freq, weights), weights
+
+
+def mine(
+    text: str,
+    min_freq: int = 1,
+    max_terms: int = 500,
+    provenance: Optional[ProvenanceIndex] = None,
+    occurrences: Optional[OccurrenceIndex] = None,
+    workers: Optional[int] = None,
+    docfreq: Optional[DocFreqStore] = None,
+    doc_id: Optional[str] = None,
+    phrases: Optional[bool] = None,
+) -> (List[Dict[str, object]], FilterStats):
+    """Mine seed terms; with a ``provenance`` index each seed also lists the slides it occurs on.
+
+    Pass an empty ``OccurrenceIndex(text)`` as ``occurrences`` to keep the
+    seed occurrences for later stages (``consolidate`` accepts it). Large
+    texts are cut into line-aligned chunks mined by ``workers`` processes
+    (default ``mining_workers``). With a ``docfreq`` store seeds are ranked
+    by frequency times IDF weight (reported as ``idf``) and the deck is
+    recorded under ``doc_id``. ``phrases`` (default ``phrase_mining``) adds
+    frequent multi-word phrases found by the suffix-array phrase miner.
+    """
+    workers = MINING_WORKERS if workers is None else resolve_workers(workers)
+    state = mine_chunks(text_chunks(text), workers)
+    stats = state.stats
+    table = state.totals()
+    if PHRASE_MINING if phrases is None else phrases:
+        add_phrases(table, text, stats)
+    ranked, idf = _rank(table, min_freq, max_terms, docfreq, doc_id)
+    index = occurrences if occurrences is not None else OccurrenceIndex(text)
+    contexts = build_contexts(text, (table.terms[term_id] for term_id in ranked), occurrences=index)
     seeds: List[Dict[str, object]] = []
-    for term in filtered[:max_terms]:
-        seeds.append(
-            {
-                "term": term,
-                "frequency": counter[term],
-                "contexts": contexts.get(term, [])[:3],
-            }
-        )
+    for term_id in ranked:
+        term = table.terms[term_id]
+        seed = {
+            "term": term,
+            "frequency": table.freqs[term_id],
+            "contexts": contexts.get(term, []),
+        }
+        if provenance is not None:
+            seed["slides"] = index.pages(term, provenance)
+        if idf is not None:
+            seed["idf"] = round(idf[term_id], 3)
+        seeds.append(seed)
     stats.log(len(seeds))
     return seeds, stats
 
 
+def mine_pages(
+    pages: Iterable[Tuple[int, str]],
+    min_freq: int = 1,
+    max_terms: int = 500,
+    workers: Optional[int] = None,
+    docfreq: Optional[DocFreqStore] = None,
+    doc_id: Optional[str] = None,
+) -> (List[Dict[str, object]], FilterStats):
+    """Mine seed terms from streamed ``(number, text)`` pages (e.g. ``iter_pages``) without joining them.
+
+    Every page starts on a new line. Contexts are sampled per chunk (at most
+    ``seed_context_snippets`` per seed) and ``slides`` come from the page numbers.
+    """
+    workers = MINING_WORKERS if workers is None else resolve_workers(workers)
+    state = mine_chunks(page_chunks(pages), workers, context_limit=CONTEXT_SNIPPETS)
+    table = state.totals()
+    ranked, idf = _rank(table, min_freq, max_terms, docfreq, doc_id)
+    seeds: List[Dict[str, object]] = []
+    for term_id in ranked:
+        term = table.terms[term_id]
+        seed = {
+            "term": term,
+            "frequency": table.freqs[term_id],
+            "contexts": state.contexts.get(term, []),
+            "slides": sorted(state.slides.get(term, ())),
+        }
+        if idf is not None:
+            seed["idf"] = round(idf[term_id], 3)
+        seeds.append(seed)
+    state.stats.log(len(seeds))
+    return seeds, state.stats
+
+
 def main(argv: Optional[Iterable[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Mine deterministic seed terms from deck text")
     parser.add_argument("deck_text", type=Path, help="Path to deck_text.txt")
@@ -104,7 +146,9 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     args = parser.parse_args(argv)
 
     text = args.deck_text.read_text(encoding="utf-8")
-    seeds, stats = mine(text, min_freq=args.min_freq, max_terms=args.max_terms)
+    seeds, stats = mine(
+        text, min_freq=args.min_freq, max_terms=args.max_terms, provenance=load_provenance(args.deck_text)
+    )
     if args.stats_file:
         report = stats.__dict__.copy()
         report["output_terms"] = len(seeds)
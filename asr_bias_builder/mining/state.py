@@ -0,0 +1,196 @@
+"""Mergeable partial mining results, so chunks of a corpus can be mined in parallel."""
+from __future__ import annotations
+
+import multiprocessing
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..extraction.parallel import resolve_workers
+from ..extraction.sections import SLIDE_MARKER_RE
+from .filters import (
+    CONFIG,
+    DEFAULT_SECTION_WEIGHT,
+    DENY_MATCHER,
+    FilterStats,
+    USE_SECTION_WEIGHTING,
+    detect_section_weight,
+    iter_candidates,
+    reject_reason,
+)
+from .occurrences import MAX_CONTEXT_CHARS
+from .terms import TermTable
+
+MINING_WORKERS = resolve_workers(int(CONFIG.get("mining_workers", 1)))
+MINING_CHUNK_CHARS = int(CONFIG.get("mining_chunk_chars", 4 * 1024 * 1024))
+# Chunks in flight per worker; bounds memory when pages are streamed in.
+CHUNKS_PER_WORKER = 2
+
+# ``(page number or None, text)`` pieces of a chunk, in corpus order.
+Chunk = List[Tuple[Optional[int], str]]
+
+
+def _spread(items: List[str], limit: int) -> List[str]:
+    """Up to ``limit`` distinct items picked evenly across ``items``."""
+    if len(items) > limit:
+        step = (len(items) - 1) / max(limit - 1, 1)
+        items = [items[round(i * step)] for i in range(limit)]
+    return list(dict.fromkeys(items))
+
+
+@dataclass
+class MiningState:
+    """Partial mining result for a run of consecutive lines; ``merge`` is associative.
+
+    Counts are kept per ``(term, section weight)`` so totals do not depend on
+    where the corpus was cut. Terms seen before the chunk's first section
+    header wait in ``pending`` until the weight carried over from the previous
+    chunk is known; ``weight`` is the one in effect at the chunk's end (``None``
+    if it never saw a header). Contexts are a sample, not the full list.
+    """
+
+    weighted: Counter = field(default_factory=Counter)
+    pending: Counter = field(default_factory=Counter)
+    weight: Optional[float] = None
+    stats: FilterStats = field(default_factory=FilterStats)
+    contexts: Dict[str, List[str]] = field(default_factory=dict)
+    slides: Dict[str, Set[int]] = field(default_factory=dict)
+
+    def merge(self, other: "MiningState", context_limit: int = 0) -> "MiningState":
+        """Append the state of the chunk that follows this one; returns ``self``."""
+        if self.weight is None:
+            self.pending.update(other.pending)
+        else:
+            for term, count in other.pending.items():
+                self.weighted[(term, self.weight)] += count
+        self.weighted.update(other.weighted)
+        if other.weight is not None:
+            self.weight = other.weight
+        self.stats.merge(other.stats)
+        for term, snippets in other.contexts.items():
+            mine = self.contexts.get(term)
+            self.contexts[term] = _spread(mine + snippets, context_limit) if mine else snippets
+        for term, pages in other.slides.items():
+            self.slides.setdefault(term, set()).update(pages)
+        return self
+
+    def totals(self) -> TermTable:
+        """Weighted frequency per term in first-seen order, treating this state as the start of the corpus."""
+        table = TermTable()
+        intern = table.intern
+        # weight -> term id -> count; summing in weight order keeps totals independent of chunking.
+        by_weight: Dict[float, Dict[int, int]] = {}
+        if self.pending:
+            by_weight[DEFAULT_SECTION_WEIGHT] = {intern(term): count for term, count in self.pending.items()}
+        for (term, weight), count in self.weighted.items():
+            counts = by_weight.setdefault(weight, {})
+            term_id = intern(term)
+            counts[term_id] = counts.get(term_id, 0) + count
+        freqs = table.freqs
+        for weight in sorted(by_weight):
+            for term_id, count in by_weight[weight].items():
+                freqs[term_id] += weight * count
+        return table
+
+
+def mine_chunk(chunk: Chunk, context_limit: int = 0) -> MiningState:
+    """Mine one chunk; keeps up to ``context_limit`` line snippets per term."""
+    state = MiningState()
+    verdicts: Dict[str, Optional[Tuple[str, Optional[str]]]] = {}
+    current_weight: Optional[float] = None
+    half = MAX_CONTEXT_CHARS // 2
+    for number, text in chunk:
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            # ``None`` passes through until a header sets the weight.
+            current_weight = detect_section_weight(line, current_weight, state.stats)
+            if SLIDE_MARKER_RE.match(line):
+                continue
+            weight = current_weight if USE_SECTION_WEIGHTING else DEFAULT_SECTION_WEIGHT
+            for candidate in iter_candidates(line):
+                term = candidate.text
+                # Terms repeat heavily across a deck; run the filter chain once per distinct term.
+                if term not in verdicts:
+                    verdicts[term] = reject_reason(term)
+                rejected = verdicts[term]
+                if rejected:
+                    state.stats.reject(*rejected)
+                    continue
+                if weight is None:
+                    state.pending[term] += 1
+                else:
+                    state.weighted[(term, weight)] += 1
+                if context_limit:
+                    snippets = state.contexts.setdefault(term, [])
+                    if len(snippets) < context_limit:
+                        snippet = line[max(0, candidate.start - half) : candidate.end + half]
+                        if snippet not in snippets:
+                            snippets.append(snippet)
+                if number is not None:
+                    state.slides.setdefault(term, set()).add(number)
+    state.weight = current_weight
+    state.stats.regex_timeouts = sorted(DENY_MATCHER.disabled)
+    return state
+
+
+def text_chunks(text: str, size: int = MINING_CHUNK_CHARS) -> Iterator[Chunk]:
+    """Cut ``text`` into chunks of about ``size`` chars, only at line boundaries."""
+    start = 0
+    while start < len(text):
+        cut = text.find("\n", start + size) if size > 0 else -1
+        stop = len(text) if cut == -1 else cut + 1
+        yield [(None, text[start:stop])]
+        start = stop
+
+
+def page_chunks(pages: Iterable[Tuple[int, str]], size: int = MINING_CHUNK_CHARS) -> Iterator[Chunk]:
+    """Group streamed ``(number, text)`` pages into chunks of about ``size`` chars."""
+    chunk: Chunk = []
+    chars = 0
+    for number, text in pages:
+        chunk.append((number, text))
+        chars += len(text)
+        if chars >= size:
+            yield chunk
+            chunk, chars = [], 0
+    if chunk:
+        yield chunk
+
+
+def mine_chunks(chunks: Iterable[Chunk], workers: int = 1, context_limit: int = 0) -> MiningState:
+    """Mine ``chunks`` (in a process pool when ``workers`` > 1) and merge them in corpus order.
+
+    Chunks are submitted lazily, at most ``CHUNKS_PER_WORKER`` per worker at
+    a time, so a streamed corpus never has to be held in memory at once.
+    """
+    chunks = iter(chunks)
+    head = [chunk for chunk in (next(chunks, None), next(chunks, None)) if chunk is not None]
+    state = MiningState()
+    if workers <= 1 or len(head) < 2:
+        for chunk in chain(head, chunks):
+            state.merge(mine_chunk(chunk, context_limit), context_limit)
+        return state
+    with multiprocessing.get_context().Pool(processes=workers) as pool:
+        in_flight: deque = deque()
+        for chunk in chain(head, chunks):
+            in_flight.append(pool.apply_async(mine_chunk, (chunk, context_limit)))
+            if len(in_flight) >= workers * CHUNKS_PER_WORKER:
+                state.merge(in_flight.popleft().get(), context_limit)
+        while in_flight:
+            state.merge(in_flight.popleft().get(), context_limit)
+    return state
+
+
+__all__ = [
+    "Chunk",
+    "MINING_CHUNK_CHARS",
+    "MINING_WORKERS",
+    "MiningState",
+    "mine_chunk",
+    "mine_chunks",
+    "page_chunks",
+    "text_chunks",
+]
@@ -0,0 +1,59 @@
+"""Compact interned term table for ranking large candidate sets."""
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class TermTable:
+    """Terms interned to dense integer ids, with weighted frequencies in an ``array('d')`` column.
+
+    Ids follow first-seen order. ``top`` picks the ``k`` best ids with a
+    bounded heap (O(n log k)) instead of sorting every term; ties keep
+    first-seen order, as ``Counter.most_common`` does.
+    """
+
+    __slots__ = ("ids", "terms", "freqs")
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.freqs = array("d")
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.ids
+
+    def intern(self, term: str) -> int:
+        """Id of ``term``, assigning the next one on first sight."""
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+            self.freqs.append(0.0)
+        return term_id
+
+    def add(self, term: str, weight: float = 1.0) -> int:
+        term_id = self.intern(term)
+        self.freqs[term_id] += weight
+        return term_id
+
+    def frequency(self, term: str) -> float:
+        term_id = self.ids.get(term)
+        return self.freqs[term_id] if term_id is not None else 0.0
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        return zip(self.terms, self.freqs)
+
+    def top(self, k: int, min_freq: float = 0.0, weights: Optional[Sequence[float]] = None) -> List[int]:
+        """Ids of the ``k`` terms with the highest frequency (times ``weights[id]``) of at least ``min_freq``."""
+        freqs = self.freqs
+        eligible = (idx for idx in range(len(freqs)) if freqs[idx] >= min_freq)
+        key = freqs.__getitem__ if weights is None else (lambda idx: freqs[idx] * weights[idx])
+        return heapq.nlargest(k, eligible, key=key)
+
+
+__all__ = ["TermTable"]
@@ -6,6 +6,7 @@ import contextlib
 import json
 import logging
 import subprocess
+import time
 from dataclasses import asdict
 from datetime import datetime, timezone
 from importlib.resources import as_file, files
@@ -15,11 +16,14 @@ from typing import Iterable, List, Optional
 from .artifacts.google_stt import build_phrase_set
 from .artifacts.whisper import build_prompt
 from .config import load_config
-from .extraction import extract_text
+from .extraction import ExtractionStats, load_provenance, open_extraction_cache, write_deck_text
+from .llm.cache import LlmCache, llm_cache_key, open_llm_cache
+from .llm.classify import CLASSIFY_RESOURCE, choose_llm_mode, classification_items, run_classification
 from .llm.claude import run_claude
-from .mining import mine
+from .llm.compaction import compact_deck
+from .mining import OccurrenceIndex, mine, open_docfreq_store
 from .reporting.csv_export import append_summary_csv
-from .reporting.summary import top_terms_by_class, write_review_markdown
+from .reporting.summary import slides_by_term, top_terms_by_class, write_review_markdown
 from .utils import configure_logging, ensure_file, snapshot_environment, write_stats
 from .verification import matcher
 from .verification.deduplicator import append_aliases_file, collect_alias_suggestions
@@ -33,11 +37,11 @@ def _write_json(path: Path, payload: object) -> None:
 
 
 @contextlib.contextmanager
-def _resolved_schema_path(schema_file: Optional[Path]):
+def _resolved_schema_path(schema_file: Optional[Path], resource=_SCHEMA_RESOURCE):
     if schema_file:
         yield schema_file
     else:
-        with as_file(_SCHEMA_RESOURCE) as tmp_path:
+        with as_file(resource) as tmp_path:
             yield Path(tmp_path)
 
 
@@ -51,9 +55,15 @@ def run_pipeline(
     model: str = "sonnet",
     permission_flags: Optional[List[str]] = None,
     enable_ocr: bool = False,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
     chunk_size: int = 50_000,
     stream_threshold: int = 80_000,
     allow_llm_aliases: bool = False,
+    llm_concurrency: Optional[int] = None,
+    use_llm_cache: bool = True,
+    llm_token_budget: Optional[int] = None,
+    llm_mode: Optional[str] = None,
 ) -> None:
     """Run the ASR bias builder pipeline."""
     configure_logging()
@@ -63,9 +73,12 @@ def run_pipeline(
     cfg = load_config(str(config_path) if config_path else None)
     output_dir.mkdir(parents=True, exist_ok=True)
     deck_text_path = output_dir / "deck_text.txt"
+    extract_stats_path = output_dir / "extract_stats.json"
     seeds_path = output_dir / "seeds.json"
     mine_stats_path = output_dir / "mine_terms_stats.json"
     verify_stats_path = output_dir / "verify_stats.json"
+    llm_input_path = output_dir / "llm_input.txt"
+    compaction_path = output_dir / "llm_compaction.json"
     llm_candidates_path = llm_output or (output_dir / "llm_candidates.json")
     verified_terms_path = output_dir / "verified_terms.json"
     prompt_list_path = output_dir / "deck_terms.txt"
@@ -74,12 +87,29 @@ def run_pipeline(
     aliases_path = output_dir / "aliases_learned.yaml"
 
     logger.info("Stage 1/6: extracting deck text%s", " with OCR fallback enabled" if enable_ocr else "")
-    text = extract_text(deck_path, enable_ocr=enable_ocr, config=cfg)
-    deck_text_path.write_text(text, encoding="utf-8")
-    logger.info("Stage 1 complete (%d characters)", len(text))
+    extract_stats = ExtractionStats()
+    char_count = write_deck_text(
+        deck_path,
+        deck_text_path,
+        enable_ocr=enable_ocr,
+        config=cfg,
+        workers=workers,
+        cache=open_extraction_cache(cfg, cache_dir),
+        stats=extract_stats,
+    )
+    write_stats(extract_stats_path, asdict(extract_stats))
+    logger.info("Stage 1 complete (%d characters)", char_count)
+    text = deck_text_path.read_text(encoding="utf-8")
+    provenance = load_provenance(deck_text_path)
 
     logger.info("Stage 2/6: mining deterministic seeds")
-    seeds, seed_stats = mine(text)
+    deck_id = str(cfg.get("deck_id", deck_path.stem))
+    docfreq = open_docfreq_store(cfg)
+    occurrences = OccurrenceIndex(text)
+    seeds, seed_stats = mine(
+        text, provenance=provenance, occurrences=occurrences, docfreq=docfreq, doc_id=deck_id
+    )
+    seed_stats.boilerplate_lines = extract_stats.boilerplate_lines_removed
     _write_json(seeds_path, seeds)
     stats_payload = asdict(seed_stats)
     stats_payload["output_terms"] = len(seeds)
@@ -87,22 +117,86 @@ def run_pipeline(
     logger.info("Stage 2 complete (%d seeds)", len(seeds))
 
     llm_payload = None
+    llm_cache = None
+    chunk_cache = None
+    resolved_mode = None
     if llm_output is None or not llm_output.exists():
-        logger.info("Stage 3/6: running LLM extraction (model=%s)", model)
-        with _resolved_schema_path(schema_file) as resolved_schema:
-            result = run_claude(
-                deck_text=deck_text_path,
-                schema_file=resolved_schema,
-                output_path=llm_candidates_path,
-                model=model,
-                permission_flags=permission_flags,
-                chunk_size=chunk_size,
-                stream_threshold_bytes=stream_threshold,
+        llm_cache = open_llm_cache(cfg, cache_dir) if use_llm_cache else None
+        if llm_cache is not None and cfg.get("llm_chunk_cache", True):
+            chunk_cache = LlmCache(llm_cache.cache, llm_cache.ttl_seconds)
+        raw_path = llm_candidates_path.parent / f"{llm_candidates_path.stem}_raw.json"
+        resolved_mode = choose_llm_mode(
+            llm_mode or str(cfg.get("llm_mode", "deck")), text, seeds, int(cfg.get("llm_classify_min_tokens", 50_000))
+        )
+        classify = resolved_mode == "classify"
+        classify_contexts = int(cfg.get("llm_classify_contexts", 2))
+        llm_text, llm_text_path = text, deck_text_path
+        if classify:
+            llm_text = json.dumps(classification_items(seeds, classify_contexts), ensure_ascii=False)
+        elif llm_token_budget is not None or cfg.get("llm_compaction", False):
+            budget = int(cfg.get("llm_token_budget", 0) or 0) if llm_token_budget is None else llm_token_budget
+            llm_text, report = compact_deck(
+                text,
+                (str(seed["term"]) for seed in seeds),
+                budget_tokens=budget,
+                near_threshold=float(cfg.get("llm_near_duplicate_threshold", 0.85)),
+                numeric_ratio=float(cfg.get("llm_numeric_line_ratio", 0.5)),
+                section_weights=cfg.get("llm_compaction_section_weights") or {},
             )
-        if result.returncode != 0:
-            raise RuntimeError(f"Claude CLI failed: {result.stderr.strip()}")
-        llm_payload = matcher.load_json(llm_candidates_path)
-        logger.info("Stage 3 complete (LLM candidates captured)")
+            llm_input_path.write_text(llm_text, encoding="utf-8")
+            llm_text_path = llm_input_path
+            write_stats(compaction_path, asdict(report))
+            logger.info("LLM input compacted: ~%d tokens saved (report at %s)", report.tokens_saved, compaction_path)
+        with _resolved_schema_path(
+            None if classify else schema_file, CLASSIFY_RESOURCE if classify else _SCHEMA_RESOURCE
+        ) as resolved_schema:
+            cache_key = llm_cache_key(llm_text, resolved_schema, model) if llm_cache is not None else None
+            cached = llm_cache.get(cache_key) if llm_cache is not None else None
+            if cached is not None:
+                logger.info("Stage 3 skipped: LLM cache hit (saved %.1fs)", float(cached.get("seconds", 0.0)))
+                llm_payload = cached.get("candidates")
+                _write_json(llm_candidates_path, llm_payload)
+                raw_path.write_text(str(cached.get("raw", "")), encoding="utf-8")
+            elif classify:
+                logger.info("Stage 3/6: running LLM classification of %d seeds (model=%s)", len(seeds), model)
+                started = time.monotonic()
+                result = run_classification(
+                    seeds,
+                    prompt_file=resolved_schema,
+                    output_path=llm_candidates_path,
+                    model=model,
+                    permission_flags=permission_flags,
+                    batch_size=int(cfg.get("llm_classify_batch_size", 80)),
+                    concurrency=llm_concurrency or int(cfg.get("llm_classify_concurrency", 4)),
+                    cache=chunk_cache,
+                    contexts=classify_contexts,
+                )
+            else:
+                logger.info("Stage 3/6: running LLM extraction (model=%s)", model)
+                started = time.monotonic()
+                result = run_claude(
+                    deck_text=llm_text_path,
+                    schema_file=resolved_schema,
+                    output_path=llm_candidates_path,
+                    model=model,
+                    permission_flags=permission_flags,
+                    chunk_size=chunk_size,
+                    stream_threshold_bytes=stream_threshold,
+                    concurrency=int(cfg.get("llm_concurrency", 1)) if llm_concurrency is None else llm_concurrency,
+                    chunk_tokens=cfg.get("llm_chunk_tokens"),
+                    chunk_cache=chunk_cache,
+                )
+            if cached is None:
+                if result.returncode != 0:
+                    raise RuntimeError(f"Claude CLI failed: {result.stderr.strip()}")
+                llm_payload = matcher.load_json(llm_candidates_path)
+                failed = getattr(result, "failed", 0)
+                if failed:
+                    logger.warning("%d LLM request(s) returned no usable JSON; not caching the partial result", failed)
+                elif llm_cache is not None and llm_payload is not None:
+                    raw = raw_path.read_text(encoding="utf-8") if raw_path.exists() else result.stdout
+                    llm_cache.put(cache_key, llm_payload, raw, time.monotonic() - started)
+                logger.info("Stage 3 complete (LLM candidates captured)")
     elif llm_candidates_path.exists():
         logger.info("Stage 3 skipped: using existing LLM candidates at %s", llm_candidates_path)
         llm_payload = matcher.load_json(llm_candidates_path)
@@ -113,9 +207,21 @@ def run_pipeline(
         seeds_data=seeds,
         llm_data=llm_payload,
         allow_llm_aliases=allow_llm_aliases,
+        occurrences=occurrences,
+        provenance=provenance,
+        docfreq=docfreq,
+        doc_id=deck_id,
     )
+    if docfreq is not None:
+        docfreq.close()
     _write_json(verified_terms_path, verified_terms)
     verify_stats["output_terms"] = len(verified_terms)
+    if llm_cache is not None:
+        verify_stats.update(llm_cache.metrics())
+    if chunk_cache is not None:
+        verify_stats.update(chunk_cache.metrics("llm_chunk_cache"))
+    if resolved_mode is not None:
+        verify_stats["llm_mode"] = resolved_mode
     write_stats(verify_stats_path, verify_stats)
     logger.info("Stage 4 complete (%d verified terms)", len(verified_terms))
 
@@ -138,7 +244,6 @@ def run_pipeline(
     logger.info("Stage 5 complete (prompt terms=%d, phrase count=%d)", len(prompt_terms), len(phrase_payload["phraseSets"][0]["phrases"]))
 
     logger.info("Stage 6/6: generating reports and summaries")
-    deck_id = str(cfg.get("deck_id", deck_path.stem))
     timestamp = datetime.now(timezone.utc).isoformat()
     write_review_markdown(
         deck_id=deck_id,
@@ -148,6 +253,7 @@ def run_pipeline(
         mine_stats=stats_payload,
         verify_stats=verify_stats,
         top_terms=top_terms_by_class(verified_terms),
+        term_slides=slides_by_term(verified_terms),
     )
     append_summary_csv(
         summary_csv,
@@ -185,8 +291,14 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--model", default="sonnet")
     parser.add_argument("--permission-flag", action="append", dest="permission_flags")
     parser.add_argument("--enable-ocr", action="store_true")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cache-dir", type=Path)
     parser.add_argument("--chunk-size", type=int, default=50_000)
     parser.add_argument("--stream-threshold", type=int, default=80_000)
+    parser.add_argument("--llm-concurrency", type=int)
+    parser.add_argument("--no-llm-cache", dest="use_llm_cache", action="store_false")
+    parser.add_argument("--llm-mode", choices=["deck", "classify", "auto"])
+    parser.add_argument("--llm-token-budget", type=int)
     parser.add_argument("--allow-llm-aliases", action="store_true")
     return parser
 
@@ -205,9 +317,15 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         model=args.model,
         permission_flags=args.permission_flags,
         enable_ocr=args.enable_ocr,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
         chunk_size=args.chunk_size,
         stream_threshold=args.stream_threshold,
         allow_llm_aliases=args.allow_llm_aliases,
+        llm_concurrency=args.llm_concurrency,
+        use_llm_cache=args.use_llm_cache,
+        llm_token_budget=args.llm_token_budget,
+        llm_mode=args.llm_mode,
     )
     return 0
 
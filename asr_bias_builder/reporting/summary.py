@@ -13,6 +13,8 @@ from .csv_export import append_summary_csv
 
 CONFIG = load_config()
 CLASS_ORDER = CONFIG.get("class_order", ["PERSON", "ORG", "PRODUCT", "TECH"])
+MAX_SLIDES_SHOWN = 5
+MAX_DENY_PATTERNS_SHOWN = 5
 
 
 def read_json(path: Path) -> Dict[str, object]:
@@ -60,6 +62,40 @@ def top_terms_by_class(verified: List[Dict[str, object]], per_class: int = 5) ->
     return buckets
 
 
+def slides_by_term(verified: List[Dict[str, object]]) -> Dict[str, List[int]]:
+    """Map canonical terms to the slides recorded for them during verification."""
+    return {
+        str(item.get("canonical", "")).strip(): list(item.get("slides") or [])
+        for item in verified
+        if item.get("slides")
+    }
+
+
+def _with_slides(term: str, term_slides: Dict[str, List[int]]) -> str:
+    slides = term_slides.get(term)
+    if not slides:
+        return term
+    shown = ", ".join(str(slide) for slide in slides[:MAX_SLIDES_SHOWN])
+    more = ", …" if len(slides) > MAX_SLIDES_SHOWN else ""
+    return f"{term} (slides {shown}{more})"
+
+
+def pattern_rejects(mine_stats: Dict[str, object]) -> int:
+    """Deny-pattern plus deny-exact rejects."""
+    per_pattern = mine_stats.get("deny_patterns", 0)
+    if isinstance(per_pattern, dict):
+        per_pattern = sum(int(hits) for hits in per_pattern.values())
+    return int(per_pattern or 0) + int(mine_stats.get("deny_exact", 0) or 0)
+
+
+def top_deny_patterns(mine_stats: Dict[str, object]) -> str:
+    per_pattern = mine_stats.get("deny_patterns")
+    if not isinstance(per_pattern, dict) or not per_pattern:
+        return "–"
+    ranked = sorted(per_pattern.items(), key=lambda item: (-item[1], item[0]))[:MAX_DENY_PATTERNS_SHOWN]
+    return ", ".join(f"`{pattern}` ({hits})" for pattern, hits in ranked)
+
+
 def write_review_markdown(
     deck_id: str,
     deck_name: str,
@@ -68,6 +104,7 @@ def write_review_markdown(
     mine_stats: Dict[str, object],
     verify_stats: Dict[str, object],
     top_terms: Dict[str, List[str]],
+    term_slides: Optional[Dict[str, List[int]]] = None,
 ) -> None:
     timestamp = datetime.now(timezone.utc).isoformat()
     lines = [
@@ -91,9 +128,12 @@ def write_review_markdown(
         "| --- | --- |",
         f"| Stop words | {mine_stats.get('stop_words', 0)} |",
         f"| Numbers | {mine_stats.get('numbers', 0)} |",
-        f"| Pattern rejects | {mine_stats.get('deny_patterns', 0)} |",
+        f"| Pattern rejects | {pattern_rejects(mine_stats)} |",
+        f"| Top deny patterns | {top_deny_patterns(mine_stats)} |",
+        f"| Deny patterns disabled (timeout) | {len(mine_stats.get('regex_timeouts') or [])} |",
         f"| Length rejects | {mine_stats.get('length', 0)} |",
         f"| Section weighting hits | {mine_stats.get('section_weight_hits', 0)} |",
+        f"| Boilerplate lines stripped | {mine_stats.get('boilerplate_lines', 0)} |",
         f"| LLM priority drops | {verify_stats.get('llm_filtered_priority', 0)} |",
         "",
         "## Top Terms by Class",
@@ -103,7 +143,7 @@ def write_review_markdown(
         terms = top_terms.get(cls, [])
         if not terms:
             continue
-        joined = ", ".join(terms)
+        joined = ", ".join(_with_slides(term, term_slides or {}) for term in terms)
         lines.append(f"- **{cls}:** {joined}")
     lines.append("")
     review_path = output_dir / "review.md"
@@ -140,6 +180,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         mine_stats,
         verify_stats,
         top_terms_by_class(verified_terms),
+        slides_by_term(verified_terms),
     )
     record = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
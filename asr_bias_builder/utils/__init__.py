@@ -1,7 +1,8 @@
 """Utility helpers."""
 
+from .cache import DiskCache
 from .logging import configure_logging
 from .telemetry import snapshot_environment, write_stats
 from .validation import ensure_file
 
-__all__ = ["configure_logging", "snapshot_environment", "write_stats", "ensure_file"]
+__all__ = ["DiskCache", "configure_logging", "snapshot_environment", "write_stats", "ensure_file"]
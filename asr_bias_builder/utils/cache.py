@@ -0,0 +1,124 @@
+"""Content-addressed on-disk cache with size-capped LRU eviction."""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+
+def digest(*parts: Union[str, bytes]) -> str:
+    """Return a SHA-256 hex digest over ``parts`` (length-prefixed so boundaries matter)."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        hasher.update(len(data).to_bytes(8, "big"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents without loading it whole."""
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class DiskCache:
+    """Files stored under their key; reads refresh mtime so eviction drops the least recently used."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, suffix: str = "") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get_path(self, key: str, suffix: str = "") -> Optional[Path]:
+        """Return the cached file for ``key`` (refreshing its LRU position) or ``None``."""
+        path = self._path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def get_text(self, key: str, suffix: str = "") -> Optional[str]:
+        path = self.get_path(key, suffix)
+        return path.read_text(encoding="utf-8") if path else None
+
+    def put_file(self, key: str, source: Path, suffix: str = "") -> Path:
+        """Copy ``source`` into the cache atomically, then evict down to ``max_bytes``."""
+        dest = self._path(key, suffix)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp_name)
+            os.replace(tmp_name, dest)
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        self.evict()
+        return dest
+
+    def put_text(self, key: str, text: str, suffix: str = "") -> Path:
+        dest = self._path(key, suffix)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(tmp_name, dest)
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        self.evict()
+        return dest
+
+    def delete(self, key: str, suffix: str = "") -> None:
+        try:
+            self._path(key, suffix).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return entries
+        for path in self.root.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``; returns files removed."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+__all__ = ["DiskCache", "digest", "file_digest"]
@@ -0,0 +1,387 @@
+"""Regex construction helpers shared by the text-matching stages."""
+from __future__ import annotations
+
+import logging
+import re
+import string
+import warnings
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import regex  # type: ignore
+except ImportError:  # pragma: no cover
+    regex = None  # type: ignore
+
+# The stdlib parser is private: ``re._parser`` since 3.11, the deprecated ``sre_parse`` alias before.
+try:
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import sre_constants  # type: ignore[no-redef]
+        import sre_parse  # type: ignore[no-redef]
+
+LOGGER = logging.getLogger("asr_bias_builder.patterns")
+
+_END = ""
+# An outer repeat allowing this many iterations around an unbounded one backtracks like ``(x+)+``.
+NESTED_REPEAT_MIN = 10
+_ALPHABET = string.printable
+_CATEGORIES: Dict[object, Callable[[str], bool]] = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_constants.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+def _emit(node: Dict[str, dict]) -> str:
+    alternatives = []
+    leaves = []
+    for char in sorted(key for key in node if key != _END):
+        child = node[char]
+        if len(child) == 1 and _END in child:
+            leaves.append(char)
+        else:
+            alternatives.append(re.escape(char) + _emit(child))
+    if len(leaves) == 1:
+        alternatives.append(re.escape(leaves[0]))
+    elif leaves:
+        alternatives.append("[" + "".join(re.escape(char) for char in leaves) + "]")
+    if not alternatives:
+        return ""
+    pattern = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if _END in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """Return an alternation matching any of ``words``, factored into a prefix trie.
+
+    The trie form lets ``re`` discard non-matching branches after one character
+    instead of trying every word in turn. Longer words win over their prefixes;
+    the engine backtracks to a shorter word when the surrounding pattern fails.
+    """
+    root: Dict[str, dict] = {}
+    for word in words:
+        if not word:
+            continue
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    return _emit(root) if root else "(?!)"
+
+
+def _first_chars(items: list) -> Optional[FrozenSet[str]]:
+    """Printable characters ``items`` can start with, or ``None`` when unknown or possibly empty."""
+    if not items:
+        return None
+    op, av = items[0]
+    if op is sre_constants.LITERAL:
+        return frozenset(chr(av))
+    if op is sre_constants.NOT_LITERAL:
+        return frozenset(c for c in _ALPHABET if ord(c) != av)
+    if op is sre_constants.ANY:
+        return frozenset(_ALPHABET)
+    if op is sre_constants.IN:
+        negate = bool(av) and av[0][0] is sre_constants.NEGATE
+        chars = set()
+        for kind, value in av[1:] if negate else av:
+            if kind is sre_constants.LITERAL:
+                chars.add(chr(value))
+            elif kind is sre_constants.RANGE:
+                chars.update(c for c in _ALPHABET if value[0] <= ord(c) <= value[1])
+            elif kind is sre_constants.CATEGORY and value in _CATEGORIES:
+                chars.update(c for c in _ALPHABET if _CATEGORIES[value](c))
+            else:
+                return None
+        return frozenset(c for c in _ALPHABET if c not in chars) if negate else frozenset(chars)
+    if op is sre_constants.SUBPATTERN:
+        return _first_chars(av[3])
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] > 0:
+        return _first_chars(av[2])
+    return None
+
+
+def _ambiguous_branch(items: list) -> bool:
+    """True when a top-level alternation in ``items`` has two branches that can start alike."""
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            return _ambiguous_branch(av[3])
+        if op is sre_constants.BRANCH:
+            branches = av[1]
+            starts = [_first_chars(branch) for branch in branches]
+            for i, first in enumerate(starts):
+                for j in range(i + 1, len(starts)):
+                    other = starts[j]
+                    if list(branches[i]) == list(branches[j]) or (first and other and first & other):
+                        return True
+    return False
+
+
+_SINGLE_CHAR_OPS = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.IN, sre_constants.ANY)
+
+
+def _separators(body: list) -> List[FrozenSet[str]]:
+    """Characters of single-character items opening or closing a repeat's body."""
+    ends = [body[0], body[-1]] if body else []
+    return [chars for item in ends if item[0] in _SINGLE_CHAR_OPS for chars in [_first_chars([item])] if chars]
+
+
+def _redos_reason(items: list, separators: Optional[List[FrozenSet[str]]]) -> Optional[str]:
+    """``separators`` is ``None`` outside repeats, else the enclosing repeat's delimiter characters."""
+    for op, av in items:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, body = av
+            unbounded = high == sre_constants.MAXREPEAT
+            if unbounded and separators is not None:
+                chars = _first_chars(list(body))
+                # ``(?:-\w+)+`` is linear: every outer iteration starts at a "-" the inner repeat cannot eat.
+                if not (chars and any(chars.isdisjoint(sep) for sep in separators)):
+                    return "nested quantifier (e.g. (a+)+) can backtrack exponentially"
+            if unbounded and _ambiguous_branch(body):
+                return "quantified alternation with overlapping branches (e.g. (a|a)+)"
+            repeats = unbounded or high >= NESTED_REPEAT_MIN
+            reason = _redos_reason(body, _separators(list(body)) if repeats else separators)
+        elif op is sre_constants.POSSESSIVE_REPEAT:
+            reason = _redos_reason(av[2], None)
+        elif op is sre_constants.ATOMIC_GROUP:
+            reason = _redos_reason(av, None)
+        elif op is sre_constants.SUBPATTERN:
+            reason = _redos_reason(av[3], separators)
+        elif op is sre_constants.BRANCH:
+            reason = next((r for r in (_redos_reason(b, separators) for b in av[1]) if r), None)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            reason = _redos_reason(av[1], separators)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            reason = _redos_reason(av[1], separators) or (_redos_reason(av[2], separators) if av[2] else None)
+        else:
+            reason = None
+        if reason:
+            return reason
+    return None
+
+
+def redos_risk(pattern: str, flags: int = 0) -> Optional[str]:
+    """Why ``pattern`` risks catastrophic backtracking, or ``None`` if it looks safe.
+
+    Walks the parsed pattern for the classic shapes: an unbounded quantifier
+    nested inside another repeat, and a quantified alternation whose branches
+    can start with the same character. Possessive quantifiers and atomic
+    groups never backtrack and are exempt. Raises ``re.error`` for invalid
+    patterns.
+    """
+    return _redos_reason(sre_parse.parse(pattern, flags).data, None)
+
+
+class PatternTimeout(RuntimeError):
+    """A pattern ran past its per-call time budget."""
+
+    def __init__(self, pattern: str, timeout: float) -> None:
+        super().__init__(f"pattern {pattern!r} exceeded its {timeout:g}s budget")
+        self.pattern = pattern
+
+
+class TimedPattern:
+    """A compiled pattern whose ``search``/``sub`` give up after ``timeout`` seconds.
+
+    Stdlib ``re`` cannot be interrupted, so timed patterns use the ``regex``
+    package (its default mode is ``re``-compatible); without it, or with no
+    timeout, this is a plain ``re`` pattern.
+    """
+
+    def __init__(self, pattern: str, flags: int = 0, timeout: Optional[float] = None) -> None:
+        self.pattern = pattern
+        self.timeout = timeout if timeout and regex is not None else None
+        self.compiled = (regex if self.timeout else re).compile(pattern, flags)
+        self._kwargs = {"timeout": self.timeout} if self.timeout else {}
+
+    def search(self, text: str):
+        try:
+            return self.compiled.search(text, **self._kwargs)
+        except TimeoutError:
+            raise PatternTimeout(self.pattern, self.timeout or 0) from None
+
+    def sub(self, repl, text: str) -> str:
+        try:
+            return self.compiled.sub(repl, text, **self._kwargs)
+        except TimeoutError:
+            raise PatternTimeout(self.pattern, self.timeout or 0) from None
+
+
+def bounded_segments(text: str, max_chars: int) -> Iterator[str]:
+    """Split ``text`` into consecutive pieces of at most ``max_chars`` (``0`` = no limit).
+
+    Pieces end after a newline where possible, else after a space, so a
+    pattern run piecewise only misses matches spanning a cut; joining the
+    pieces gives back ``text``.
+    """
+    start = 0
+    while max_chars and len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind("\n", start, end)
+        if cut < start:
+            cut = text.rfind(" ", start, end)
+        cut = cut + 1 if cut >= start else end
+        yield text[start:cut]
+        start = cut
+    yield text[start:]
+
+
+def _has_top_level_branch(pattern: str) -> bool:
+    """True when ``pattern`` has a ``|`` outside every group and character class."""
+    depth = 0
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            idx += 1
+        elif char == "[":
+            # Skip the class; a "]" right after "[" or "[^" is a member, not the end.
+            idx += 2 if pattern.startswith("[^", idx) else 1
+            if pattern.startswith("]", idx):
+                idx += 1
+            while idx < len(pattern) and pattern[idx] != "]":
+                idx += 2 if pattern[idx] == "\\" else 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        idx += 1
+    return False
+
+
+def _leading_literal(pattern: str, flags: int) -> Optional[Tuple[str, str]]:
+    """``(escaped lead, rest)`` when ``pattern`` starts with one unquantified non-letter literal."""
+    data = sre_parse.parse(pattern, flags).data
+    if not data or data[0][0] is not sre_constants.LITERAL:
+        return None
+    char = chr(data[0][1])
+    if char.isalpha():
+        return None
+    for lead in (re.escape(char), char):
+        if pattern.startswith(lead):
+            return re.escape(char), pattern[len(lead) :]
+    return None
+
+
+def _starts_anchored(pattern: str, flags: int) -> bool:
+    data = sre_parse.parse(pattern, flags).data
+    return pattern.startswith("^") and bool(data) and data[0] == (sre_constants.AT, sre_constants.AT_BEGINNING)
+
+
+class DenyMatcher:
+    """Many deny regexes searched as one alternation that still names the pattern that fired.
+
+    Each pattern becomes a named group ``(?P<pN>...)`` of a single regex and
+    ``match.lastgroup`` names the winner (the leftmost match). A plain
+    alternation would try every branch at every position, so branches are
+    factored: ``^``-anchored patterns share one ``^(?:...)`` branch and
+    patterns opening with the same punctuation literal (``\\.py$``,
+    ``\\.js$``) share that literal, which ``re`` rejects in one comparison.
+    Patterns with a top-level ``|`` stay whole in their group. Patterns with
+    capturing groups (whose backreferences would shift) or inline flags are
+    searched one by one.
+
+    With a ``timeout``, a search that overruns is retried pattern by pattern;
+    the patterns that overrun on their own are dropped for the rest of the
+    run and listed in ``disabled``.
+    """
+
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE, timeout: Optional[float] = None) -> None:
+        self.patterns: List[str] = [str(p) for p in patterns if p]
+        self.flags = flags
+        self.timeout = timeout
+        self.disabled: Set[str] = set()
+        self._build()
+
+    def _build(self) -> None:
+        self._separate: List[TimedPattern] = []
+        self._names: Dict[str, str] = {}
+        anchored: List[str] = []
+        by_lead: Dict[str, List[str]] = {}
+        other: List[str] = []
+        for idx, pattern in enumerate(self.patterns):
+            if pattern in self.disabled:
+                continue
+            compiled = re.compile(pattern, self.flags)
+            if compiled.groups or compiled.flags & ~(self.flags | re.UNICODE):
+                self._separate.append(TimedPattern(pattern, self.flags, self.timeout))
+                continue
+            name = f"p{idx}"
+            self._names[name] = pattern
+            if _has_top_level_branch(pattern):
+                # Factoring out a lead or "^" would only bind it to the first branch.
+                other.append(f"(?P<{name}>{pattern})")
+            elif _starts_anchored(pattern, self.flags):
+                anchored.append(f"(?P<{name}>{pattern[1:]})")
+            else:
+                lead = _leading_literal(pattern, self.flags)
+                if lead is not None:
+                    by_lead.setdefault(lead[0], []).append(f"(?P<{name}>{lead[1]})")
+                else:
+                    other.append(f"(?P<{name}>{pattern})")
+        branches = ["^(?:" + "|".join(anchored) + ")"] if anchored else []
+        branches.extend(lead + "(?:" + "|".join(group) + ")" for lead, group in by_lead.items())
+        branches.extend(other)
+        self._combined: Optional[TimedPattern] = (
+            TimedPattern("|".join(branches), self.flags, self.timeout) if branches else None
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _disable(self, text: str) -> None:
+        for pattern in self._names.values():
+            try:
+                TimedPattern(pattern, self.flags, self.timeout).search(text)
+            except PatternTimeout as exc:
+                LOGGER.warning("Disabling deny pattern: %s", exc)
+                self.disabled.add(pattern)
+        if not self.disabled.intersection(self._names.values()):  # pragma: no cover - only slow together
+            LOGGER.warning("Deny patterns overran their budget together; searching them one by one")
+            self._combined = None
+            self._separate.extend(TimedPattern(p, self.flags, self.timeout) for p in self._names.values())
+            self._names = {}
+            return
+        self._build()
+
+    def first(self, text: str) -> Optional[str]:
+        """Return the deny pattern that matches ``text``, or ``None``."""
+        if self._combined is not None:
+            try:
+                match = self._combined.search(text)
+            except PatternTimeout:
+                self._disable(text)
+                return self.first(text)
+            if match is not None:
+                return self._names[match.lastgroup]
+        for compiled in list(self._separate):
+            try:
+                if compiled.search(text):
+                    return compiled.pattern
+            except PatternTimeout as exc:
+                LOGGER.warning("Disabling deny pattern: %s", exc)
+                self.disabled.add(compiled.pattern)
+                self._separate.remove(compiled)
+        return None
+
+    def search(self, text: str) -> bool:
+        return self.first(text) is not None
+
+
+__all__ = [
+    "DenyMatcher",
+    "PatternTimeout",
+    "TimedPattern",
+    "bounded_segments",
+    "redos_risk",
+    "trie_regex",
+]
@@ -11,6 +11,9 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from ..config import load_config
+from ..extraction.provenance import ProvenanceIndex, load_provenance
+from ..mining.docfreq import DocFreqStore
+from ..mining.occurrences import OccurrenceIndex
 from .deduplicator import append_aliases_file, collect_alias_suggestions
 from .scorer import TermRecord, assess_seed_quality
 
@@ -91,12 +94,18 @@ def count_occurrences(text_lower: str, term: str) -> int:
     return len(re.findall(pattern, text_lower))
 
 
-def detect_presence(text_lower: str, canonical: str, variants: Iterable[str]) -> Tuple[bool, int, Optional[str]]:
-    total_freq = count_occurrences(text_lower, canonical)
+def detect_presence(
+    text_lower: str,
+    canonical: str,
+    variants: Iterable[str],
+    occurrences: Optional[OccurrenceIndex] = None,
+) -> Tuple[bool, int, Optional[str]]:
+    count = occurrences.count if occurrences is not None else lambda term: count_occurrences(text_lower, term)
+    total_freq = count(canonical)
     if total_freq:
         return True, total_freq, canonical
     for variant in variants:
-        freq = count_occurrences(text_lower, variant)
+        freq = count(variant)
         if freq:
             return True, freq, variant
     return False, 0, None
@@ -111,9 +120,26 @@ def consolidate(
     seeds_data: Optional[List[Dict[str, object]]],
     llm_data: Optional[object],
     allow_llm_aliases: bool,
+    provenance: Optional[ProvenanceIndex] = None,
+    occurrences: Optional[OccurrenceIndex] = None,
+    docfreq: Optional[DocFreqStore] = None,
+    doc_id: Optional[str] = None,
 ) -> Tuple[List[Dict[str, object]], Dict[str, float]]:
+    """Merge seeds and LLM terms; ``provenance`` adds the slides each verified term appears on.
+
+    ``occurrences`` (e.g. the index ``mine`` filled) is reused and extended
+    with the LLM terms, all of which are located in one extra pass. With a
+    ``docfreq`` store the in-deck part of each score is scaled by the term's
+    IDF weight, leaving out deck ``doc_id`` itself.
+    """
     text_lower = deck_text.lower()
+    occurrences = occurrences if occurrences is not None else OccurrenceIndex(deck_text)
     records: Dict[str, TermRecord] = {}
+
+    def new_record(canonical: str, source: str) -> TermRecord:
+        # Slides are only tracked (and emitted) when a provenance index exists.
+        return TermRecord(canonical=canonical, source=source, slides=[] if provenance is not None else None)
+
     stats = {
         "seed_used": 0,
         "seed_filtered": 0,
@@ -148,12 +174,20 @@ def consolidate(
                 stats["seed_filtered"] += 1
                 continue
             freq = int(entry.get("frequency", 1))
-            record = records.setdefault(term.lower(), TermRecord(canonical=term, source="seed"))
+            record = records.setdefault(term.lower(), new_record(term, "seed"))
             record.frequency = max(record.frequency, freq)
             record.present_in_deck = True
             record.priority = max(record.priority, 0.6)
+            if provenance is not None:
+                slides = entry.get("slides")
+                record.slides.extend(slides if isinstance(slides, list) else occurrences.pages(term, provenance))
             stats["seed_used"] += 1
 
+    occurrences.add_terms(
+        canonicalize(normalize(term))
+        for entry in llm_terms
+        for term in [str(entry.get("canonical", "")), *(v for v in entry.get("variants", []) if isinstance(v, str))]
+    )
     for entry in llm_terms:
         canonical = canonicalize(normalize(str(entry.get("canonical", ""))))
         if not canonical:
@@ -178,25 +212,31 @@ def consolidate(
             stats["llm_filtered_priority"] += 1
             continue
 
-        present, freq, matched_variant = detect_presence(text_lower, canonical, variants)
+        present, freq, matched_variant = detect_presence(text_lower, canonical, variants, occurrences)
         if not present and not allow_llm_aliases:
             stats["llm_filtered"] += 1
             continue
-        record = records.setdefault(canonical.lower(), TermRecord(canonical=canonical, source="llm"))
+        record = records.setdefault(canonical.lower(), new_record(canonical, "llm"))
         record.source = "seed+llm" if record.source == "seed" else "llm"
         record.priority = max(record.priority, priority)
         record.classes = sorted(set(record.classes + classes))
         record.variants.extend([v for v in variants if v and v.lower() != canonical.lower()])
         record.present_in_deck = present or present_flag
         record.frequency = max(record.frequency, freq)
+        if provenance is not None and matched_variant:
+            record.slides.extend(occurrences.pages(matched_variant, provenance))
         if not present and allow_llm_aliases:
             record.notes = "Alias not found in deck"
         elif matched_variant and matched_variant.lower() != canonical.lower():
             record.notes = f"Matched variant: {matched_variant}"
         stats["llm_used"] += 1
 
-    payloads = [rec.to_payload() for rec in records.values()]
-    payloads.sort(key=lambda item: (item["score"], item["frequency"], item["canonical"]), reverse=True)
+    if docfreq is not None:
+        idf = docfreq.weights(records, exclude=doc_id)
+        for key, record in records.items():
+            record.idf = idf[key]
+    # Rank the records first and build each payload dict once, in output order.
+    payloads = [rec.to_payload() for rec in sorted(records.values(), key=TermRecord.rank_key, reverse=True)]
     log_stats(
         "usage seeds_used={seed_used} seeds_filtered={seed_filtered} "
         "llm_used={llm_used} llm_filtered={llm_filtered} "
@@ -226,7 +266,13 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     deck_text = args.deck_text.read_text(encoding="utf-8")
     seeds = load_json(args.seeds)
     llm = load_json(args.llm)
-    payloads, stats = consolidate(deck_text, seeds, llm, allow_llm_aliases=args.allow_llm_aliases)
+    payloads, stats = consolidate(
+        deck_text,
+        seeds,
+        llm,
+        allow_llm_aliases=args.allow_llm_aliases,
+        provenance=load_provenance(args.deck_text),
+    )
     if args.stats_file:
         report = stats.copy()
         report["output_terms"] = len(payloads)
@@ -5,9 +5,9 @@ from dataclasses import dataclass, field
 from typing import Callable, Dict, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class TermRecord:
-    """Intermediate representation of a merged term."""
+    """Intermediate representation of a merged term (slotted: one per candidate, so keep it small)."""
 
     canonical: str
     variants: List[str] = field(default_factory=list)
@@ -17,18 +17,24 @@ class TermRecord:
     present_in_deck: bool = False
     frequency: int = 0
     notes: str = ""
+    # Slide numbers; ``None`` (and no ``slides`` key in the payload) without a provenance index.
+    slides: Optional[List[int]] = None
+    # Corpus IDF weight; scales the in-deck evidence, not the LLM priority.
+    idf: Optional[float] = None
+
+    @property
+    def score(self) -> float:
+        evidence = 0.3 * min(self.frequency / 5, 1.0) + 0.3 * (1 if self.present_in_deck else 0)
+        if self.idf is not None:
+            evidence *= self.idf
+        return round(min(1.0, max(0.0, 0.4 * self.priority + evidence)), 3)
+
+    def rank_key(self) -> Tuple[float, int, str]:
+        """Sort key matching the ``(score, frequency, canonical)`` order of the payloads."""
+        return self.score, self.frequency, self.canonical
 
     def to_payload(self) -> Dict[str, object]:
-        score = min(
-            1.0,
-            max(
-                0.0,
-                0.4 * self.priority
-                + 0.3 * min(self.frequency / 5, 1.0)
-                + 0.3 * (1 if self.present_in_deck else 0),
-            ),
-        )
-        return {
+        payload = {
             "canonical": self.canonical,
             "variants": sorted(set(self.variants)) if self.variants else [],
             "classes": self.classes,
@@ -36,9 +42,14 @@ class TermRecord:
             "present_in_deck": self.present_in_deck,
             "frequency": self.frequency,
             "priority": round(self.priority, 3),
-            "score": round(score, 3),
+            "score": self.score,
             "notes": self.notes,
         }
+        if self.slides is not None:
+            payload["slides"] = sorted(set(self.slides))
+        if self.idf is not None:
+            payload["idf"] = round(self.idf, 3)
+        return payload
 
 
 def assess_seed_quality(
@@ -7,16 +7,42 @@ import time
 from pathlib import Path
 
 from asr_bias_builder.extraction import extract_text
-from asr_bias_builder.mining import mine
+from asr_bias_builder.mining import iter_candidates, mine
+from asr_bias_builder.mining.filters import extract_candidates_from_line
 from asr_bias_builder.config import load_config
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Benchmark extraction + mining stages")
     parser.add_argument("deck", type=Path)
+    parser.add_argument(
+        "--scan-mb",
+        type=float,
+        default=0,
+        help="Also compare candidate scanners on the deck text repeated to this many MB",
+    )
     return parser.parse_args()
 
 
+def benchmark_scanners(text: str, size_mb: float) -> None:
+    """Time the per-kind ``findall`` passes against the single-pass ``iter_candidates`` scan."""
+    repeats = max(1, int(size_mb * 1024 * 1024 / max(len(text), 1)))
+    lines = ((text + "\n") * repeats).splitlines()
+    start = time.perf_counter()
+    legacy = sum(len(extract_candidates_from_line(line)) for line in lines)
+    mid = time.perf_counter()
+    single = sum(1 for line in lines for _ in iter_candidates(line))
+    end = time.perf_counter()
+    print(
+        f"scan size={size_mb:g}MB candidates={single} (legacy {legacy}) "
+        f"four_pass={mid-start:.2f}s single_pass={end-mid:.2f}s"
+    )
+    big = "\n".join(lines)
+    start = time.perf_counter()
+    mine(big)
+    print(f"mine size={size_mb:g}MB time={time.perf_counter()-start:.2f}s")
+
+
 def main() -> int:
     args = parse_args()
     cfg = load_config()
@@ -26,6 +52,8 @@ def main() -> int:
     mine(text)
     end = time.perf_counter()
     print(f"extract={mid-start:.2f}s mine={end-mid:.2f}s total={end-start:.2f}s")
+    if args.scan_mb:
+        benchmark_scanners(text, args.scan_mb)
     return 0
 
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from asr_bias_builder.extraction import normalize_text
 
 
@@ -9,3 +11,356 @@ def test_normalize_text(sample_text: str) -> None:
     normalized = normalize_text(sample_text)
     assert "\n" not in normalized.strip().split(" ")[0]
     assert len(normalized) > 10
+
+
+def test_parallel_pdf_extraction_matches_serial(tmp_path: Path) -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction.pdf import extract_pdf_via_pdfminer, extract_pdf_via_pymupdf
+
+    deck = tmp_path / "deck.pdf"
+    doc = fitz.open()
+    for idx in range(12):
+        page = doc.new_page()
+        if idx != 5:
+            page.insert_text((72, 72), f"Slide {idx} Dyson Sphere AI\nLiam Nguyen")
+    doc.save(deck)
+    doc.close()
+
+    assert extract_pdf_via_pymupdf(deck, workers=3) == extract_pdf_via_pymupdf(deck)
+    assert extract_pdf_via_pdfminer(deck, workers=3) == extract_pdf_via_pdfminer(deck)
+
+
+def test_select_ocr_pages_targets_image_only_pages(tmp_path: Path) -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction.pdf import extract_pdf_pages_via_pymupdf, select_ocr_pages
+
+    deck = tmp_path / "mixed.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Quarterly results for Dyson Sphere AI")
+    scanned = doc.new_page()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), 0)
+    pixmap.clear_with(200)
+    scanned.insert_image(scanned.rect, pixmap=pixmap)
+    doc.new_page()  # blank page: nothing to OCR
+    doc.save(deck)
+    doc.close()
+
+    pages = list(enumerate(extract_pdf_pages_via_pymupdf(deck)))
+    assert select_ocr_pages(deck, pages, min_text_chars=10, min_image_coverage=0.3) == [1]
+
+
+def test_iter_pages_joins_to_extract_text(tmp_path: Path, sample_text: str) -> None:
+    from asr_bias_builder.extraction import PAGE_SEPARATOR, extract_text, iter_pages
+
+    deck = tmp_path / "deck.txt"
+    deck.write_text("Team:\nLiam Nguyn\f\f  Dyson Sphere Al  \n\f" + sample_text, encoding="utf-8")
+    pages = list(iter_pages(deck))
+    assert [page.number for page in pages] == [1, 3, 4]
+    assert pages[1].text == "Dyson Sphere AI"
+    assert PAGE_SEPARATOR.join(page.text for page in pages) == extract_text(deck)
+
+
+def test_write_deck_text_uses_cache(tmp_path: Path, sample_text: str, config_dict: dict) -> None:
+    from asr_bias_builder.extraction import ExtractionStats, write_deck_text
+    from asr_bias_builder.utils.cache import DiskCache
+
+    deck = tmp_path / "deck.txt"
+    deck.write_text(sample_text, encoding="utf-8")
+    cache = DiskCache(tmp_path / "cache", max_bytes=10 * len(sample_text))
+    first, second = ExtractionStats(), ExtractionStats()
+    write_deck_text(deck, tmp_path / "a.txt", config=config_dict, cache=cache, stats=first)
+    write_deck_text(deck, tmp_path / "b.txt", config=config_dict, cache=cache, stats=second)
+    assert (first.cache_misses, second.cache_hits) == (1, 1)
+    assert (tmp_path / "a.txt").read_text(encoding="utf-8") == (tmp_path / "b.txt").read_text(encoding="utf-8")
+
+    changed = dict(config_dict, ocr_aliases={})
+    write_deck_text(deck, tmp_path / "c.txt", config=changed, cache=cache, stats=second)
+    assert second.cache_misses == 1
+
+    assert (tmp_path / "b.provenance.json").exists()
+
+    cache.max_bytes = 0
+    assert cache.evict() == 6 and cache.size() == 0  # deck text, provenance and counters per entry
+
+
+def test_write_deck_text_does_not_cache_truncated_extraction(
+    tmp_path: Path, config_dict: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from asr_bias_builder.extraction import ExtractionStats, pages, write_deck_text
+    from asr_bias_builder.utils.cache import DiskCache
+
+    def truncated(path, cfg, workers, ocr_workers, ocr_allowed, stats):
+        stats.strategies["pymupdf"] = {"seconds": 1.0, "pages": 1, "status": "abandoned", "reason": "timeout: slow"}
+        yield 0, "Kubernetes rollout plan"
+
+    deck = tmp_path / "deck.pdf"
+    deck.write_bytes(b"%PDF-1.4 stand-in")
+    cache = DiskCache(tmp_path / "cache", max_bytes=1 << 20)
+    monkeypatch.setattr(pages, "_iter_pdf_pages", truncated)
+    first, second = ExtractionStats(), ExtractionStats()
+    write_deck_text(deck, tmp_path / "a.txt", config=config_dict, cache=cache, stats=first)
+    write_deck_text(deck, tmp_path / "b.txt", config=config_dict, cache=cache, stats=second)
+    assert (first.cache_misses, second.cache_misses, second.cache_hits) == (1, 1, 0)
+    assert cache.size() == 0
+
+
+def test_regex_timeouts_keep_text_out_of_the_cache(
+    tmp_path: Path, config_dict: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from asr_bias_builder.extraction import ExtractionStats, PageText, pages, write_deck_text
+    from asr_bias_builder.extraction.cache import extraction_cache_key
+    from asr_bias_builder.utils.cache import DiskCache
+
+    def timed_out(path, enable_ocr, cfg, workers, stats):
+        yield PageText(1, "Kubernetes rollout plan")
+        stats.regex_timeouts = ["(a+)+$"]
+
+    deck = tmp_path / "deck.txt"
+    deck.write_text("Kubernetes rollout plan", encoding="utf-8")
+    assert extraction_cache_key(deck, dict(config_dict, regex_timeout_seconds=0.5)) != extraction_cache_key(
+        deck, dict(config_dict, regex_timeout_seconds=5)
+    )
+    cache = DiskCache(tmp_path / "cache", max_bytes=1 << 20)
+    monkeypatch.setattr(pages, "iter_pages", timed_out)
+    write_deck_text(deck, tmp_path / "a.txt", config=config_dict, cache=cache, stats=ExtractionStats())
+    assert cache.size() == 0
+
+
+def test_ocr_pool_batches_raw_images_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction import ocr_engine
+
+    class SizeBackend(ocr_engine.OcrBackend):
+        def __init__(self) -> None:
+            self.batches = []
+
+        def recognize(self, images):
+            self.batches.append(len(images))
+            return [f"{image.width}x{image.height}" for image in images]
+
+    backend = SizeBackend()
+    monkeypatch.setattr(ocr_engine, "create_backend", lambda name, lang: backend)
+    images = []
+    for size in range(1, 6):
+        pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, size, 2 * size), 0)
+        images.append(ocr_engine.RawImage.from_pixmap(pixmap))
+    assert images[0].to_pil().size == (1, 2)
+
+    with ocr_engine.OcrPool(workers=1, batch_size=2) as pool:
+        assert list(pool.recognize(iter(images))) == ["1x2", "2x4", "3x6", "4x8", "5x10"]
+    assert backend.batches == [2, 2, 1]
+
+
+def test_ocr_backend_without_recognize_cannot_be_instantiated() -> None:
+    from asr_bias_builder.extraction import ocr_engine
+
+    class IncompleteBackend(ocr_engine.OcrBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_page_renderer_reuses_ocr_for_duplicate_pages(tmp_path: Path) -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction import ExtractionStats
+    from asr_bias_builder.extraction.render import PageRenderer, page_dpi
+
+    class CountingPool:
+        calls = 0
+
+        def recognize_timed(self, images):
+            for image in images:
+                assert image.mode == "L"
+                self.calls += 1
+                yield f"ocr-{self.calls}", 0.01
+
+    deck = tmp_path / "scanned.pdf"
+    doc = fitz.open()
+    for logo in (False, True, False):
+        page = doc.new_page()
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 1190, 1684), 0)
+        pixmap.clear_with(230)
+        page.insert_image(page.rect, pixmap=pixmap)
+        if logo:
+            page.draw_rect(fitz.Rect(60, 60, 300, 200), fill=(0, 0, 0))
+    doc.save(deck)
+
+    stats = ExtractionStats()
+    renderer = PageRenderer(CountingPool(), stats=stats)
+    with fitz.open(deck) as doc:
+        assert page_dpi(doc[0]) == 144  # native resolution of the embedded scan
+        assert list(renderer.ocr(doc, range(3))) == [(0, "ocr-1"), (1, "ocr-2"), (2, "ocr-1")]
+    assert (stats.ocr_pages, stats.ocr_dedup_hits) == (2, 1)
+    assert set(stats.ocr_page_seconds) == {"1", "2"}
+
+
+def test_page_renderer_ocrs_template_slides_with_different_text() -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction import ExtractionStats
+    from asr_bias_builder.extraction.render import PageRenderer, dhash
+
+    class CountingPool:
+        calls = 0
+
+        def recognize_timed(self, images):
+            for _ in images:
+                self.calls += 1
+                yield f"ocr-{self.calls}", 0.01
+
+    doc = fitz.open()
+    for growth in (12, 13, 12):
+        page = doc.new_page(width=960, height=540)
+        page.draw_rect(fitz.Rect(0, 0, 960, 80), fill=(0.1, 0.2, 0.5))
+        page.insert_text((60, 160), f"Q3 revenue grew {growth}% year over year", fontsize=28)
+    assert dhash(doc[0]) == dhash(doc[1])  # the thumbnail hash alone cannot tell them apart
+
+    stats = ExtractionStats()
+    renderer = PageRenderer(CountingPool(), stats=stats)
+    assert list(renderer.ocr(doc, range(3))) == [(0, "ocr-1"), (1, "ocr-2"), (2, "ocr-1")]
+    assert (stats.ocr_pages, stats.ocr_dedup_hits) == (2, 1)
+
+
+def test_pptx_xml_fast_path_matches_python_pptx(tmp_path: Path) -> None:
+    pptx = pytest.importorskip("pptx")
+    from pptx.util import Inches
+
+    from asr_bias_builder.extraction.pptx import iter_pptx_slides, iter_pptx_slides_via_python_pptx
+
+    deck = tmp_path / "deck.pptx"
+    prs = pptx.Presentation()
+    for idx in range(2):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Roadmap {idx}"
+        slide.placeholders[1].text = "Dyson Sphere AI\nLiam Nguyen"
+        table = slide.shapes.add_table(1, 2, Inches(1), Inches(4), Inches(4), Inches(1)).table
+        table.cell(0, 1).text = "Kubernetes"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(Inches(5), Inches(5), Inches(2), Inches(1)).text = "Grouped label"
+        slide.notes_slide.notes_text_frame.text = "Mention Project Atlas"
+    prs.save(deck)
+
+    slides = list(iter_pptx_slides(deck))
+    assert slides[1] == (
+        2,
+        "[Slide 2]\nRoadmap 1\nDyson Sphere AI\nLiam Nguyen\nKubernetes\nGrouped label\nMention Project Atlas",
+    )
+    assert slides == list(iter_pptx_slides_via_python_pptx(deck))
+
+
+def test_ocr_aliases_apply_in_one_longest_match_pass() -> None:
+    from asr_bias_builder.extraction.ocr import apply_ocr_normalization, compile_ocr_normalizer
+
+    config = {
+        "ocr_aliases": {
+            "Dyson Sphere": ["Dyson Spher", "dyson spher al"],
+            "AI": ["Al"],
+            "Liam Nguyen": ["Liam Nguyn", "Nguyn"],
+        }
+    }
+    text = "DYSON SPHER AL by liam nguyn; Alpha Al Dyson Sphere"
+    assert apply_ocr_normalization(text, config) == "Dyson Sphere by Liam Nguyen; Alpha AI Dyson Sphere"
+    first, second = compile_ocr_normalizer(dict(config)), compile_ocr_normalizer(config)
+    assert first.compiled is second.compiled
+
+    # A rule disabled after a timeout stays disabled only for the run that hit it.
+    first.disabled.add("stale")
+    assert compile_ocr_normalizer(config).disabled == set()
+
+
+def test_preserve_structure_keeps_lines_and_slide_markers(tmp_path: Path, config_dict: dict) -> None:
+    fitz = pytest.importorskip("fitz")
+    from asr_bias_builder.extraction import extract_text, normalize_text
+
+    assert normalize_text("  Team:\t Liam  Nguyen \r\n\n\x0bDyson   Sphere ", preserve_structure=True) == (
+        "Team: Liam Nguyen\nDyson Sphere"
+    )
+
+    deck = tmp_path / "deck.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Leadership Team\nLiam   Nguyen")
+    doc.new_page()
+    doc.new_page().insert_text((72, 72), "Roadmap")
+    doc.save(deck)
+    doc.close()
+
+    text = extract_text(deck, config=dict(config_dict, preserve_structure=True))
+    assert text == "[Slide 1]\nLeadership Team\nLiam Nguyen\n[Slide 3]\nRoadmap"
+    assert extract_text(deck, config=config_dict) == "Leadership Team Liam Nguyen Roadmap"
+
+
+def test_provenance_index_maps_offsets_to_slides(tmp_path: Path, config_dict: dict) -> None:
+    from asr_bias_builder.extraction import load_provenance, write_deck_text
+
+    deck = tmp_path / "deck.txt"
+    deck.write_text("Intro\nLiam Nguyen\f\fDyson Sphere roadmap\fLiam Nguyen again", encoding="utf-8")
+    dest = tmp_path / "deck_text.txt"
+    write_deck_text(deck, dest, config=dict(config_dict, preserve_structure=True))
+    text = dest.read_text(encoding="utf-8")
+    index = load_provenance(dest)
+
+    assert index.locate(text.index("Liam")) == (1, 1)
+    assert index.page_at(text.index("Dyson")) == 3
+    assert index.find_pages(text.lower(), "liam nguyen") == [1, 4]
+    assert index.pages_between(0, len(text)) == [1, 3, 4]
+
+
+def test_boilerplate_lines_are_stripped_across_pages(tmp_path: Path, config_dict: dict) -> None:
+    from asr_bias_builder.extraction import ExtractionStats, iter_pages
+
+    footer = "Confidential - Do not distribute\nPage {n} of 5"
+    bodies = ["Leadership Team", "Dyson Sphere roadmap", "Kubernetes rollout", "Liam Nguyen", "Customer wins"]
+    deck = tmp_path / "deck.txt"
+    deck.write_text(
+        "\f".join(f"{body}\n{footer.format(n=n)}" for n, body in enumerate(bodies, start=1)),
+        encoding="utf-8",
+    )
+    stats = ExtractionStats()
+    pages = list(iter_pages(deck, config=dict(config_dict, strip_boilerplate=True), stats=stats))
+    assert [page.text for page in pages] == bodies
+    assert (stats.boilerplate_patterns, stats.boilerplate_lines_removed) == (2, 10)
+
+    kept = list(iter_pages(deck, config=config_dict))
+    assert kept[0].text == "Leadership Team Confidential - Do not distribute Page 1 of 5"
+
+    # Long lines differing only in their figures are content, not a footer.
+    rows = tmp_path / "rows.txt"
+    rows.write_text("\f".join(f"Quarterly revenue grew to {n}.{n} million in 202{n}" for n in range(5)), encoding="utf-8")
+    assert len(list(iter_pages(rows, config=dict(config_dict, strip_boilerplate=True)))) == 5
+
+
+def _slow_pages(delay: float, stats) -> object:
+    import time
+
+    stats.pages += 1
+    yield 0, "first page"
+    time.sleep(delay)
+    yield 1, "never reached"
+
+
+def test_unreadable_pdf_raises_with_strategy_errors(tmp_path: Path) -> None:
+    from asr_bias_builder.extraction import extract_text
+
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4\nthis is not a pdf body\n%%EOF\n")
+    with pytest.raises(RuntimeError, match=r"broken\.pdf: .*pymupdf failed.*pdfminer"):
+        extract_text(broken, enable_ocr=True)
+
+
+def test_subprocess_strategy_is_killed_past_its_budget() -> None:
+    from asr_bias_builder.extraction.budget import Budget, BudgetExceeded, iter_in_subprocess
+
+    finished = iter_in_subprocess(_slow_pages, (0.0,), Budget(seconds=30))
+    assert [item for item in _drain(finished)] == [(0, "first page"), (1, "never reached")]
+
+    pages = []
+    with pytest.raises(BudgetExceeded) as excinfo:
+        for item in iter_in_subprocess(_slow_pages, (60.0,), Budget(seconds=1)):
+            pages.append(item)
+    assert excinfo.value.reason == "timeout"
+    assert pages == [(0, "first page")]
+
+
+def _drain(generator):
+    result = yield from generator
+    assert result.pages == 1
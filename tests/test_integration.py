@@ -24,3 +24,277 @@ def test_run_pipeline_without_llm(tmp_path, sample_text):
     )
     assert (out_dir / "deck_terms.txt").exists()
     assert summary.exists()
+
+
+def _fake_claude(tmp_path, monkeypatch, body: str) -> None:
+    """Put a Python ``claude`` stand-in running ``body`` (stdin in ``prompt``) first on PATH."""
+    import os
+    import stat
+    import sys
+
+    fake = tmp_path / "bin" / "claude"
+    fake.parent.mkdir(exist_ok=True)
+    fake.write_text(f"#!{sys.executable}\nimport json, re, sys\nprompt = sys.stdin.read()\n{body}", encoding="utf-8")
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{fake.parent}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_run_claude_fans_out_chunks_and_merges_terms(tmp_path, monkeypatch):
+    from asr_bias_builder.llm import run_claude
+
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        "index = int(re.match(r'\\[Chunk (\\d+)/', prompt).group(1))\n"
+        "terms = [{'canonical': 'Dyson Sphere', 'variants': [f'DS{index}'], 'classes': ['PRODUCT'],"
+        " 'priority': index / 10, 'present_in_deck': index == 2}]\n"
+        "if index == 3:\n"
+        "    terms.append({'canonical': 'Helios', 'classes': ['ORG'], 'priority': 0.5})\n"
+        "print(json.dumps({'result': '```json\\n' + json.dumps({'terms': terms}) + '\\n```'}))\n",
+    )
+    deck = tmp_path / "deck_text.txt"
+    deck.write_text("x" * 250, encoding="utf-8")
+    output = tmp_path / "llm_candidates.json"
+    result = run_claude(
+        deck, tmp_path / "schema.md", output, "sonnet", chunk_size=100, stream_threshold_bytes=50, concurrency=3
+    )
+    assert result.returncode == 0
+    terms = json.loads(output.read_text(encoding="utf-8"))["terms"]
+    assert [term["canonical"] for term in terms] == ["Dyson Sphere", "Helios"]
+    assert terms[0]["variants"] == ["DS1", "DS2", "DS3"]
+    assert terms[0]["priority"] == 0.3 and terms[0]["present_in_deck"] is True
+    assert len(json.loads((tmp_path / "llm_candidates_raw.json").read_text(encoding="utf-8"))) == 3
+
+
+def test_run_claude_chunk_cache_requeries_only_changed_slides(tmp_path, monkeypatch):
+    from asr_bias_builder.llm import LlmCache, run_claude
+    from asr_bias_builder.utils.cache import DiskCache
+
+    calls = tmp_path / "calls.txt"
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        f"open({str(calls)!r}, 'a').write('x')\n"
+        "terms = [{'canonical': name, 'priority': 0.5} for name in re.findall(r'Topic\\w+', prompt)]\n"
+        "print(json.dumps({'result': json.dumps({'terms': terms})}))\n",
+    )
+    schema = tmp_path / "schema.md"
+    schema.write_text("prompt", encoding="utf-8")
+    deck = tmp_path / "deck_text.txt"
+    output = tmp_path / "llm_candidates.json"
+    cache = DiskCache(tmp_path / "cache", max_bytes=10**8)
+
+    def run(slides: list) -> list:
+        calls.write_text("")
+        deck.write_text("\n".join(f"[Slide {i}]\n{body}" for i, body in enumerate(slides, 1)), encoding="utf-8")
+        chunk_cache = LlmCache(cache)
+        result = run_claude(
+            deck,
+            schema,
+            output,
+            "sonnet",
+            stream_threshold_bytes=50,
+            concurrency=2,
+            chunk_tokens=400,
+            chunk_cache=chunk_cache,
+        )
+        assert result.returncode == 0
+        return [term["canonical"] for term in json.loads(output.read_text(encoding="utf-8"))["terms"]]
+
+    slides = [f"Topic{i} " + "filler words about the slide " * 6 for i in range(60)]
+    assert run(slides) == [f"Topic{i}" for i in range(60)]
+    first_calls = len(calls.read_text())
+    slides[30] = "TopicNew " + "filler words about the slide " * 6
+    slides.insert(3, "TopicInserted " + "filler words about the slide " * 6)
+    terms = run(slides)
+    assert set(terms) == {f"Topic{i}" for i in range(60) if i != 30} | {"TopicNew", "TopicInserted"}
+    assert 0 < len(calls.read_text()) <= 6 < first_calls
+
+
+def test_pipeline_does_not_cache_partial_fanout_results(tmp_path, monkeypatch, sample_text):
+    calls = tmp_path / "calls.txt"
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        f"open({str(calls)!r}, 'a').write('x')\n"
+        "if prompt.startswith('[Chunk 2/'):\n"
+        "    print(json.dumps({'result': 'sorry, no JSON here'}))\n"
+        "else:\n"
+        "    terms = [{'canonical': 'Dyson Sphere', 'priority': 0.9, 'present_in_deck': True}]\n"
+        "    print(json.dumps({'result': json.dumps({'terms': terms})}))\n",
+    )
+    deck = tmp_path / "deck.txt"
+    deck.write_text(sample_text, encoding="utf-8")
+
+    def run(out: str) -> dict:
+        run_pipeline(
+            deck_path=deck,
+            output_dir=tmp_path / out,
+            summary_csv=tmp_path / "summary.csv",
+            config_path=Path("config/default.yml"),
+            cache_dir=tmp_path / "cache",
+            chunk_size=400,
+            stream_threshold=100,
+            llm_concurrency=2,
+        )
+        return json.loads((tmp_path / out / "verify_stats.json").read_text(encoding="utf-8"))
+
+    first = run("first")
+    first_calls = len(calls.read_text())
+    assert first_calls > 2 and first["llm_cache_misses"] == 1
+    second = run("second")
+    assert (second["llm_cache_hits"], second["llm_cache_misses"]) == (0, 1)
+    # Only the chunk that failed to parse is sent again; the rest come from the chunk cache.
+    assert len(calls.read_text()) == first_calls + 1
+
+
+def test_cache_dir_alone_keeps_large_decks_in_one_streaming_call(tmp_path, monkeypatch, sample_text):
+    calls = tmp_path / "calls.txt"
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        f"open({str(calls)!r}, 'a').write(' '.join(sys.argv[1:]) + chr(10))\n"
+        "print(json.dumps({'result': json.dumps({'terms': []})}))\n",
+    )
+    deck = tmp_path / "deck.txt"
+    deck.write_text(sample_text, encoding="utf-8")
+    run_pipeline(
+        deck_path=deck,
+        output_dir=tmp_path / "out",
+        summary_csv=tmp_path / "summary.csv",
+        config_path=Path("config/default.yml"),
+        cache_dir=tmp_path / "cache",
+        stream_threshold=100,
+    )
+    invocations = calls.read_text().splitlines()
+    assert len(invocations) == 1
+    assert "--input-format stream-json" in invocations[0]
+
+
+def test_pack_chunks_resynchronizes_after_an_edit():
+    from asr_bias_builder.llm import pack_chunks
+
+    slides = [f"[Slide {i}]\nHelios module {i * 7} runs Argo step {i * 13}" + " x" * (i % 5 * 10) for i in range(300)]
+    before = {chunk.key for chunk in pack_chunks("\n".join(slides), 800)}
+    # A much longer slide shifts the deck's average slide size but must not move distant boundaries.
+    slides[9] += " padding" * 900
+    after = [chunk.key for chunk in pack_chunks("\n".join(slides), 800)]
+    assert sum(key not in before for key in after) <= 4
+
+
+def test_compact_deck_drops_duplicates_and_fits_budget():
+    from asr_bias_builder.llm import compact_deck
+
+    filler = " ".join(f"word{i}" for i in range(40))
+    slides = [
+        "Helios Platform\nHelios runs on Kubernetes with Argo and Flux",
+        "Revenue table\n2021 2022 2023 12.5 17.8 23.1",
+        "Helios Platform\nHelios runs on Kubernetes with Argo and Flux",
+        f"Market view\n{filler} today",
+        f"Market outlook\n{filler} tomorrow",
+        "Closing\nThanks to everyone at Acme for listening",
+    ]
+    text = "\n".join(f"[Slide {i}]\n{body}" for i, body in enumerate(slides, 1))
+    compacted, report = compact_deck(text, ["Helios", "Kubernetes", "Argo", "Flux"], budget_tokens=80)
+    assert report.numeric_lines == 1 and report.duplicate_lines == 2
+    assert report.near_duplicate_sections == 1
+    assert {entry["slide"]: entry["reason"] for entry in report.omitted} == {4: "budget", 5: "near_duplicate"}
+    assert compacted.startswith("[Slide 1]\nHelios Platform\nHelios runs on Kubernetes")
+    assert "[Slide 4]" not in compacted and "[Slide 6]" in compacted and "2021" not in compacted
+    assert report.output_tokens <= 80 and report.tokens_saved == report.input_tokens - report.output_tokens
+
+    # Lines differing only in their digits are different entities, not repeats.
+    text = "[Slide 1]\nLineup\niPhone 15 Pro\n[Slide 2]\nLineup\niPhone 16 Pro\n[Slide 3]\nLineup\niphone  16 PRO"
+    compacted, report = compact_deck(text, ["iPhone"])
+    assert "iPhone 15 Pro" in compacted and "iPhone 16 Pro" in compacted and "PRO" not in compacted
+    assert report.duplicate_lines == 3  # "Lineup" twice and the re-cased, re-spaced "iphone  16 PRO"
+
+    # Agenda slides rank below equally dense ones through the compaction-only weights, not mining's.
+    from asr_bias_builder.mining.filters import SECTION_KEYWORD_WEIGHTS
+
+    assert "agenda" not in SECTION_KEYWORD_WEIGHTS
+    text = "[Slide 1]\nAgenda\nHelios and Argo overview\n[Slide 2]\nRoadmap\nHelios and Flux overview"
+    compacted, _ = compact_deck(text, ["Helios", "Argo", "Flux"], budget_tokens=12)
+    assert compacted.startswith("[Slide 2]")
+
+
+def test_pipeline_reuses_cached_llm_response(tmp_path, monkeypatch, sample_text):
+    calls = tmp_path / "calls.txt"
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        f"open({str(calls)!r}, 'a').write('x')\n"
+        "terms = [{'canonical': 'Dyson Sphere', 'classes': ['PRODUCT'], 'priority': 0.9, 'present_in_deck': True}]\n"
+        "print(json.dumps({'result': json.dumps({'terms': terms})}))\n",
+    )
+    deck = tmp_path / "deck.txt"
+    deck.write_text(sample_text, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    def run(out: str, **kwargs) -> dict:
+        run_pipeline(
+            deck_path=deck,
+            output_dir=tmp_path / out,
+            summary_csv=tmp_path / "summary.csv",
+            config_path=Path("config/default.yml"),
+            cache_dir=cache_dir,
+            stream_threshold=10**9,
+            **kwargs,
+        )
+        return json.loads((tmp_path / out / "verify_stats.json").read_text(encoding="utf-8"))
+
+    first = run("first")
+    second = run("second")
+    assert calls.read_text() == "x"
+    assert (first["llm_cache_hits"], first["llm_cache_misses"]) == (0, 1)
+    assert (second["llm_cache_hits"], second["llm_cache_misses"]) == (1, 0)
+    assert json.loads((tmp_path / "second" / "llm_candidates.json").read_text())["terms"][0]["canonical"] == "Dyson Sphere"
+
+    bypassed = run("bypassed", use_llm_cache=False)
+    assert calls.read_text() == "xx"
+    assert "llm_cache_hits" not in bypassed
+
+
+def test_pipeline_classify_mode_sends_seed_batches(tmp_path, monkeypatch, sample_text):
+    calls = tmp_path / "calls.txt"
+    _fake_claude(
+        tmp_path,
+        monkeypatch,
+        f"open({str(calls)!r}, 'a').write(prompt.split(chr(10))[0] + chr(10))\n"
+        "items = [json.loads(line) for line in prompt.splitlines() if line.startswith('{')]\n"
+        "terms = [{'canonical': item['term'], 'classes': ['PRODUCT'], 'priority': 0.8, 'present_in_deck': True}"
+        " for item in items if item['contexts']]\n"
+        "print(json.dumps({'result': json.dumps({'terms': terms})}))\n",
+    )
+    deck = tmp_path / "deck.txt"
+    deck.write_text(sample_text, encoding="utf-8")
+    run_pipeline(
+        deck_path=deck,
+        output_dir=tmp_path / "out",
+        summary_csv=tmp_path / "summary.csv",
+        config_path=Path("config/default.yml"),
+        llm_mode="classify",
+        llm_concurrency=2,
+    )
+    seeds = json.loads((tmp_path / "out" / "seeds.json").read_text(encoding="utf-8"))
+    batches = calls.read_text().splitlines()
+    assert len(batches) == -(-len(seeds) // 80)
+    assert all(line.startswith("[Batch ") for line in batches)
+    terms = json.loads((tmp_path / "out" / "llm_candidates.json").read_text(encoding="utf-8"))["terms"]
+    assert {term["canonical"] for term in terms} == {seed["term"] for seed in seeds if seed["contexts"]}
+    stats = json.loads((tmp_path / "out" / "verify_stats.json").read_text(encoding="utf-8"))
+    assert stats["llm_mode"] == "classify"
+    verified = json.loads((tmp_path / "out" / "verified_terms.json").read_text(encoding="utf-8"))
+    assert any("PRODUCT" in term["classes"] for term in verified)
+
+
+def test_pipeline_entry_points_accept_the_same_options():
+    from asr_bias_builder import cli, pipeline
+
+    def options(parser) -> set:
+        return {option for action in parser._actions for option in action.option_strings}
+
+    subcommand = cli.build_parser()._subparsers._group_actions[0].choices["pipeline"]
+    assert options(pipeline.build_parser()) == options(subcommand)
+    args = pipeline.build_parser().parse_args(["deck.pdf", "--llm-mode", "auto", "--no-llm-cache"])
+    assert (args.llm_mode, args.use_llm_cache, args.llm_concurrency) == ("auto", False, None)
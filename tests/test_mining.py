@@ -7,3 +7,199 @@ def test_mine_returns_seeds(sample_text: str) -> None:
     seeds, stats = mine(sample_text, min_freq=1, max_terms=20)
     assert len(seeds) > 0
     assert hasattr(stats, "stop_words")
+
+
+def test_iter_candidates_matches_per_kind_findall(sample_text: str) -> None:
+    from collections import Counter
+
+    from asr_bias_builder.mining import iter_candidates
+    from asr_bias_builder.mining.filters import extract_candidates_from_line, normalize_term
+
+    text = sample_text + "\nOpen-Source R&D ab-CD AB- a-b-c_ DysonSphere Alpha  Beta Gamma Delta Epsilon 2024"
+    for line in text.splitlines():
+        candidates = list(iter_candidates(line))
+        assert Counter(c.text for c in candidates) == Counter(
+            normalize_term(token) for token in extract_candidates_from_line(line)
+        )
+        assert [c.start for c in candidates] == sorted(c.start for c in candidates)
+
+    kinds = {(c.kind, c.text) for c in iter_candidates("Open-Source DysonSphere R&D")}
+    assert kinds == {
+        ("proper", "Open"),
+        ("proper", "Source"),
+        ("mixed", "Open-Source"),
+        ("camel", "DysonSphere"),
+        ("caps", "R&D"),
+    }
+
+
+def test_iter_candidates_spans_match_the_four_kind_patterns() -> None:
+    import random
+
+    from asr_bias_builder.mining import iter_candidates
+    from asr_bias_builder.mining.filters import ALL_CAPS_RE, CAMEL_RE, MIXED_TOKEN_RE, PROPER_CASE_RE
+
+    patterns = {"proper": PROPER_CASE_RE, "caps": ALL_CAPS_RE, "mixed": MIXED_TOKEN_RE, "camel": CAMEL_RE}
+
+    def spans(text: str) -> list:
+        return sorted((kind, m.start(), m.end()) for kind, rx in patterns.items() for m in rx.finditer(text))
+
+    line = "We ship iPhone-15 cases via eBay/PayPal and mRNA-1273 doses"
+    assert {c.text for c in iter_candidates(line) if c.kind == "mixed"} == {"iPhone-15", "eBay/PayPal", "mRNA-1273"}
+    rng = random.Random(7)
+    alphabet = "aAbBzZiPM-/&0159 _.éÉ\n"
+    samples = [line, "zM/1B aAi/1P/ bAb-ZMP iOS-17 macOS/iPadOS"]
+    samples += ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16))) for _ in range(20_000)]
+    for text in samples:
+        assert sorted((c.kind, c.start, c.end) for c in iter_candidates(text)) == spans(text), text
+
+
+def test_deny_matcher_attributes_hits_per_pattern() -> None:
+    import re
+
+    from asr_bias_builder.mining.filters import FilterStats
+    from asr_bias_builder.utils.patterns import DenyMatcher
+
+    matcher = DenyMatcher([r"^demo[0-9_-]", r"\.py$", r"(ab)\1", r"(?s)x.y"])
+    assert matcher.first("Demo1 app") == r"^demo[0-9_-]"
+    assert matcher.first("setup.PY") == r"\.py$"
+    assert matcher.first("abab") == r"(ab)\1"
+    assert matcher.first("x\ny") == r"(?s)x.y"
+    assert matcher.first("Kubernetes") is None
+
+    alternations = [r"\.py|\.js", r"-foo|-bar", r"^demo|test$", r"[|]x|y-"]
+    alternation_matcher = DenyMatcher(alternations)
+    for text in ("app.js", "app.py", "x-bar", "a-foo", "demo app", "unit test", "a|x", "y-z", "Kubernetes"):
+        expected = next((p for p in alternations if re.search(p, text, re.IGNORECASE)), None)
+        assert alternation_matcher.first(text) == expected, text
+
+    stats = FilterStats()
+    for term in ("demo_1", "demo-2", "main.py"):
+        stats.reject("deny_patterns", matcher.first(term))
+    stats.reject("deny_exact")
+    assert stats.deny_patterns == {r"^demo[0-9_-]": 2, r"\.py$": 1}
+    assert (stats.pattern_rejects, stats.total_filtered) == (4, 4)
+
+
+def test_unsafe_patterns_are_vetted_and_time_boxed() -> None:
+    import pytest
+
+    from asr_bias_builder.config import vet_patterns
+    from asr_bias_builder.utils.patterns import DenyMatcher, redos_risk
+
+    assert redos_risk(r"(\w+\s?)+$")
+    assert redos_risk(r"(?:a|a)+")
+    assert redos_risk(r"\b[A-Za-z]+(?:[-/][A-Za-z0-9]+)+\b") is None
+    assert redos_risk(r"(\w+\s?)++$") is None
+
+    with pytest.raises(ValueError, match="Unsafe ocr_normalizations"):
+        vet_patterns({"ocr_normalizations": [{"pattern": r"^(\w+\s?)+$", "replacement": ""}]})
+    vet_patterns({"deny_patterns": [r"(a+)+"], "allow_unsafe_patterns": True})
+
+    matcher = DenyMatcher([r"\.py$", r"(?:a|aa)+$"], timeout=0.05)
+    assert matcher.first("a" * 60 + "!") is None
+    assert matcher.disabled == {r"(?:a|aa)+$"}
+    assert matcher.first("setup.py") == r"\.py$"
+
+
+def test_occurrence_index_finds_every_occurrence_in_one_pass() -> None:
+    from asr_bias_builder.extraction.provenance import ProvenanceIndex
+    from asr_bias_builder.mining import OccurrenceIndex
+
+    text = "Liam Nguyen met liam. NguyenLiam"
+    index = OccurrenceIndex(text)
+    index.add_terms(["Liam", "liam nguyen", "Nguyen", "am"])
+    assert index.positions("liam") == [0, 16, 28]
+    assert index.positions("Liam Nguyen") == [0]
+    assert index.positions("nguyen") == [5, 22]
+    assert index.count("am") == 3
+
+    provenance = ProvenanceIndex()
+    for page, offset in enumerate((0, 12, 22), start=1):
+        provenance.add(offset, page)
+    assert index.pages("liam", provenance) == [1, 2, 3]
+
+    spread = OccurrenceIndex(" ".join(f"Kubernetes cluster {n}" for n in range(50)))
+    snippets = spread.contexts("cluster", limit=3)
+    assert len(snippets) == 3
+    assert "cluster 0 " in snippets[0] and "cluster 49" in snippets[-1]
+
+
+def test_chunked_mining_state_merges_to_the_single_pass_result(sample_text: str) -> None:
+    from functools import reduce
+
+    from asr_bias_builder.mining import MiningState, mine_chunks, mine_pages
+    from asr_bias_builder.mining.state import mine_chunk, text_chunks
+
+    text = "TEAM\n" + sample_text.replace(". ", ".\n")
+    whole = mine_chunks(text_chunks(text))
+    chunks = [mine_chunk(chunk) for chunk in text_chunks(text, size=40)]
+    assert len(chunks) > 3
+    left = reduce(MiningState.merge, chunks, MiningState())
+    right = MiningState().merge(chunks[0]).merge(reduce(MiningState.merge, chunks[1:], MiningState()))
+    for merged in (left, right):
+        assert dict(merged.totals().items()) == dict(whole.totals().items())
+        assert merged.stats == whole.stats
+
+    pages = list(enumerate(("Kubernetes on page one", "Helm Charts", "Kubernetes again"), start=1))
+    seeds, _ = mine_pages(pages)
+    by_term = {seed["term"]: seed for seed in seeds}
+    assert by_term["Kubernetes"]["slides"] == [1, 3]
+    assert by_term["Kubernetes"]["frequency"] == 2
+
+
+def test_docfreq_store_down_weights_terms_in_every_deck(tmp_path) -> None:
+    from asr_bias_builder.mining import DocFreqStore
+
+    store = DocFreqStore(tmp_path / "docfreq.sqlite", min_docs=3, floor=0.2)
+    for idx in range(4):
+        store.record(f"deck-{idx}", ["Acme", f"Widget{idx}"])
+    store.record("deck-0", ["Acme", "Widget0"])
+    assert len(store) == 4
+    assert store.doc_freqs(["acme", "widget0", "unseen"]) == {"acme": 4, "widget0": 1, "unseen": 0}
+
+    weights = store.weights(["Acme", "Widget0", "Gadget"], exclude="deck-0")
+    assert weights["acme"] == 0.2
+    assert weights["widget0"] == weights["gadget"] == 1.0
+
+    text = "Acme, Acme, Acme, Gadget, Gadget"
+    plain, _ = mine(text)
+    weighted, _ = mine(text, docfreq=store, doc_id="deck-9")
+    assert [s["term"] for s in plain] == ["Acme", "Gadget"]
+    assert [s["term"] for s in weighted] == ["Gadget", "Acme"]
+    assert weighted[1]["idf"] < 1.0
+    assert "deck-9" in store and len(store) == 5
+    store.close()
+
+
+def test_term_table_top_matches_most_common_order() -> None:
+    from collections import Counter
+
+    from asr_bias_builder.mining import TermTable
+
+    words = ["Helm", "Argo", "Istio", "Envoy", "Argo", "Kafka", "Istio", "Argo", "Helm", "Flux"]
+    table = TermTable()
+    for word in words:
+        table.add(word)
+    expected = [term for term, _ in Counter(words).most_common()]
+    assert [table.terms[idx] for idx in table.top(len(table))] == expected
+    assert [table.terms[idx] for idx in table.top(2, min_freq=2)] == expected[:2]
+    weights = [1.0, 0.1, 1.0, 1.0, 1.0, 1.0]
+    assert table.terms[table.top(1, weights=weights)[0]] == "Helm"
+    assert table.frequency("Argo") == 3 and "Nomad" not in table
+
+
+def test_phrase_miner_finds_maximal_repeated_phrases() -> None:
+    from asr_bias_builder.mining import mine_phrases
+
+    text = (
+        "We deploy the service mesh gateway daily. The service mesh gateway scales; "
+        "our service mesh gateway is fast. Service mesh docs. service mesh\n"
+        "Contact the sales team"
+    )
+    phrases = {phrase.text.lower(): phrase.count for phrase in mine_phrases(text, min_count=3, max_words=6)}
+    assert phrases == {"service mesh gateway": 3, "service mesh": 5}
+
+    seeds, stats = mine(text.replace(".", ".\n") * 2, phrases=True)
+    assert "service mesh gateway" in [seed["term"].lower() for seed in seeds]
+    assert stats.phrases >= 1
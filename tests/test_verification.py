@@ -15,3 +15,19 @@ def test_consolidate_handles_aliases(sample_text: str) -> None:
     payloads, stats = matcher.consolidate(sample_text, seeds, llm_data, allow_llm_aliases=False)
     assert payloads
     assert stats["llm_used"] >= 1
+
+
+def test_slides_are_emitted_only_with_provenance(tmp_path, config_dict: dict) -> None:
+    from asr_bias_builder.extraction import load_provenance, write_deck_text
+
+    deck = tmp_path / "deck.txt"
+    deck.write_text("Intro\fDyson Sphere roadmap", encoding="utf-8")
+    dest = tmp_path / "deck_text.txt"
+    write_deck_text(deck, dest, config=config_dict)
+    text = dest.read_text(encoding="utf-8")
+    seeds = [{"term": "Dyson Sphere", "frequency": 1, "contexts": []}]
+
+    plain, _ = matcher.consolidate(text, seeds, None, allow_llm_aliases=False)
+    assert plain and all("slides" not in payload for payload in plain)
+    located, _ = matcher.consolidate(text, seeds, None, allow_llm_aliases=False, provenance=load_provenance(dest))
+    assert located[0]["slides"] == [2]